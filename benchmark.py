@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for host-side detection stages
+"""
+
+import sys
+import argparse
+import time
+import cv2
+import numpy as np
+from pathlib import Path
+
+# Add project root to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.detection import hailo_backend
+from src.detection.hailo_detector import HailoDetector
+from src.detection.detector import Detector
+from src.detection.backend import BACKEND_REGISTRY
+from src.detection.worker_pool import WorkerPoolDetector
+from src.detection.preprocess import LetterboxPreprocessor
+from src.detection.postprocess import (
+    decode_yolo, decode_output, nms_indices, soft_nms, build_detections, host_nms_required, load_recorded_outputs
+)
+
+
+COCO_CLASSES = {i: f'class_{i}' for i in range(80)}
+
+
+def make_yolo_output(num_rows: int, num_classes: int = 80, positives: int = 20, seed: int = 0) -> np.ndarray:
+    """Synthetic [num_rows, 5 + classes] output with a few confident boxes"""
+    rng = np.random.default_rng(seed)
+    output = np.empty((num_rows, 5 + num_classes), dtype=np.float32)
+    output[:, 0:2] = rng.uniform(0, 640, (num_rows, 2))
+    output[:, 2:4] = rng.uniform(10, 200, (num_rows, 2))
+    output[:, 4] = rng.uniform(0, 0.3, num_rows)
+    output[:, 5:] = rng.uniform(0, 1, (num_rows, num_classes))
+
+    confident = rng.choice(num_rows, size=min(positives, num_rows), replace=False)
+    output[confident, 4] = rng.uniform(0.8, 1.0, len(confident))
+    return output
+
+
+def reference_decode(output, input_size, original_size, min_confidence):
+    """Per-row Python loop the detector used before vectorization"""
+    detections = []
+    scale_x = original_size[0] / input_size[0]
+    scale_y = original_size[1] / input_size[1]
+
+    for detection in output:
+        x_center, y_center, width, height = detection[:4]
+        class_scores = detection[5:]
+        class_id = np.argmax(class_scores)
+        final_confidence = detection[4] * class_scores[class_id]
+
+        if final_confidence >= min_confidence:
+            x1 = max(0, min(int((x_center - width / 2) * scale_x), original_size[0] - 1))
+            y1 = max(0, min(int((y_center - height / 2) * scale_y), original_size[1] - 1))
+            x2 = max(0, min(int((x_center + width / 2) * scale_x), original_size[0] - 1))
+            y2 = max(0, min(int((y_center + height / 2) * scale_y), original_size[1] - 1))
+            detections.append({
+                'bbox': [x1, y1, x2, y2],
+                'confidence': float(final_confidence),
+                'class_id': int(class_id),
+                'class_name': COCO_CLASSES.get(class_id, f'class_{class_id}')
+            })
+
+    return detections
+
+
+def make_merge_boxes(objects: int, duplicates: int, seed: int = 0):
+    """Full-frame boxes as the ROI/tile merge sees them: each object reported several times,
+    and every other object is a truck sharing most of a bus's box"""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(100, 1180, (objects, 2))
+    sizes = rng.uniform(60, 300, (objects, 2))
+    centers[1::2] = centers[0::2][:len(centers[1::2])] + 10  # Truck next to a bus
+    sizes[1::2] = sizes[0::2][:len(sizes[1::2])]
+    class_ids = np.where(np.arange(objects) % 2 == 0, 5, 7).astype(np.int32)  # bus, truck
+
+    centers = np.repeat(centers, duplicates, axis=0) + rng.normal(0, 4, (objects * duplicates, 2))
+    sizes = np.repeat(sizes, duplicates, axis=0)
+    boxes = np.concatenate((centers - sizes / 2, centers + sizes / 2), axis=1).astype(np.int32)
+    scores = rng.uniform(0.7, 1.0, len(boxes)).astype(np.float32)
+    return boxes, scores, np.repeat(class_ids, duplicates)
+
+
+def reference_merge(detections, min_confidence, nms_threshold):
+    """Class-agnostic merge over detection dicts the detector used before class-aware NMS"""
+    boxes = []
+    scores = []
+    for det in detections:
+        bbox = det['bbox']
+        boxes.append([bbox[0], bbox[1], bbox[2] - bbox[0], bbox[3] - bbox[1]])
+        scores.append(det['confidence'])
+    indices = cv2.dnn.NMSBoxes(np.array(boxes, dtype=np.float32), np.array(scores, dtype=np.float32),
+                               min_confidence, nms_threshold)
+    return [detections[i] for i in np.array(indices).reshape(-1)]
+
+
+def time_call(func, iterations: int) -> float:
+    """Average wall time of func in milliseconds"""
+    func()  # Warm up
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start_time) / iterations * 1000
+
+
+def benchmark_postprocess(args) -> None:
+    """Compare the per-row loop with the vectorized decoder"""
+    input_size = (640, 640)
+    original_size = (1280, 720)
+    output = make_yolo_output(args.rows)
+
+    def vectorized():
+        boxes, scores, class_ids = decode_yolo(output, input_size, original_size, args.min_confidence)
+        return build_detections(boxes, scores, class_ids, COCO_CLASSES)
+
+    # Both paths must agree before their timings mean anything
+    expected = reference_decode(output, input_size, original_size, args.min_confidence)
+    actual = vectorized()
+    assert [d['bbox'] for d in expected] == [d['bbox'] for d in actual], "decoders disagree"
+
+    loop_ms = time_call(lambda: reference_decode(output, input_size, original_size, args.min_confidence),
+                        args.iterations)
+    vector_ms = time_call(vectorized, args.iterations)
+    boxes, scores, _ = decode_yolo(output, input_size, original_size, args.min_confidence)
+    nms_ms = time_call(lambda: nms_indices(boxes, scores, args.min_confidence, 0.45), args.iterations)
+
+    class_filter = np.array(sorted(args.classes), dtype=np.int64)
+    filtered_ms = time_call(
+        lambda: decode_yolo(output, input_size, original_size, args.min_confidence, class_filter),
+        args.iterations
+    )
+
+    print(f"Post-processing {args.rows} rows, {len(actual)} detections above {args.min_confidence}")
+    print(f"  Python loop: {loop_ms:8.3f} ms")
+    print(f"  Vectorized:  {vector_ms:8.3f} ms  ({loop_ms / vector_ms:.1f}x faster)")
+    print(f"  Classes {args.classes}: {filtered_ms:8.3f} ms decode only")
+    print(f"  NMS:         {nms_ms:8.3f} ms")
+
+
+def benchmark_nms(args) -> None:
+    """Compare the class-agnostic dict merge with class-aware batched NMS on arrays"""
+    boxes, scores, class_ids = make_merge_boxes(args.objects, args.duplicates)
+    detections = build_detections(boxes, scores, class_ids, COCO_CLASSES)
+    threshold = args.nms_threshold
+
+    def bus_count(ids) -> int:
+        return int(np.sum(np.asarray(ids) == 5))
+
+    def per_class_loop():
+        keep = []
+        for class_id in np.unique(class_ids):
+            members = np.flatnonzero(class_ids == class_id)
+            keep.extend(members[nms_indices(boxes[members], scores[members], args.min_confidence, threshold)])
+        return keep
+
+    # The batched call must keep exactly what a per-class loop keeps
+    batched = nms_indices(boxes, scores, args.min_confidence, threshold, class_ids)
+    assert sorted(batched.tolist()) == sorted(per_class_loop()), "class-aware NMS disagrees with per-class loop"
+
+    reference = reference_merge(detections, args.min_confidence, threshold)
+    soft_keep, _ = soft_nms(boxes, scores, args.min_confidence, threshold, class_ids, args.sigma)
+
+    dict_ms = time_call(lambda: reference_merge(build_detections(boxes, scores, class_ids, COCO_CLASSES),
+                                                args.min_confidence, threshold), args.iterations)
+    loop_ms = time_call(per_class_loop, args.iterations)
+    batched_ms = time_call(lambda: nms_indices(boxes, scores, args.min_confidence, threshold, class_ids),
+                           args.iterations)
+    soft_ms = time_call(lambda: soft_nms(boxes, scores, args.min_confidence, threshold, class_ids, args.sigma),
+                        args.iterations)
+
+    print(f"NMS over {len(boxes)} boxes ({args.objects} objects x {args.duplicates}, "
+          f"{bus_count(class_ids[::args.duplicates])} buses each beside a truck)")
+    print(f"{'method':<28} {'ms':>8} {'kept':>6} {'buses':>6}")
+    print(f"{'dicts, class-agnostic':<28} {dict_ms:8.3f} {len(reference):6d} "
+          f"{bus_count([det['class_id'] for det in reference]):6d}")
+    print(f"{'arrays, per-class loop':<28} {loop_ms:8.3f} {len(batched):6d} {bus_count(class_ids[batched]):6d}")
+    print(f"{'arrays, class-aware batched':<28} {batched_ms:8.3f} {len(batched):6d} {bus_count(class_ids[batched]):6d}")
+    print(f"{'arrays, class-aware soft':<28} {soft_ms:8.3f} {len(soft_keep):6d} {bus_count(class_ids[soft_keep]):6d}")
+
+
+def benchmark_preprocess(args) -> None:
+    """Compare the old stretch-and-float preprocessing with the in-place uint8 letterbox"""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    size = args.input_size
+
+    def stretch_float():
+        resized = cv2.resize(frame, (size, size))
+        rgb_frame = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+        return np.expand_dims(rgb_frame.astype(np.float32) / 255.0, axis=0)
+
+    preprocessor = LetterboxPreprocessor((size, size))
+    input_tensor = np.empty((1, size, size, 3), dtype=np.uint8)
+
+    stretch_ms = time_call(stretch_float, args.iterations)
+    letterbox_ms = time_call(lambda: preprocessor.letterbox(frame, input_tensor), args.iterations)
+
+    print(f"Preprocessing {args.width}x{args.height} -> {size}x{size}")
+    print(f"  Stretch + float32 copy:  {stretch_ms:8.3f} ms  ({stretch_float().nbytes / 1e6:.1f} MB per frame)")
+    print(f"  Letterbox into uint8:    {letterbox_ms:8.3f} ms  ({input_tensor.nbytes / 1e6:.1f} MB, reused)")
+
+
+def benchmark_detector(args) -> None:
+    """End-to-end detect() timing on a chosen backend (or the one auto selection picks)"""
+    detector = Detector({
+        'backend': args.backend,
+        'model_path': args.model,
+        'latency_budget_ms': args.latency_budget_ms,
+        'opencv': {'model_path': args.onnx_model, 'threads': args.threads, 'target': args.target},
+        'onnxruntime': {'model_path': args.onnx_model, 'threads': args.threads},
+        'tflite': {'model_path': args.tflite_model, 'threads': args.threads or 4}
+    })
+    if not detector.initialize():
+        print("No detection backend could be initialized")
+        return
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    for _ in range(args.frames):
+        detector.detect(frame)
+
+    stats = detector.get_performance_stats()
+    latency = stats['latency']
+    print(f"Backend: {stats['backend']}, {args.frames} frames of {args.width}x{args.height}")
+    for name, ms in stats.get('backend_selection_ms', {}).items():
+        print(f"  Candidate {name:<12} " + (f"{ms:8.2f} ms" if ms is not None else "unavailable"))
+    print(f"  Startup:      " + ", ".join(f"{stage} {ms:.1f} ms" for stage, ms in latency['startup_ms'].items()))
+    print(f"  First frame:  {latency['first_inference_ms']:8.2f} ms")
+    print(f"  Steady state: {latency['steady_state_ms']:8.2f} ms  ({stats.get('fps', 0.0):.1f} fps)")
+    for stage, ms in latency['stages_ms'].items():
+        print(f"    {stage:<12} {ms:8.2f} ms")
+    detector.cleanup()
+
+
+def benchmark_parse(args) -> None:
+    """Run an output parser over recorded model outputs"""
+    outputs, recorded_format = load_recorded_outputs(args.recording)
+    output_format = args.format or recorded_format
+    original_size = (args.width, args.height)
+    input_size = (args.input_size, args.input_size)
+
+    def parse():
+        boxes, scores, class_ids = decode_output(
+            output_format, outputs[0], input_size, original_size, args.min_confidence
+        )
+        if host_nms_required(output_format):
+            keep = nms_indices(boxes, scores, args.min_confidence, 0.45)
+            boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+        return build_detections(boxes, scores, class_ids, COCO_CLASSES)
+
+    detections = parse()
+    parse_ms = time_call(parse, args.iterations)
+
+    print(f"{args.recording}: format {output_format}, {len(detections)} detections, {parse_ms:.3f} ms")
+    for detection in detections:
+        print(f"  {detection['class_name']:>10} {detection['confidence']:.2f} {detection['bbox']}")
+
+
+def benchmark_activation(args) -> None:
+    """Startup cost and per-frame cost of a persistent vs per-frame activated pipeline"""
+    if not hailo_backend.HAILO_AVAILABLE:
+        print("HailoRT is not installed - nothing to measure")
+        return
+
+    detector = HailoDetector({'model_path': args.model, 'fallback_backends': []})
+    if not detector.initialize():
+        print(f"Could not open a Hailo pipeline for {args.model}")
+        return
+
+    hailo = detector.backend
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    input_tensor, _ = detector._preprocess_frame(frame)
+    start_time = time.perf_counter()
+    detector.detect(frame)
+    first_ms = (time.perf_counter() - start_time) * 1000
+    persistent_ms = time_call(lambda: hailo.infer(input_tensor), args.iterations)
+
+    # Previous behaviour: activate the network group and open the vstreams around every frame
+    hailo._close_pipeline()
+
+    def per_frame():
+        with hailo.network_group.activate(hailo.network_group_params):
+            with hailo._create_vstreams() as pipeline:
+                pipeline.infer({hailo.input_name: input_tensor})
+
+    per_frame_ms = time_call(per_frame, args.iterations)
+    detector.cleanup()
+
+    print(f"Startup ({args.model}):")
+    for stage, seconds in detector.startup_times.items():
+        print(f"  {stage:<12} {seconds * 1000:8.1f} ms")
+    print(f"  {'first frame':<12} {first_ms:8.1f} ms")
+    print("Steady state inference:")
+    print(f"  Persistent pipeline:   {persistent_ms:8.3f} ms")
+    print(f"  Activated per frame:   {per_frame_ms:8.3f} ms  (+{per_frame_ms - persistent_ms:.3f} ms overhead)")
+
+
+def benchmark_batching(args) -> None:
+    """Throughput and latency of the async pipeline for several batch sizes"""
+    if not hailo_backend.HAILO_AVAILABLE:
+        print("HailoRT is not installed - nothing to measure")
+        return
+
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    print(f"{'batch':>5} {'fps':>8} {'latency ms':>11} {'batch fill':>11}")
+
+    for batch_size in args.sizes:
+        detector = HailoDetector({
+            'model_path': args.model,
+            'fallback_backends': [],
+            'batch_size': batch_size,
+            'batch_max_wait_ms': args.max_wait_ms
+        })
+        if not detector.initialize() or not detector.start_async(queue_size=batch_size * 2):
+            print(f"{batch_size:>5} could not open a Hailo pipeline")
+            continue
+
+        detector.submit(frame).result()  # Warm up
+        start_time = time.perf_counter()
+        futures = [detector.submit(frame) for _ in range(args.frames)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start_time
+
+        stats = detector.get_performance_stats()['async']
+        print(f"{batch_size:>5} {args.frames / elapsed:8.1f} {stats['avg_latency_ms']:11.2f} "
+              f"{stats['avg_batch_fill']:11.2f}")
+        detector.cleanup()
+
+
+def benchmark_workers(args) -> None:
+    """Throughput of the process worker pool from 1 to N workers"""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    print(f"{'workers':>7} {'fps':>8} {'speedup':>8} {'latency ms':>11}")
+
+    baseline_fps = None
+    for workers in range(1, args.max_workers + 1):
+        detector = WorkerPoolDetector({
+            'backend': args.backend,
+            'opencv': {'model_path': args.onnx_model},
+            'onnxruntime': {'model_path': args.onnx_model},
+            'tflite': {'model_path': args.tflite_model},
+            'worker_pool': {
+                'workers': workers,
+                'threads_per_worker': args.threads_per_worker,
+                'cpu_affinity': list(range(workers)) if args.pin else []
+            }
+        })
+        if not detector.initialize():
+            print(f"{workers:>7} could not start the workers")
+            return
+
+        detector.submit(frame).result()  # Warm up
+        start_time = time.perf_counter()
+        futures = [detector.submit(frame) for _ in range(args.frames)]
+        for future in futures:
+            future.result()
+        fps = args.frames / (time.perf_counter() - start_time)
+        baseline_fps = baseline_fps or fps
+
+        stats = detector.get_performance_stats()['worker_pool']
+        print(f"{workers:>7} {fps:8.1f} {fps / baseline_fps:7.2f}x {stats['avg_latency_ms']:11.2f}")
+        detector.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='VisionAI4SchoolBus micro-benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    postprocess_parser = subparsers.add_parser('postprocess', help='YOLO output decoding')
+    postprocess_parser.add_argument('--rows', type=int, default=25200, help='Candidate rows per frame')
+    postprocess_parser.add_argument('--min-confidence', type=float, default=0.7)
+    postprocess_parser.add_argument('--iterations', type=int, default=20)
+    postprocess_parser.add_argument('--classes', type=int, nargs='+', default=[5],
+                                    help='Class ids for the whitelisted decode (default: bus)')
+    postprocess_parser.set_defaults(func=benchmark_postprocess)
+
+    nms_parser = subparsers.add_parser('nms', help='Class-agnostic dict merge vs class-aware batched NMS')
+    nms_parser.add_argument('--objects', type=int, default=20, help='Distinct vehicles (alternating bus/truck)')
+    nms_parser.add_argument('--duplicates', type=int, default=5, help='Reports per vehicle (ROIs, tiles)')
+    nms_parser.add_argument('--min-confidence', type=float, default=0.7)
+    nms_parser.add_argument('--nms-threshold', type=float, default=0.45)
+    nms_parser.add_argument('--sigma', type=float, default=0.5, help='Soft-NMS Gaussian sigma')
+    nms_parser.add_argument('--iterations', type=int, default=200)
+    nms_parser.set_defaults(func=benchmark_nms)
+
+    preprocess_parser = subparsers.add_parser('preprocess', help='Frame preprocessing')
+    preprocess_parser.add_argument('--width', type=int, default=1280)
+    preprocess_parser.add_argument('--height', type=int, default=720)
+    preprocess_parser.add_argument('--input-size', type=int, default=640)
+    preprocess_parser.add_argument('--iterations', type=int, default=200)
+    preprocess_parser.set_defaults(func=benchmark_preprocess)
+
+    detector_parser = subparsers.add_parser('detector', help='End-to-end detection latency')
+    detector_parser.add_argument('--backend', choices=list(BACKEND_REGISTRY) + ['auto'], default='hailo')
+    detector_parser.add_argument('--latency-budget-ms', type=float, default=100.0, help='Budget for --backend auto')
+    detector_parser.add_argument('--model', default='models/yolov8n_hailo.hef', help='Hailo HEF')
+    detector_parser.add_argument('--onnx-model', default='models/yolov8n.onnx',
+                                 help='ONNX model for the OpenCV DNN and ONNX Runtime backends')
+    detector_parser.add_argument('--tflite-model', default='models/yolov8n_float16.tflite')
+    detector_parser.add_argument('--threads', type=int, default=0, help='CPU threads (0 = backend default)')
+    detector_parser.add_argument('--target', default='cpu', help='OpenCV DNN target')
+    detector_parser.add_argument('--width', type=int, default=1280)
+    detector_parser.add_argument('--height', type=int, default=720)
+    detector_parser.add_argument('--frames', type=int, default=50)
+    detector_parser.set_defaults(func=benchmark_detector)
+
+    parse_parser = subparsers.add_parser('parse', help='Output parser on recorded tensors')
+    parse_parser.add_argument('recording', help='.npz written by detection.record_outputs')
+    parse_parser.add_argument('--format', choices=['yolov5', 'yolov8', 'hailo_nms'],
+                              help='Override the recorded output format')
+    parse_parser.add_argument('--width', type=int, default=1280, help='Original frame width')
+    parse_parser.add_argument('--height', type=int, default=720, help='Original frame height')
+    parse_parser.add_argument('--input-size', type=int, default=640, help='Model input size')
+    parse_parser.add_argument('--min-confidence', type=float, default=0.7)
+    parse_parser.add_argument('--iterations', type=int, default=20)
+    parse_parser.set_defaults(func=benchmark_parse)
+
+    activation_parser = subparsers.add_parser('activation', help='Persistent vs per-frame pipeline activation')
+    activation_parser.add_argument('--model', default='models/yolov8n_hailo.hef')
+    activation_parser.add_argument('--iterations', type=int, default=50)
+    activation_parser.set_defaults(func=benchmark_activation)
+
+    batching_parser = subparsers.add_parser('batching', help='Throughput and latency per batch size')
+    batching_parser.add_argument('--model', default='models/yolov8n_hailo.hef')
+    batching_parser.add_argument('--sizes', type=int, nargs='+', default=[1, 2, 4, 8])
+    batching_parser.add_argument('--frames', type=int, default=200)
+    batching_parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    batching_parser.set_defaults(func=benchmark_batching)
+
+    workers_parser = subparsers.add_parser('workers', help='Process worker pool scaling (CPU backends)')
+    workers_parser.add_argument('--backend', choices=['opencv', 'onnxruntime', 'tflite'], default='opencv')
+    workers_parser.add_argument('--onnx-model', default='models/yolov8n.onnx')
+    workers_parser.add_argument('--tflite-model', default='models/yolov8n_float16.tflite')
+    workers_parser.add_argument('--max-workers', type=int, default=4)
+    workers_parser.add_argument('--threads-per-worker', type=int, default=1)
+    workers_parser.add_argument('--pin', action='store_true', help='Pin worker i to CPU i')
+    workers_parser.add_argument('--width', type=int, default=1280)
+    workers_parser.add_argument('--height', type=int, default=720)
+    workers_parser.add_argument('--frames', type=int, default=100)
+    workers_parser.set_defaults(func=benchmark_workers)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
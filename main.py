@@ -6,10 +6,12 @@ Real-time school bus detection with home automation integration
 
 import sys
 import os
+import argparse
 import signal
 import logging
 import threading
 import time
+from functools import partial
 from pathlib import Path
 
 # Add src to Python path
@@ -17,27 +19,38 @@ sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from utils.config_manager import ConfigManager
 from utils.logger import setup_logging
-from camera.camera_manager import CameraManager
-from detection.hailo_detector import HailoDetector
+from camera.camera_pool import CameraPool
+from detection.detector import Detector
+from detection.cascade import CascadeDetector
+from detection.worker_pool import WorkerPoolDetector
+from detection.backend import BACKEND_REGISTRY
+from detection.motion_gate import MotionGate
 from automation.mqtt_client import MQTTClient
 from automation.home_assistant import HomeAssistantController
 from utils.performance_monitor import PerformanceMonitor
+from utils.schedule_manager import ScheduleManager
+from utils.quality_controller import QualityController
 
 class SchoolBusDetectionSystem:
     """Main application class for school bus detection system"""
     
-    def __init__(self, config_path='config/config.yaml'):
+    def __init__(self, config_path='config/config.yaml', backend=None):
         self.config_path = config_path
+        self.backend = backend  # Overrides detection.backend ('auto' benchmarks the installed backends)
         self.config = None
         self.logger = None
         self.running = False
         
         # Core components
-        self.camera_manager = None
+        self.camera_pool = None
         self.detector = None
+        self.motion_gates = {}  # One motion gate per camera
         self.mqtt_client = None
         self.ha_controller = None
         self.performance_monitor = None
+        self.schedule = None
+        self.quality = None
+        self.quality_level = 0  # Tier currently applied to the detector
         
         # Threading
         self.detection_thread = None
@@ -48,6 +61,7 @@ class SchoolBusDetectionSystem:
         self.detection_cooldown = 30  # seconds
         self.devices_activated = False
         self.activation_start_time = 0
+        self.async_inference = False
         
     def initialize(self):
         """Initialize all system components"""
@@ -62,17 +76,30 @@ class SchoolBusDetectionSystem:
             # Initialize performance monitor
             self.performance_monitor = PerformanceMonitor(self.config.get('monitoring', {}))
             
-            # Initialize camera
+            # Initialize cameras (a single 'camera' section becomes a pool of one)
             camera_config = self.config.get('camera', {})
-            self.camera_manager = CameraManager(camera_config)
-            if not self.camera_manager.initialize():
+            self.camera_pool = CameraPool(self.config.get('cameras', {}), camera_config)
+            if not self.camera_pool.initialize():
                 raise RuntimeError("Failed to initialize camera")
             
-            # Initialize Hailo detector
+            # Initialize detector on the configured (or selected) backend
             detection_config = self.config.get('detection', {})
-            self.detector = HailoDetector(detection_config)
+            if detection_config.get('cascade', {}).get('enabled', False):
+                # Cheap always-on stage, full model only on candidate frames
+                self.detector = CascadeDetector(detection_config, self.backend)
+            elif detection_config.get('worker_pool', {}).get('enabled', False):
+                # CPU inference spread over warm worker processes
+                self.detector = WorkerPoolDetector(detection_config, self.backend)
+            else:
+                self.detector = Detector(detection_config, self.backend)
             if not self.detector.initialize():
-                raise RuntimeError("Failed to initialize Hailo detector")
+                raise RuntimeError("Failed to initialize detector")
+            
+            # Overlap preprocessing, inference and post-processing of consecutive frames
+            # (the worker pool is always asynchronous, otherwise only one worker would be busy)
+            if (self.config.get('detection.async_pipeline.enabled', False)
+                    or self.config.get('detection.worker_pool.enabled', False)):
+                self.async_inference = self.detector.start_async()
             
             # Initialize MQTT client
             mqtt_config = self.config.get('mqtt', {})
@@ -84,6 +111,17 @@ class SchoolBusDetectionSystem:
             ha_config = self.config.get('home_assistant', {})
             self.ha_controller = HomeAssistantController(self.mqtt_client, ha_config)
             
+            # Initialize duty-cycle schedule and apply the current mode
+            self.schedule = ScheduleManager(self.config.get('scheduling', {}))
+            self.apply_schedule()
+            
+            # Degrade (and restore) detection quality to hold the end-to-end latency budget
+            # Tiers the detector cannot act on (e.g. input_size on a HEF) are left out
+            self.quality = QualityController(
+                self.config.get('quality_control', {}),
+                self.detector.quality_settings() + ('inference_rate',)
+            )
+            
             # Get detection parameters
             self.detection_cooldown = self.config.get('detection.cooldown_seconds', 30)
             
@@ -103,37 +141,122 @@ class SchoolBusDetectionSystem:
         
         while self.running:
             try:
-                # Capture frame
-                frame = self.camera_manager.get_frame()
-                if frame is None:
-                    time.sleep(0.1)
+                # Wait for the next unseen frame from any camera (borrowed, no copy)
+                next_frame = self.camera_pool.wait_for_next_frame(timeout=1.0)
+                if next_frame is None:
                     continue
+
+                # Follow the schedule: idle outside the bus windows, full rate inside them
+                if self.schedule.update():
+                    self.apply_schedule()
                 
-                # Run detection
-                start_time = time.time()
-                detections = self.detector.detect(frame)
-                inference_time = time.time() - start_time
-                
-                # Process detections
-                school_bus_detected = self.process_detections(detections, frame)
-                
-                # Update performance metrics
-                self.performance_monitor.update_metrics(
-                    inference_time=inference_time,
-                    detections_count=len(detections),
-                    bus_detected=school_bus_detected
-                )
-                
-                # Handle device activation/deactivation
-                self.handle_device_control(school_bus_detected)
+                # Tier changes are decided on result threads but applied here, between submissions
+                if self.quality.level != self.quality_level:
+                    self.apply_quality()
                 
-                # Small delay to prevent CPU overload
-                time.sleep(0.05)
+                camera_name, borrowed = next_frame
+                with borrowed:
+                    frame = borrowed.frame
+                    
+                    # Skip frames above the scheduled (or quality tier) inference rate, then static frames.
+                    # Both limiters are asked every frame so each keeps its own rate and skip count
+                    scheduled = self.schedule.should_infer()
+                    allowed = self.quality.should_infer()
+                    if not (scheduled and allowed):
+                        continue
+                    if not self.get_motion_gate(camera_name).should_infer(frame):
+                        continue
+
+                    if self.async_inference:
+                        # Preprocessing is done when submit() returns, so the frame can go back
+                        # to the ring; results are handled on the post-processing thread. A frame
+                        # that may be saved keeps its slot until then instead of being copied
+                        held = borrowed.share() if self.performance_monitor.save_detection_images else None
+                        try:
+                            self.detector.submit(frame, callback=partial(
+                                self.on_detections_ready, camera_name, borrowed.timestamp, time.time(), held
+                            ))
+                        except Exception:
+                            if held is not None:
+                                held.release()
+                            raise
+                        continue
+
+                    # Run detection
+                    start_time = time.time()
+                    detections = self.detector.detect(frame)
+                    inference_time = time.time() - start_time
+
+                    self.handle_detections(camera_name, borrowed.timestamp, detections, inference_time, frame)
                 
             except Exception as e:
                 self.logger.error(f"Error in detection loop: {e}")
                 time.sleep(1)
     
+    def on_detections_ready(self, camera_name, capture_timestamp, submit_time, held, future):
+        """Callback for frames submitted to the async inference pipeline; releases the held frame"""
+        try:
+            if future.cancelled():
+                return
+            detections = future.result()
+            frame = held.frame if held is not None else None
+            self.handle_detections(camera_name, capture_timestamp, detections, time.time() - submit_time, frame)
+        except Exception as e:
+            self.logger.error(f"Error handling async detections: {e}")
+        finally:
+            if held is not None:
+                held.release()
+    
+    def handle_detections(self, camera_name, capture_timestamp, detections, inference_time, frame):
+        """Process one frame's detections, update metrics and drive the devices"""
+        for detection in detections:
+            detection['camera'] = camera_name
+        school_bus_detected = self.process_detections(detections, frame)
+        self.camera_pool.record_result(camera_name, capture_timestamp)
+        
+        # Capture-to-result latency drives the quality tier
+        if self.quality.record(time.time() - capture_timestamp):
+            self.performance_monitor.update_quality_stats(self.quality.get_stats())
+        
+        # Update performance metrics
+        self.performance_monitor.update_metrics(
+            inference_time=inference_time,
+            detections_count=len(detections),
+            bus_detected=school_bus_detected
+        )
+        
+        # Handle device activation/deactivation
+        self.handle_device_control(school_bus_detected)
+    
+    def apply_schedule(self):
+        """Apply the scheduled capture rate to all cameras"""
+        if not self.schedule.enabled:
+            return
+        
+        state = self.schedule.state
+        self.logger.info(
+            f"Schedule mode: {state['mode']}"
+            + (f" ({state['window']})" if state['window'] else "")
+            + f" - capture fps: {state['capture_fps'] or 'camera default'}, "
+            f"inference rate: {state['inference_rate'] if state['inference_rate'] is not None else 'unlimited'}"
+        )
+        self.camera_pool.set_capture_fps(state['capture_fps'])
+        self.performance_monitor.update_schedule_stats(self.schedule.get_stats())
+    
+    def apply_quality(self):
+        """Apply the quality controller's current tier to the detector"""
+        self.quality_level = self.quality.level
+        settings = self.quality.settings
+        self.logger.info(f"Quality tier: {self.quality.tier.name} - {settings or 'configured settings'}")
+        self.detector.apply_quality(settings)
+        self.performance_monitor.update_quality_stats(self.quality.get_stats())
+    
+    def get_motion_gate(self, camera_name):
+        """Get (or create) the motion gate for a camera"""
+        if camera_name not in self.motion_gates:
+            self.motion_gates[camera_name] = MotionGate(self.config.get('detection.motion_gate', {}))
+        return self.motion_gates[camera_name]
+    
     def process_detections(self, detections, frame):
         """Process detection results and filter for school buses"""
         school_bus_detected = False
@@ -207,6 +330,13 @@ class SchoolBusDetectionSystem:
         """Performance monitoring loop"""
         while self.running:
             try:
+                self.performance_monitor.update_camera_stats(self.camera_pool.get_stats())
+                self.performance_monitor.update_detector_stats(self.detector.get_performance_stats())
+                self.performance_monitor.update_schedule_stats(self.schedule.get_stats())
+                self.performance_monitor.update_quality_stats(self.quality.get_stats())
+                self.performance_monitor.update_motion_stats(
+                    {name: gate.get_stats() for name, gate in self.motion_gates.items()}
+                )
                 self.performance_monitor.log_system_stats()
                 time.sleep(60)  # Log every minute
             except Exception as e:
@@ -246,8 +376,8 @@ class SchoolBusDetectionSystem:
             self.monitoring_thread.join(timeout=5)
         
         # Cleanup resources
-        if self.camera_manager:
-            self.camera_manager.cleanup()
+        if self.camera_pool:
+            self.camera_pool.cleanup()
         
         if self.detector:
             self.detector.cleanup()
@@ -278,12 +408,14 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
     
     # Parse command line arguments
-    config_path = 'config/config.yaml'
-    if len(sys.argv) > 1:
-        config_path = sys.argv[1]
+    parser = argparse.ArgumentParser(description='VisionAI4SchoolBus detection system')
+    parser.add_argument('config', nargs='?', default='config/config.yaml', help='Configuration file')
+    parser.add_argument('--select-backend', choices=list(BACKEND_REGISTRY) + ['auto'],
+                        help='Detection backend (overrides detection.backend; auto picks the fastest)')
+    args = parser.parse_args()
     
     # Create and start application
-    app = SchoolBusDetectionSystem(config_path)
+    app = SchoolBusDetectionSystem(args.config, args.select_backend)
     
     if app.start():
         try:
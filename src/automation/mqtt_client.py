@@ -210,6 +210,7 @@ class MQTTClient:
             'confidence': detection.get('confidence', 0),
             'class_name': detection.get('class_name', 'unknown'),
             'bbox': detection.get('bbox', []),
+            'camera': detection.get('camera', 'camera'),
             'message': 'School bus detected'
         }
         
@@ -5,11 +5,16 @@ Handles USB camera initialization, configuration, and frame capture
 
 import cv2
 import numpy as np
+import re
+import shutil
+import subprocess
 import time
 import threading
-from queue import Queue, Empty
-from typing import Optional, Tuple, Dict, Any
+from pathlib import Path
+from typing import Optional, Tuple, Dict, Any, List
 from ..utils.logger import get_logger
+from .frame_buffer import FrameRingBuffer, BorrowedFrame
+from .frame_source import create_frame_source
 
 
 class CameraManager:
@@ -27,19 +32,37 @@ class CameraManager:
         self.exposure_value = config.get('exposure_value', 100)
         self.gain = config.get('gain', 1.0)
         self.buffer_size = config.get('buffer_size', 1)
+        self.ring_size = config.get('ring_size', 4)
+        self.decode_on_demand = config.get('decode_on_demand', False)
+        self.decode_scale = config.get('decode_scale', 1)
         
-        # Camera object and state
-        self.cap = None
+        # Frame source (live device or replay) and state
+        self.source_config = config.get('source', {'type': 'device'})
+        self.source = None
         self.is_initialized = False
         self.is_capturing = False
         
-        # Frame buffer for threading
-        self.frame_queue = Queue(maxsize=self.buffer_size)
+        # Preallocated frame ring shared with consumers
+        self.frame_ring = None
         self.capture_thread = None
-        self.latest_frame = None
-        self.frame_lock = threading.Lock()
+        self.on_frame = None  # Optional callback fired after each published frame
+        
+        # Decode-on-demand: consumers set this to have the next grabbed frame decoded
+        self.decode_requested = threading.Event()
+        
+        # Duty cycling: cap on published frames per second (None = camera rate)
+        self.capture_fps = None
+        self.min_frame_interval = 0.0
+        self.last_publish_time = 0.0
+        
+        # Device frame rate asked for by set_capture_fps and the one last applied; only the
+        # capture thread touches the device, between grabs
+        self.requested_device_fps = None
+        self.device_fps = None
         
         # Performance metrics
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
         self.frame_count = 0
         self.last_fps_time = time.time()
         self.current_fps = 0
@@ -47,25 +70,37 @@ class CameraManager:
     def initialize(self) -> bool:
         """Initialize camera with specified configuration"""
         try:
-            self.logger.info(f"Initializing camera {self.device_id}")
+            # Create the frame source (USB camera unless a replay source is configured)
+            self.source = create_frame_source(self.source_config, self.device_id)
+            self.logger.info(f"Initializing frame source: {self.source.describe()}")
             
-            # Create VideoCapture object
-            self.cap = cv2.VideoCapture(self.device_id)
-            
-            if not self.cap.isOpened():
-                self.logger.error(f"Failed to open camera {self.device_id}")
+            if not self.source.open():
+                self.logger.error(f"Failed to open frame source: {self.source.describe()}")
                 return False
             
-            # Configure camera properties
-            self._configure_camera()
+            # Configure camera properties (hardware settings only apply to live devices)
+            if self.source.is_live:
+                self._configure_camera()
+            
+            # Reduced-scale decode (raw MJPEG on live devices) when the model input is small anyway
+            if self.decode_scale > 1 and not self.source.enable_reduced_decode(self.decode_scale):
+                self.logger.warning(f"Reduced decode (1/{self.decode_scale}) not supported by source - decoding at full scale")
             
             # Test frame capture
-            ret, test_frame = self.cap.read()
+            ret, test_frame = self.source.read()
             if not ret or test_frame is None:
                 self.logger.error("Failed to capture test frame")
                 return False
             
             self.logger.info(f"Camera initialized successfully - Resolution: {test_frame.shape[1]}x{test_frame.shape[0]}")
+            
+            # Preallocate frame slots at the negotiated resolution
+            self.frame_ring = FrameRingBuffer(self.ring_size, test_frame.shape)
+            
+            # Publish the test frame so replay sources do not lose their first frame
+            slot = self.frame_ring.acquire_write_slot()
+            slot.adopt(test_frame)
+            self.frame_ring.publish(slot)
             self.is_initialized = True
             
             # Start capture thread
@@ -81,27 +116,27 @@ class CameraManager:
         """Configure camera properties"""
         try:
             # Set resolution
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution['width'])
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution['height'])
+            self.source.set_property(cv2.CAP_PROP_FRAME_WIDTH, self.resolution['width'])
+            self.source.set_property(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution['height'])
             
             # Set FPS
-            self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+            self.source.set_property(cv2.CAP_PROP_FPS, self.fps)
             
             # Set buffer size (reduce latency)
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+            self.source.set_property(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
             
             # Configure exposure
             if self.auto_exposure:
-                self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)  # Auto exposure
+                self.source.set_property(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)  # Auto exposure
             else:
-                self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)  # Manual exposure
-                self.cap.set(cv2.CAP_PROP_EXPOSURE, self.exposure_value)
+                self.source.set_property(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)  # Manual exposure
+                self.source.set_property(cv2.CAP_PROP_EXPOSURE, self.exposure_value)
             
             # Set gain
-            self.cap.set(cv2.CAP_PROP_GAIN, self.gain)
+            self.source.set_property(cv2.CAP_PROP_GAIN, self.gain)
             
             # Additional optimizations
-            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
+            self.source.set_property(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
             
             self.logger.info("Camera properties configured")
             
@@ -127,45 +162,158 @@ class CameraManager:
     
     def _capture_loop(self) -> None:
         """Continuous frame capture loop running in background thread"""
-        while self.is_capturing and self.cap and self.cap.isOpened():
+        while self.is_capturing and self.source and self.source.is_opened():
+            slot = None
             try:
-                ret, frame = self.cap.read()
-                if ret and frame is not None:
-                    # Store latest frame thread-safely
-                    with self.frame_lock:
-                        self.latest_frame = frame.copy()
+                self._apply_device_fps()
+                
+                # Lockstep replay: hand over every frame instead of dropping them
+                if self.source.lockstep and not self.frame_ring.wait_until_consumed(timeout=0.1):
+                    continue
+                
+                if (self.min_frame_interval and not self.source.lockstep
+                        and time.time() - self.last_publish_time < self.min_frame_interval):
+                    # Throttled: keep draining the driver queue without decoding
+                    if self.source.grab():
+                        self._count_grab()
+                    else:
+                        time.sleep(0.01)
+                    continue
+                
+                if self.decode_on_demand and not self.source.lockstep:
+                    # Keep the driver queue drained; only decode frames a consumer asked for
+                    if not self.source.grab():
+                        time.sleep(0.01)
+                        continue
+                    self._count_grab()
+                    
+                    if not self.decode_requested.is_set():
+                        continue
                     
-                    # Update FPS calculation
-                    self._update_fps()
+                    slot = self.frame_ring.acquire_write_slot()
+                    if slot is None:
+                        continue
+                    ret, frame = self.source.retrieve(image=slot.buffer)
+                    if ret and frame is not None:
+                        # The request stays pending until a frame is actually decoded for it
+                        self.decode_requested.clear()
                 else:
+                    slot = self.frame_ring.acquire_write_slot()
+                    if slot is None:
+                        # Every slot is borrowed - drain the driver queue and drop the frame
+                        self.source.grab()
+                        self._count_grab()
+                        continue
+                    
+                    # Decode straight into the preallocated slot
+                    ret, frame = self.source.read(image=slot.buffer)
+                    if ret:
+                        self._count_grab()
+                
+                capture_time = time.time()
+                if ret and frame is not None:
+                    slot.adopt(frame)
+                    self.frame_ring.publish(slot, capture_time)
+                    self.last_publish_time = capture_time
+                    self.frames_decoded += 1
+                    if self.on_frame:
+                        self.on_frame()
+                else:
+                    self.frame_ring.abort_write(slot)
                     time.sleep(0.01)  # Brief pause if capture fails
                     
             except Exception as e:
+                if slot is not None:
+                    self.frame_ring.abort_write(slot)
                 self.logger.error(f"Error in capture loop: {e}")
                 time.sleep(0.1)
     
-    def get_frame(self) -> Optional[np.ndarray]:
-        """Get the most recent frame"""
+    def request_frame(self) -> int:
+        """Ask the capture thread to decode the next grabbed frame (decode-on-demand only)
+        
+        Returns the sequence number a frame must exceed to answer the request; frames
+        decoded earlier are stale. Without decode-on-demand every frame is fresh (0).
+        """
+        if not self.decode_on_demand:
+            return 0
+        after_sequence = self.get_latest_sequence()
+        self.decode_requested.set()
+        return after_sequence
+    
+    def borrow_frame(self, timeout: float = 1.0) -> Optional[BorrowedFrame]:
+        """Borrow the most recent frame read-only; call release() when done
+        
+        With decode-on-demand this waits up to timeout for the requested decode.
+        """
         if not self.is_initialized or not self.is_capturing:
             return None
         
-        with self.frame_lock:
-            if self.latest_frame is not None:
-                return self.latest_frame.copy()
+        if self.decode_on_demand:
+            return self.frame_ring.wait_for_next(self.request_frame(), timeout)
+        return self.frame_ring.borrow_latest()
+    
+    def borrow_after(self, after_seq: int) -> Optional[BorrowedFrame]:
+        """Borrow the latest frame if it is newer than after_seq, without waiting or requesting a decode"""
+        if not self.is_initialized or not self.is_capturing:
+            return None
+        
+        return self.frame_ring.wait_for_next(after_seq, 0)
+    
+    def get_frame(self) -> Optional[np.ndarray]:
+        """Get a private, writable copy of the most recent frame"""
+        borrowed = self.borrow_frame()
+        if borrowed is None:
+            return None
         
-        return None
+        with borrowed:
+            return borrowed.frame.copy()
     
     def get_frame_blocking(self, timeout: float = 1.0) -> Optional[np.ndarray]:
-        """Get frame with blocking wait and timeout"""
-        start_time = time.time()
+        """Get a copy of the first available frame, waiting up to timeout"""
+        borrowed = self.wait_for_next_frame(0, timeout)
+        if borrowed is None:
+            return None
         
-        while time.time() - start_time < timeout:
-            frame = self.get_frame()
-            if frame is not None:
-                return frame
-            time.sleep(0.01)
+        with borrowed:
+            return borrowed.frame.copy()
+    
+    def wait_for_next_frame(self, after_seq: int, timeout: float = 1.0) -> Optional[BorrowedFrame]:
+        """Borrow the first frame with a sequence number above after_seq, waiting up to timeout
         
-        return None
+        With decode-on-demand the frame is also newer than the decode this call requests.
+        """
+        if not self.is_initialized or not self.is_capturing:
+            return None
+        
+        return self.frame_ring.wait_for_next(max(after_seq, self.request_frame()), timeout)
+    
+    def set_capture_fps(self, fps: Optional[float]) -> None:
+        """Cap the published frame rate (None restores the configured camera rate)"""
+        self.capture_fps = fps
+        self.min_frame_interval = 1.0 / fps if fps else 0.0
+        
+        # Ask the device itself to slow down too; frames above the cap are grabbed but never decoded.
+        # The capture thread applies it between grabs, as the source is not safe to use concurrently
+        if self.source and self.source.is_live:
+            self.requested_device_fps = min(fps, self.fps) if fps else self.fps
+        
+        self.logger.info(f"Capture rate set to {fps if fps else self.fps} fps")
+    
+    def _apply_device_fps(self) -> None:
+        """Pass a device frame rate requested by set_capture_fps on to the source (capture thread only)"""
+        requested = self.requested_device_fps
+        if requested is not None and requested != self.device_fps:
+            self.source.set_property(cv2.CAP_PROP_FPS, requested)
+            self.device_fps = requested
+    
+    def get_latest_sequence(self) -> int:
+        """Get the sequence number of the most recently published frame"""
+        return self.frame_ring.sequence if self.frame_ring else 0
+    
+    def _count_grab(self) -> None:
+        """Count a frame taken from the source (decoded or not)"""
+        self.frames_grabbed += 1
+        self._update_fps()
     
     def _update_fps(self) -> None:
         """Update FPS calculation"""
@@ -183,25 +331,25 @@ class CameraManager:
     
     def get_resolution(self) -> Tuple[int, int]:
         """Get current camera resolution"""
-        if not self.cap or not self.cap.isOpened():
+        if not self.source or not self.source.is_opened():
             return (0, 0)
         
-        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        width = int(self.source.get_property(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.source.get_property(cv2.CAP_PROP_FRAME_HEIGHT))
         return (width, height)
     
     def is_available(self) -> bool:
         """Check if camera is available and capturing"""
-        return self.is_initialized and self.is_capturing and self.cap and self.cap.isOpened()
+        return self.is_initialized and self.is_capturing and self.source and self.source.is_opened()
     
     def adjust_exposure(self, exposure_value: int) -> bool:
         """Adjust camera exposure"""
         try:
-            if not self.cap:
+            if not self.source:
                 return False
             
-            self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)  # Manual mode
-            self.cap.set(cv2.CAP_PROP_EXPOSURE, exposure_value)
+            self.source.set_property(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)  # Manual mode
+            self.source.set_property(cv2.CAP_PROP_EXPOSURE, exposure_value)
             self.exposure_value = exposure_value
             
             self.logger.info(f"Exposure adjusted to {exposure_value}")
@@ -214,10 +362,10 @@ class CameraManager:
     def adjust_gain(self, gain_value: float) -> bool:
         """Adjust camera gain"""
         try:
-            if not self.cap:
+            if not self.source:
                 return False
             
-            self.cap.set(cv2.CAP_PROP_GAIN, gain_value)
+            self.source.set_property(cv2.CAP_PROP_GAIN, gain_value)
             self.gain = gain_value
             
             self.logger.info(f"Gain adjusted to {gain_value}")
@@ -229,17 +377,25 @@ class CameraManager:
     
     def get_camera_info(self) -> Dict[str, Any]:
         """Get current camera information"""
-        if not self.cap:
+        if not self.source:
             return {}
         
         return {
             'device_id': self.device_id,
+            'source': self.source.describe(),
             'resolution': self.get_resolution(),
             'fps': self.get_fps(),
-            'exposure': self.cap.get(cv2.CAP_PROP_EXPOSURE) if self.cap else 0,
-            'gain': self.cap.get(cv2.CAP_PROP_GAIN) if self.cap else 0,
-            'auto_exposure': self.cap.get(cv2.CAP_PROP_AUTO_EXPOSURE) if self.cap else 0,
-            'is_capturing': self.is_capturing
+            'exposure': self.source.get_property(cv2.CAP_PROP_EXPOSURE) if self.source else 0,
+            'gain': self.source.get_property(cv2.CAP_PROP_GAIN) if self.source else 0,
+            'auto_exposure': self.source.get_property(cv2.CAP_PROP_AUTO_EXPOSURE) if self.source else 0,
+            'is_capturing': self.is_capturing,
+            'frame_ring': self.frame_ring.get_stats() if self.frame_ring else {},
+            'decode': {
+                'on_demand': self.decode_on_demand,
+                'scale': self.decode_scale,
+                'frames_grabbed': self.frames_grabbed,
+                'frames_decoded': self.frames_decoded
+            }
         }
     
     def cleanup(self) -> None:
@@ -250,26 +406,142 @@ class CameraManager:
         self.stop_capture()
         
         # Release camera
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        if self.source:
+            self.source.release()
+            self.source = None
         
         self.is_initialized = False
-        self.latest_frame = None
+        if self.frame_ring:
+            self.frame_ring.clear()
         
         self.logger.info("Camera cleanup completed")
 
 
-def list_available_cameras(max_cameras: int = 10) -> list:
-    """List available camera devices"""
-    available_cameras = []
+# Discovery results are cached per max_cameras so repeated calls (startup, test_system.py) are
+# instant; entries expire after DISCOVERY_CACHE_TTL seconds so hot-plugged cameras show up
+DISCOVERY_CACHE_TTL = 60.0
+_discovery_cache: Dict[int, Tuple[float, List[Dict[str, Any]]]] = {}  # max_cameras -> (timestamp, cameras)
+_discovery_lock = threading.Lock()
+
+SYSFS_VIDEO_PATH = Path('/sys/class/video4linux')
+
+
+def _read_sysfs(path: Path) -> str:
+    """Read a sysfs attribute, returning '' if it is missing"""
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return ''
+
+
+def _enumerate_video_nodes(max_cameras: int) -> List[Dict[str, Any]]:
+    """List V4L2 capture nodes from sysfs, or plain indices where sysfs is unavailable"""
+    if not SYSFS_VIDEO_PATH.is_dir():
+        return [{'index': i, 'device': i, 'name': '', 'bus_path': ''} for i in range(max_cameras)]
     
-    for i in range(max_cameras):
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            ret, _ = cap.read()
-            if ret:
-                available_cameras.append(i)
-        cap.release()
+    nodes = []
+    for entry in SYSFS_VIDEO_PATH.glob('video*'):
+        try:
+            index = int(entry.name[len('video'):])
+        except ValueError:
+            continue
+        
+        # UVC cameras expose a second metadata node per device; only node 0 captures frames
+        if _read_sysfs(entry / 'index') not in ('', '0'):
+            continue
+        
+        device_link = entry / 'device'
+        nodes.append({
+            'index': index,
+            'device': f'/dev/{entry.name}',
+            'name': _read_sysfs(entry / 'name'),
+            'bus_path': device_link.resolve().name if device_link.exists() else ''
+        })
+    
+    return sorted(nodes, key=lambda node: node['index'])[:max_cameras]
+
+
+def _list_formats(device: Any) -> List[str]:
+    """Query supported pixel formats with v4l2-ctl when it is installed"""
+    if not isinstance(device, str) or not shutil.which('v4l2-ctl'):
+        return []
+    
+    try:
+        result = subprocess.run(['v4l2-ctl', '--list-formats', '-d', device],
+                                capture_output=True, text=True, timeout=2)
+    except (OSError, subprocess.TimeoutExpired):
+        return []
     
-    return available_cameras
+    return re.findall(r"'(\w{3,4})'", result.stdout)
+
+
+def _probe_camera(node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Open a node and read one frame; returns metadata or None if it cannot capture"""
+    cap = cv2.VideoCapture(node['index'])
+    try:
+        if not cap.isOpened():
+            return None
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            return None
+        
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        current_format = ''.join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip('\x00')
+        
+        return {
+            **node,
+            'resolution': (frame.shape[1], frame.shape[0]),
+            'fps': cap.get(cv2.CAP_PROP_FPS),
+            'current_format': current_format,
+            'formats': _list_formats(node['device']) or ([current_format] if current_format else [])
+        }
+    finally:
+        cap.release()
+
+
+def discover_cameras(max_cameras: int = 10, probe_timeout: float = 3.0, refresh: bool = False) -> List[Dict[str, Any]]:
+    """Discover working cameras with metadata, probing candidates concurrently"""
+    with _discovery_lock:
+        cached = _discovery_cache.get(max_cameras)
+        if cached is not None and not refresh and time.time() - cached[0] < DISCOVERY_CACHE_TTL:
+            return list(cached[1])
+        
+        logger = get_logger('camera')
+        nodes = _enumerate_video_nodes(max_cameras)
+        cameras = []
+        
+        # One daemon thread per candidate so a hung device cannot block startup or exit
+        results: Dict[int, Optional[Dict[str, Any]]] = {}
+        
+        def probe(node: Dict[str, Any]) -> None:
+            try:
+                results[node['index']] = _probe_camera(node)
+            except Exception as e:
+                logger.debug(f"Probe of {node['device']} failed: {e}")
+                results[node['index']] = None
+        
+        threads = [threading.Thread(target=probe, args=(node,), daemon=True, name='camera-probe')
+                   for node in nodes]
+        for thread in threads:
+            thread.start()
+        
+        deadline = time.time() + probe_timeout
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.time()))
+        
+        for node in nodes:
+            if node['index'] not in results:
+                logger.warning(f"Camera probe timed out: {node['device']}")
+            elif results[node['index']]:
+                cameras.append(results[node['index']])
+        
+        cameras.sort(key=lambda camera: camera['index'])
+        _discovery_cache[max_cameras] = (time.time(), cameras)
+        
+        logger.info(f"Discovered {len(cameras)} camera(s): {[camera['device'] for camera in cameras]}")
+        return list(cameras)
+
+
+def list_available_cameras(max_cameras: int = 10, refresh: bool = False) -> list:
+    """List available camera device indices"""
+    return [camera['index'] for camera in discover_cameras(max_cameras, refresh=refresh)]
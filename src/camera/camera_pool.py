@@ -0,0 +1,197 @@
+"""
+Camera Pool
+Runs several cameras side by side and schedules their frames into one shared detector
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Optional, Tuple, Dict, Any, List
+from ..utils.logger import get_logger
+from .camera_manager import CameraManager
+from .frame_buffer import BorrowedFrame
+
+
+SCHEDULING_POLICIES = ('round_robin', 'weighted', 'priority')
+
+
+class PooledCamera:
+    """A camera in the pool together with its scheduling state and statistics"""
+
+    def __init__(self, name: str, manager: CameraManager, weight: int = 1, priority: int = 0):
+        self.name = name
+        self.manager = manager
+        self.weight = max(1, int(weight))
+        self.priority = int(priority)
+
+        # Scheduling state
+        self.last_served_seq = 0
+        self.requested_after_seq = 0  # Decode-on-demand: frames up to here predate the last request
+        self.current_weight = 0
+
+        # Statistics
+        self.frames_served = 0
+        self.latencies = deque(maxlen=100)  # Capture-to-result latency (seconds)
+
+    def has_new_frame(self) -> bool:
+        """Check if the camera published a fresh frame the detector has not seen"""
+        return self.manager.get_latest_sequence() > max(self.last_served_seq, self.requested_after_seq)
+
+
+class CameraPool:
+    """Opens N camera sources and hands their frames to one detector fairly"""
+
+    def __init__(self, config: Dict[str, Any], camera_defaults: Optional[Dict[str, Any]] = None):
+        self.config = config
+        self.logger = get_logger('camera_pool')
+
+        self.policy = config.get('policy', 'round_robin')
+        if self.policy not in SCHEDULING_POLICIES:
+            self.logger.warning(f"Unknown scheduling policy '{self.policy}' - using round_robin")
+            self.policy = 'round_robin'
+
+        # Each source inherits the shared camera section and overrides what it needs
+        camera_defaults = camera_defaults or {}
+        sources = config.get('sources') or [dict(camera_defaults, name='camera')]
+        if isinstance(sources, dict):
+            sources = [dict(source or {}, name=name) for name, source in sources.items()]
+
+        self.cameras: List[PooledCamera] = []
+        for index, source in enumerate(sources):
+            camera_config = {**camera_defaults, **source}
+            name = camera_config.get('name', f'camera{index}')
+            self.cameras.append(PooledCamera(
+                name,
+                CameraManager(camera_config),
+                weight=camera_config.get('weight', 1),
+                priority=camera_config.get('priority', 0)
+            ))
+
+        # Capture threads signal here whenever any camera publishes a frame
+        self.frame_available = threading.Condition()
+        self._rr_index = 0
+
+    def initialize(self) -> bool:
+        """Initialize every camera; succeeds if at least one camera is available"""
+        active = []
+        for camera in self.cameras:
+            camera.manager.on_frame = self._notify_frame
+            if camera.manager.initialize():
+                active.append(camera)
+            else:
+                self.logger.error(f"Camera '{camera.name}' failed to initialize - leaving it out of the pool")
+                camera.manager.cleanup()
+
+        self.cameras = active
+        self.logger.info(f"Camera pool ready with {len(active)} camera(s), policy: {self.policy}")
+        return len(active) > 0
+
+    def _notify_frame(self) -> None:
+        """Wake the scheduler (called from capture threads)"""
+        with self.frame_available:
+            self.frame_available.notify_all()
+
+    def wait_for_next_frame(self, timeout: float = 1.0) -> Optional[Tuple[str, BorrowedFrame]]:
+        """Borrow the next unseen frame chosen by the scheduling policy"""
+        deadline = time.time() + timeout
+
+        # Cameras in decode-on-demand mode only decode once someone asks; frames they
+        # decoded for an earlier request are stale and wait for this one instead
+        for camera in self.cameras:
+            camera.requested_after_seq = camera.manager.request_frame()
+
+        while True:
+            with self.frame_available:
+                camera = self._select_camera()
+                while camera is None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return None
+                    self.frame_available.wait(remaining)
+                    camera = self._select_camera()
+
+            borrowed = camera.manager.borrow_after(max(camera.last_served_seq, camera.requested_after_seq))
+            if borrowed is not None:
+                camera.last_served_seq = borrowed.sequence
+                camera.frames_served += 1
+                return camera.name, borrowed
+
+    def _select_camera(self) -> Optional[PooledCamera]:
+        """Pick the camera to serve next among those with a new frame"""
+        ready = [camera for camera in self.cameras if camera.has_new_frame()]
+        if not ready:
+            return None
+
+        if self.policy == 'weighted':
+            return self._select_weighted(ready)
+
+        if self.policy == 'priority':
+            best = min(camera.priority for camera in ready)
+            ready = [camera for camera in ready if camera.priority == best]
+
+        return self._select_round_robin(ready)
+
+    def _select_round_robin(self, ready: List[PooledCamera]) -> PooledCamera:
+        """Serve the first ready camera after the one served last"""
+        count = len(self.cameras)
+        for offset in range(count):
+            camera = self.cameras[(self._rr_index + offset) % count]
+            if camera in ready:
+                self._rr_index = (self.cameras.index(camera) + 1) % count
+                return camera
+        return ready[0]
+
+    def _select_weighted(self, ready: List[PooledCamera]) -> PooledCamera:
+        """Smooth weighted round-robin over the ready cameras"""
+        total_weight = 0
+        for camera in ready:
+            camera.current_weight += camera.weight
+            total_weight += camera.weight
+
+        chosen = max(ready, key=lambda camera: camera.current_weight)
+        chosen.current_weight -= total_weight
+        return chosen
+
+    def set_capture_fps(self, fps: Optional[float]) -> None:
+        """Apply a capture rate cap to every camera"""
+        for camera in self.cameras:
+            camera.manager.set_capture_fps(fps)
+
+    def record_result(self, name: str, capture_timestamp: float) -> None:
+        """Record capture-to-result latency once a frame has been processed"""
+        camera = self.get_camera(name)
+        if camera:
+            camera.latencies.append(time.time() - capture_timestamp)
+
+    def get_camera(self, name: str) -> Optional[PooledCamera]:
+        """Look up a pooled camera by name"""
+        for camera in self.cameras:
+            if camera.name == name:
+                return camera
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-camera fps, latency and drop statistics"""
+        cameras = {}
+        for camera in self.cameras:
+            ring_stats = camera.manager.get_camera_info().get('frame_ring', {})
+            latencies = list(camera.latencies)
+            cameras[camera.name] = {
+                'fps': camera.manager.get_fps(),
+                'frames_served': camera.frames_served,
+                'avg_latency_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+                'max_latency_ms': max(latencies) * 1000 if latencies else 0.0,
+                'dropped_frames': ring_stats.get('dropped_frames', 0),
+                'duplicate_frames': ring_stats.get('duplicate_frames', 0),
+                'overruns': ring_stats.get('overruns', 0)
+            }
+
+        return {'policy': self.policy, 'cameras': cameras}
+
+    def cleanup(self) -> None:
+        """Clean up every camera in the pool"""
+        for camera in self.cameras:
+            camera.manager.cleanup()
+
+        # Release anyone still waiting for a frame
+        self._notify_frame()
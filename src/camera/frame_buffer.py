@@ -0,0 +1,180 @@
+"""
+Frame Ring Buffer
+Preallocated, reference-counted frame slots shared by the capture thread and consumers
+"""
+
+import threading
+import time
+import numpy as np
+from typing import Optional, Tuple, List, Dict, Any
+
+
+class FrameSlot:
+    """Single preallocated frame buffer inside the ring"""
+
+    def __init__(self, index: int, shape: Tuple[int, ...]):
+        self.index = index
+        self.ref_count = 0
+        self.writing = False
+        self.sequence = 0
+        self.timestamp = 0.0
+        self._allocate(np.empty(shape, dtype=np.uint8))
+
+    def _allocate(self, buffer: np.ndarray) -> None:
+        """Attach a buffer to the slot and build its read-only view"""
+        self.buffer = buffer
+        self.readonly = buffer.view()
+        self.readonly.setflags(write=False)
+
+    def adopt(self, frame: np.ndarray) -> None:
+        """Replace the slot buffer when the source produced a different shape"""
+        if frame is not self.buffer:
+            self._allocate(frame)
+
+
+class BorrowedFrame:
+    """Read-only handle on a ring slot, returned to the ring by release()"""
+
+    def __init__(self, ring: 'FrameRingBuffer', slot: FrameSlot):
+        self._ring = ring
+        self._slot = slot
+        self.frame = slot.readonly
+        self.sequence = slot.sequence
+        self.timestamp = slot.timestamp
+
+    def share(self) -> 'BorrowedFrame':
+        """Another handle on the same slot, kept until its own release()"""
+        return self._ring.retain(self._slot)
+
+    def release(self) -> None:
+        """Return the slot to the ring (idempotent)"""
+        if self._slot is not None:
+            self._ring.release(self._slot)
+            self._slot = None
+            self.frame = None
+
+    def __enter__(self) -> 'BorrowedFrame':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+
+class FrameRingBuffer:
+    """Fixed-size ring of preallocated frames written in place by the capture thread"""
+
+    def __init__(self, depth: int, shape: Tuple[int, ...]):
+        # One slot for the latest frame, one being written, the rest for borrowers
+        self.depth = max(2, int(depth))
+        self.lock = threading.Lock()
+        self.slots: List[FrameSlot] = [FrameSlot(i, shape) for i in range(self.depth)]
+        self.latest: Optional[FrameSlot] = None
+        self._next_index = 0
+
+        # Sequencing - consumers wait on the condition for a newer frame
+        self.frame_available = threading.Condition(self.lock)
+        self.sequence = 0
+        self.last_delivered_sequence = 0
+
+        # Statistics
+        self.overruns = 0  # Capture found every slot borrowed
+        self.duplicate_frames = 0  # Same frame handed out again
+        self.dropped_frames = 0  # Frames overwritten before any consumer saw them
+
+    def acquire_write_slot(self) -> Optional[FrameSlot]:
+        """Get a free slot for the capture thread to decode into"""
+        with self.lock:
+            for offset in range(self.depth):
+                slot = self.slots[(self._next_index + offset) % self.depth]
+                if slot.ref_count == 0 and not slot.writing and slot is not self.latest:
+                    slot.writing = True
+                    self._next_index = (slot.index + 1) % self.depth
+                    return slot
+
+            self.overruns += 1
+            return None
+
+    def publish(self, slot: FrameSlot, timestamp: Optional[float] = None) -> int:
+        """Make a freshly written slot the latest frame and wake waiting consumers"""
+        with self.lock:
+            self.sequence += 1
+            slot.sequence = self.sequence
+            slot.timestamp = timestamp if timestamp is not None else time.time()
+            slot.writing = False
+            self.latest = slot
+            self.frame_available.notify_all()
+            return slot.sequence
+
+    def abort_write(self, slot: FrameSlot) -> None:
+        """Return a slot whose capture failed without publishing it"""
+        with self.lock:
+            slot.writing = False
+
+    def borrow_latest(self) -> Optional[BorrowedFrame]:
+        """Borrow the most recent frame without copying it"""
+        with self.lock:
+            if self.latest is None:
+                return None
+            return self._borrow(self.latest)
+
+    def wait_for_next(self, after_sequence: int, timeout: float) -> Optional[BorrowedFrame]:
+        """Block until a frame newer than after_sequence is published, then borrow it"""
+        with self.frame_available:
+            ready = self.frame_available.wait_for(
+                lambda: self.latest is not None and self.latest.sequence > after_sequence,
+                timeout=timeout
+            )
+            if not ready:
+                return None
+            return self._borrow(self.latest)
+
+    def _borrow(self, slot: FrameSlot) -> BorrowedFrame:
+        """Take a reference on a slot and account for skipped or repeated frames (lock held)"""
+        if slot.sequence == self.last_delivered_sequence:
+            self.duplicate_frames += 1
+        elif slot.sequence > self.last_delivered_sequence + 1 and self.last_delivered_sequence > 0:
+            self.dropped_frames += slot.sequence - self.last_delivered_sequence - 1
+        self.last_delivered_sequence = max(self.last_delivered_sequence, slot.sequence)
+        self.frame_available.notify_all()
+
+        slot.ref_count += 1
+        return BorrowedFrame(self, slot)
+
+    def wait_until_consumed(self, timeout: float) -> bool:
+        """Block the producer until the latest frame has been handed to a consumer"""
+        with self.frame_available:
+            return self.frame_available.wait_for(
+                lambda: self.last_delivered_sequence >= self.sequence,
+                timeout=timeout
+            )
+
+    def retain(self, slot: FrameSlot) -> BorrowedFrame:
+        """Take one more reference on an already borrowed slot"""
+        with self.lock:
+            slot.ref_count += 1
+            return BorrowedFrame(self, slot)
+
+    def release(self, slot: FrameSlot) -> None:
+        """Drop one reference on a borrowed slot"""
+        with self.lock:
+            if slot.ref_count > 0:
+                slot.ref_count -= 1
+
+    def clear(self) -> None:
+        """Forget the latest frame so stale data is never handed out"""
+        with self.lock:
+            self.latest = None
+            self.frame_available.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get ring occupancy statistics"""
+        with self.lock:
+            borrowed = sum(1 for slot in self.slots if slot.ref_count > 0)
+        return {
+            'depth': self.depth,
+            'borrowed_slots': borrowed,
+            'overruns': self.overruns,
+            'sequence': self.sequence,
+            'duplicate_frames': self.duplicate_frames,
+            'dropped_frames': self.dropped_frames
+        }
@@ -0,0 +1,348 @@
+"""
+Frame Sources
+Pluggable frame producers: live V4L2 devices, video files and image directories
+"""
+
+import cv2
+import numpy as np
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Tuple, Dict, Any, List
+from ..utils.logger import get_logger
+
+
+PACING_MODES = ('realtime', 'fast')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# JPEG decoder flags that decode straight to a reduced resolution (DCT scaling)
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+
+class FrameSource(ABC):
+    """Base interface for anything the capture thread can read frames from"""
+
+    is_live = False
+    lockstep = False  # Producer waits for every frame to be consumed (no drops)
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.logger = get_logger('frame_source')
+
+    @abstractmethod
+    def open(self) -> bool:
+        """Open the source; returns False if it cannot be used"""
+
+    @abstractmethod
+    def is_opened(self) -> bool:
+        """Check if the source can still produce frames"""
+
+    @abstractmethod
+    def grab(self) -> bool:
+        """Advance to the next frame without decoding it"""
+
+    @abstractmethod
+    def retrieve(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Decode the last grabbed frame, into image when its shape matches"""
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Grab and decode the next frame"""
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def enable_reduced_decode(self, scale: int) -> bool:
+        """Decode frames at 1/scale resolution; returns False if unsupported"""
+        return scale == 1
+
+    def set_property(self, prop_id: int, value: float) -> bool:
+        """Set a capture property; replay sources ignore hardware settings"""
+        return False
+
+    def get_property(self, prop_id: int) -> float:
+        """Get a capture property"""
+        return 0.0
+
+    @abstractmethod
+    def release(self) -> None:
+        """Release the source"""
+
+    def describe(self) -> str:
+        """Human readable description for logs"""
+        return self.__class__.__name__
+
+    @staticmethod
+    def _into(image: Optional[np.ndarray], frame: np.ndarray) -> np.ndarray:
+        """Copy a decoded frame into the caller's buffer when shapes match"""
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return image
+        return frame
+
+
+class DeviceFrameSource(FrameSource):
+    """Live camera opened through cv2.VideoCapture (V4L2 on Linux)"""
+
+    is_live = True
+
+    def __init__(self, config: Dict[str, Any], device_id: Any = 0):
+        super().__init__(config)
+        self.device_id = device_id
+        self.cap = None
+
+        # Raw MJPEG mode: the driver hands over compressed frames and we decode them
+        self.raw_mjpeg = False
+        self.decode_flag = cv2.IMREAD_COLOR
+
+    def open(self) -> bool:
+        self.cap = cv2.VideoCapture(self.device_id)
+        return self.cap.isOpened()
+
+    def enable_reduced_decode(self, scale: int) -> bool:
+        if scale not in REDUCED_DECODE_FLAGS:
+            return False
+        if scale == 1:
+            return True
+
+        # CAP_PROP_FORMAT -1 asks the V4L2 backend for the undecoded MJPEG buffer
+        if not self.cap.set(cv2.CAP_PROP_FORMAT, -1):
+            return False
+
+        self.raw_mjpeg = True
+        self.decode_flag = REDUCED_DECODE_FLAGS[scale]
+        return True
+
+    def is_opened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def grab(self) -> bool:
+        return self.cap.grab()
+
+    def retrieve(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.raw_mjpeg:
+            return self.cap.retrieve(image=image)
+
+        ret, encoded = self.cap.retrieve()
+        if not ret or encoded is None:
+            return False, None
+
+        if encoded.ndim == 3:
+            # Backend accepted the property but still decodes - stop expecting raw buffers
+            self.logger.warning("Camera backend does not deliver raw MJPEG - decoding at full scale")
+            self.raw_mjpeg = False
+            return True, self._into(image, encoded)
+
+        frame = cv2.imdecode(encoded, self.decode_flag)
+        if frame is None:
+            return False, None
+        return True, self._into(image, frame)
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.raw_mjpeg:
+            return super().read(image)
+        return self.cap.read(image=image)
+
+    def set_property(self, prop_id: int, value: float) -> bool:
+        return self.cap.set(prop_id, value)
+
+    def get_property(self, prop_id: int) -> float:
+        return self.cap.get(prop_id)
+
+    def release(self) -> None:
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+    def describe(self) -> str:
+        return f"camera {self.device_id}"
+
+
+class ReplayFrameSource(FrameSource):
+    """Common pacing and looping for recorded sources"""
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.path = Path(config.get('path', ''))
+        self.loop = config.get('loop', False)
+        self.pacing = config.get('pacing', 'realtime')
+        if self.pacing not in PACING_MODES:
+            self.logger.warning(f"Unknown pacing mode '{self.pacing}' - using realtime")
+            self.pacing = 'realtime'
+
+        # "fast" replays every frame as soon as the pipeline takes the previous one
+        self.lockstep = self.pacing == 'fast'
+        self.replay_fps = float(config.get('fps', 30))
+        self.frames_delivered = 0
+        self._start_time = None
+
+    def _pace(self) -> None:
+        """Sleep until the next frame is due when replaying in real time"""
+        if self.pacing != 'realtime' or self.replay_fps <= 0:
+            return
+
+        if self._start_time is None:
+            self._start_time = time.time()
+
+        due_time = self._start_time + self.frames_delivered / self.replay_fps
+        delay = due_time - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _restart_pacing(self) -> None:
+        """Reset the pacing clock (start of stream or loop)"""
+        self._start_time = None
+        self.frames_delivered = 0
+
+    def describe(self) -> str:
+        return f"{self.path} ({self.pacing})"
+
+
+class VideoFileFrameSource(ReplayFrameSource):
+    """Replays a recorded video file"""
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.cap = None
+
+    def open(self) -> bool:
+        if not self.path.is_file():
+            self.logger.error(f"Video file not found: {self.path}")
+            return False
+
+        self.cap = cv2.VideoCapture(str(self.path))
+        if not self.cap.isOpened():
+            return False
+
+        # Pace at the recorded rate unless one is configured
+        if 'fps' not in self.config:
+            recorded_fps = self.cap.get(cv2.CAP_PROP_FPS)
+            if recorded_fps > 0:
+                self.replay_fps = recorded_fps
+
+        self._restart_pacing()
+        return True
+
+    def is_opened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def grab(self) -> bool:
+        self._pace()
+        if self.cap.grab():
+            self.frames_delivered += 1
+            return True
+
+        if not self.loop:
+            self.logger.info(f"End of video file: {self.path}")
+            self.release()
+            return False
+
+        # Rewind and continue from the first frame
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self._restart_pacing()
+        if self.cap.grab():
+            self.frames_delivered += 1
+            return True
+        return False
+
+    def retrieve(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        return self.cap.retrieve(image=image)
+
+    def get_property(self, prop_id: int) -> float:
+        return self.cap.get(prop_id) if self.cap else 0.0
+
+    def release(self) -> None:
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageDirectoryFrameSource(ReplayFrameSource):
+    """Replays a directory of still images in file name order"""
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.image_paths: List[Path] = []
+        self.index = 0
+        self.opened = False
+        self.frame_size = (0, 0)
+        self.decode_flag = cv2.IMREAD_COLOR
+
+    def open(self) -> bool:
+        if not self.path.is_dir():
+            self.logger.error(f"Image directory not found: {self.path}")
+            return False
+
+        self.image_paths = sorted(
+            p for p in self.path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS
+        )
+        if not self.image_paths:
+            self.logger.error(f"No images found in {self.path}")
+            return False
+
+        self.index = -1
+        self.opened = True
+        self._restart_pacing()
+        return True
+
+    def enable_reduced_decode(self, scale: int) -> bool:
+        if scale not in REDUCED_DECODE_FLAGS:
+            return False
+        self.decode_flag = REDUCED_DECODE_FLAGS[scale]
+        return True
+
+    def is_opened(self) -> bool:
+        return self.opened
+
+    def grab(self) -> bool:
+        self._pace()
+        if self.index + 1 >= len(self.image_paths):
+            if not self.loop:
+                self.logger.info(f"End of image directory: {self.path}")
+                self.release()
+                return False
+            self.index = -1
+            self._restart_pacing()
+
+        self.index += 1
+        self.frames_delivered += 1
+        return True
+
+    def retrieve(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        frame = cv2.imread(str(self.image_paths[self.index]), self.decode_flag)
+        if frame is None:
+            self.logger.warning(f"Unreadable image skipped: {self.image_paths[self.index]}")
+            return False, None
+
+        self.frame_size = (frame.shape[1], frame.shape[0])
+        return True, self._into(image, frame)
+
+    def get_property(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.frame_size[0])
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.frame_size[1])
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.replay_fps
+        return 0.0
+
+    def release(self) -> None:
+        self.opened = False
+
+
+def create_frame_source(config: Dict[str, Any], device_id: Any = 0) -> FrameSource:
+    """Build the frame source described by a camera 'source' section"""
+    source_type = config.get('type', 'device')
+
+    if source_type == 'device':
+        return DeviceFrameSource(config, config.get('device_id', device_id))
+    if source_type == 'video':
+        return VideoFileFrameSource(config)
+    if source_type == 'images':
+        return ImageDirectoryFrameSource(config)
+
+    raise ValueError(f"Unknown frame source type: {source_type}")
@@ -0,0 +1,151 @@
+"""
+Inference Backends
+Common interface and registry for the runtimes a Detector can run models on
+"""
+
+import importlib
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple, Type
+from ..utils.logger import get_logger
+
+
+# detection.backend name -> (module, class); imported lazily so missing runtimes cost nothing
+BACKEND_REGISTRY = {
+    'hailo': ('.hailo_backend', 'HailoBackend'),
+    'onnxruntime': ('.onnxruntime_backend', 'OnnxRuntimeBackend'),
+    'tflite': ('.tflite_backend', 'TFLiteBackend'),
+    'opencv': ('.opencv_backend', 'OpenCVDnnBackend')
+}
+
+
+class InferenceBackend(ABC):
+    """Runs letterboxed uint8 NHWC RGB batches and returns raw output tensors
+
+    Preprocessing and post-processing are shared by every backend and live in
+    the Detector; a backend only converts the input to what its runtime wants
+    and hands back {output name: tensor with a leading batch axis}.
+    """
+
+    name = 'base'
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config  # The whole detection section; backends read their own sub-section
+        self.logger = get_logger(f'{self.name}_backend')
+
+        # Filled in by initialize() from model metadata where the runtime provides it
+        self.input_size: Optional[Tuple[int, int]] = None  # (width, height)
+        self.output_format: Optional[str] = None
+        self.max_batch_size: Optional[int] = None  # None = any batch size
+        self.startup_times: Dict[str, float] = {}
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Check if the runtime libraries are installed"""
+        return True
+
+    @property
+    def supports_dynamic_input(self) -> bool:
+        """Whether the model accepts any input size; fixed models (every HEF) report input_size"""
+        return self.input_size is None
+
+    @abstractmethod
+    def initialize(self) -> bool:
+        """Load the model; returns False if this backend cannot be used"""
+
+    @abstractmethod
+    def infer(self, input_batch: np.ndarray) -> Dict[str, Any]:
+        """Run a [N, H, W, 3] uint8 batch"""
+
+    def release(self) -> None:
+        """Free the runtime's resources"""
+        pass
+
+    def get_info(self) -> Dict[str, Any]:
+        """Describe the loaded model and settings"""
+        return {'startup_ms': {stage: seconds * 1000 for stage, seconds in self.startup_times.items()}}
+
+
+def get_backend_class(name: str) -> Type[InferenceBackend]:
+    """Look up a backend class by its detection.backend name"""
+    if name not in BACKEND_REGISTRY:
+        raise ValueError(f"Unknown detection backend: {name} (choose from {', '.join(BACKEND_REGISTRY)})")
+
+    module_name, class_name = BACKEND_REGISTRY[name]
+    module = importlib.import_module(module_name, __package__)
+    return getattr(module, class_name)
+
+
+def create_backend(name: str, config: Dict[str, Any]) -> InferenceBackend:
+    """Instantiate a registered backend with the detection configuration"""
+    return get_backend_class(name)(config)
+
+
+def available_backends() -> List[str]:
+    """Names of the backends whose runtimes are installed, in preference order"""
+    return [name for name in BACKEND_REGISTRY if get_backend_class(name).is_available()]
+
+
+def measure_latency(backend: InferenceBackend, input_size: Tuple[int, int], iterations: int = 10) -> float:
+    """Median milliseconds for one frame on an initialized backend (after one warm-up call)"""
+    input_width, input_height = input_size
+    input_batch = np.random.randint(0, 256, (1, input_height, input_width, 3), dtype=np.uint8)
+
+    backend.infer(input_batch)  # First call pays lazy allocation and kernel selection
+    timings = []
+    for _ in range(max(1, iterations)):
+        start_time = time.perf_counter()
+        backend.infer(input_batch)
+        timings.append(time.perf_counter() - start_time)
+    return float(np.median(timings) * 1000)
+
+
+def select_backend(config: Dict[str, Any], default_input_size: Tuple[int, int], latency_budget_ms: float,
+                   iterations: int = 10) -> Tuple[Optional[InferenceBackend], Dict[str, Optional[float]]]:
+    """Benchmark every available backend and keep the fastest one within the latency budget
+
+    Pre- and post-processing are shared, so only the inference call is timed.
+    Backends are initialized one at a time and released as soon as a faster one
+    is found. If none meets the budget the fastest is used anyway. Returns the
+    chosen backend (None if nothing initialized) and {name: median ms or None}.
+    """
+    logger = get_logger('backend_select')
+    timings: Dict[str, Optional[float]] = {}
+    best = None
+    best_ms = float('inf')
+
+    for name in available_backends():
+        backend = create_backend(name, config)
+        if not backend.initialize():
+            backend.release()
+            timings[name] = None
+            continue
+
+        try:
+            latency_ms = measure_latency(backend, backend.input_size or default_input_size, iterations)
+        except Exception as e:
+            logger.warning(f"Benchmark of {name} backend failed: {e}")
+            backend.release()
+            timings[name] = None
+            continue
+
+        timings[name] = latency_ms
+        logger.info(f"Backend {name}: {latency_ms:.1f}ms per frame")
+
+        if latency_ms < best_ms:
+            if best is not None:
+                best.release()
+            best, best_ms = backend, latency_ms
+        else:
+            backend.release()
+
+    if best is None:
+        return None, timings
+
+    if best_ms > latency_budget_ms:
+        logger.warning(f"No backend meets the {latency_budget_ms:.0f}ms latency budget - "
+                       f"using the fastest ({best.name}, {best_ms:.1f}ms)")
+    else:
+        logger.info(f"Selected {best.name} backend ({best_ms:.1f}ms, budget {latency_budget_ms:.0f}ms)")
+    return best, timings
@@ -0,0 +1,199 @@
+"""
+Cascade Detector
+A cheap always-on first stage that only wakes the full model when it sees a vehicle candidate
+"""
+
+import time
+import numpy as np
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from ..utils.logger import get_logger
+from .detector import Detector
+
+
+CASCADE_MODES = ('frame', 'crop')
+
+# Stage-one settings that make no sense for a quick candidate check
+STAGE1_DISABLED = {'tiling': {}, 'async_pipeline': {}, 'record_outputs': None}
+
+
+class CascadeDetector:
+    """Two-stage detection: stage one proposes candidates, stage two confirms them
+
+    Stage one is a tiny model (or the same model at a smaller input size) run on
+    every frame with a low threshold. Stage two is the configured detector, run
+    only on frames where stage one proposed a candidate: on the whole frame, or
+    on padded crops around the candidates.
+    """
+
+    def __init__(self, config: Dict[str, Any], backend: Optional[str] = None):
+        self.config = config
+        self.logger = get_logger('cascade_detector')
+
+        cascade_config = config.get('cascade', {})
+        self.mode = cascade_config.get('mode', 'frame')
+        if self.mode not in CASCADE_MODES:
+            raise ValueError(f"Unknown cascade mode: {self.mode}")
+        self.crop_padding = cascade_config.get('crop_padding', 0.25)
+        self.max_crops = cascade_config.get('max_crops', 4)
+
+        # Both stages on one Hailo device share its VDevice under the round-robin scheduler
+        # (HailoRT allows neither two VDevices nor two manually activated network groups)
+        stage2_config = {**config, 'hailo_scheduler': True}
+        
+        # Stage one inherits the detection section, overridden by cascade.stage1
+        stage1_overrides = cascade_config.get('stage1', {})
+        stage1_config = {
+            **stage2_config,
+            'input_resolution': {'width': 320, 'height': 320},
+            'min_confidence': cascade_config.get('candidate_threshold', 0.3),
+            'classes': cascade_config.get('candidate_classes', ['car', 'bus', 'truck']),
+            **STAGE1_DISABLED,
+            **stage1_overrides
+        }
+        # A backend override applies to both stages unless stage one names its own
+        self.stage1 = Detector(stage1_config, None if 'backend' in stage1_overrides else backend)
+        self.stage2 = Detector(stage2_config, backend)
+
+        # Statistics
+        self.frames = 0
+        self.candidate_frames = 0
+        self.confirmed_frames = 0
+        self.stage1_time = 0.0
+        self.stage2_time = 0.0
+        self.stage2_runs = 0
+        self.crops_inferred = 0
+
+    def initialize(self) -> bool:
+        """Load both stages"""
+        if not self.stage1.initialize():
+            self.logger.error("Failed to initialize cascade stage one")
+            return False
+        if not self.stage2.initialize():
+            self.logger.error("Failed to initialize cascade stage two")
+            return False
+
+        # A fixed-size model (every HEF) ignores input_resolution, so without its own model
+        # stage one would be stage two again and candidate frames would pay for it twice
+        if self._stage_model(self.stage1) == self._stage_model(self.stage2):
+            self.logger.error(
+                f"Cascade stage one resolves to the same model as stage two ({self.stage1.backend.name} "
+                f"{self.stage1.backend.get_info().get('model_path')} at {self.stage1._get_input_size()}) - "
+                f"set a smaller model in detection.cascade.stage1"
+            )
+            self.cleanup()
+            return False
+
+        self.logger.info(
+            f"Cascade initialized: stage one on {self.stage1.backend.name} "
+            f"({self.stage1.min_confidence:.2f} candidate threshold), stage two on {self.stage2.backend.name} "
+            f"({self.mode} mode)"
+        )
+        return True
+
+    @staticmethod
+    def _stage_model(stage: Detector) -> Tuple[str, Any, Tuple[int, int]]:
+        """What a stage actually runs: backend, model file and input size"""
+        return stage.backend.name, stage.backend.get_info().get('model_path'), stage._get_input_size()
+
+    def detect(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+        """Run stage one, and stage two only if it proposed a candidate"""
+        start_time = time.time()
+        candidates = self.stage1.detect(frame)
+        stage1_done = time.time()
+        self.frames += 1
+        self.stage1_time += stage1_done - start_time
+
+        if not candidates:
+            return []
+        self.candidate_frames += 1
+
+        if self.mode == 'crop' and len(candidates) <= self.max_crops:
+            detections = self._detect_crops(frame, candidates)
+        else:
+            detections = self.stage2.detect(frame)
+
+        self.stage2_runs += 1
+        self.stage2_time += time.time() - stage1_done
+        if detections:
+            self.confirmed_frames += 1
+        return detections
+
+    def _detect_crops(self, frame: np.ndarray, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run stage two on a padded crop around each candidate"""
+        frame_height, frame_width = frame.shape[:2]
+        crops = []
+        for candidate in candidates:
+            x1, y1, x2, y2 = candidate['bbox']
+            pad_x = (x2 - x1) * self.crop_padding
+            pad_y = (y2 - y1) * self.crop_padding
+            crop_x1 = max(0, int(x1 - pad_x))
+            crop_y1 = max(0, int(y1 - pad_y))
+            crop_x2 = min(frame_width, int(np.ceil(x2 + pad_x)))
+            crop_y2 = min(frame_height, int(np.ceil(y2 + pad_y)))
+            if crop_x2 <= crop_x1 or crop_y2 <= crop_y1:
+                continue
+
+            crops.append((frame[crop_y1:crop_y2, crop_x1:crop_x2], (crop_x1, crop_y1)))
+        self.crops_inferred += len(crops)
+
+        # Crops batch like ROIs; neighbouring crops overlap and can confirm the same
+        # vehicle twice, which the array merge suppresses before any dicts are built
+        return self.stage2._detect_regions(crops) if crops else []
+
+    def quality_settings(self) -> Tuple[str, ...]:
+        """Quality tiers act on stage two"""
+        return self.stage2.quality_settings()
+
+    def apply_quality(self, settings: Dict[str, Any]) -> None:
+        """Quality tiers change stage two; stage one is already the cheap pass"""
+        self.stage2.apply_quality(settings)
+    
+    def start_async(self, queue_size: Optional[int] = None) -> bool:
+        """The cascade runs synchronously; stage two depends on stage one's result"""
+        self.logger.info("Cascade detection runs synchronously - ignoring async_pipeline")
+        return False
+
+    def stop_async(self) -> None:
+        """Nothing to stop"""
+        pass
+
+    def submit(self, frame: np.ndarray, context: Any = None,
+               callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """Detect synchronously and hand back an already resolved future"""
+        future = Future()
+        if callback:
+            future.add_done_callback(callback)
+        future.set_result(self.detect(frame))
+        return future
+
+    def get_performance_stats(self) -> Dict[str, Any]:
+        """Per-stage hit rates and latency, plus each stage's detector statistics"""
+        total_time = self.stage1_time + self.stage2_time
+        stats = {
+            'backend': self.stage2.backend.name if self.stage2.backend else None,
+            'avg_inference_time': (total_time / self.frames) if self.frames else 0.0,
+            'total_inferences': self.frames,
+            'cascade': {
+                'mode': self.mode,
+                'frames': self.frames,
+                'candidate_frames': self.candidate_frames,
+                # Fraction of frames that woke stage two
+                'stage1_hit_rate': (self.candidate_frames / self.frames) if self.frames else 0.0,
+                # Fraction of stage-two runs that confirmed a detection
+                'stage2_confirm_rate': (self.confirmed_frames / self.stage2_runs) if self.stage2_runs else 0.0,
+                'stage1_ms': (self.stage1_time / self.frames * 1000) if self.frames else 0.0,
+                'stage2_ms': (self.stage2_time / self.stage2_runs * 1000) if self.stage2_runs else 0.0,
+                'crops_inferred': self.crops_inferred
+            },
+            'stage1': self.stage1.get_performance_stats(),
+            'stage2': self.stage2.get_performance_stats()
+        }
+        if self.frames and total_time > 0:
+            stats['fps'] = self.frames / total_time
+        return stats
+
+    def cleanup(self) -> None:
+        """Release both stages"""
+        self.stage1.cleanup()
+        self.stage2.cleanup()
@@ -0,0 +1,563 @@
+"""
+Object Detector
+Real-time object detection on a pluggable inference backend (Hailo, OpenCV DNN, ONNX Runtime, TFLite)
+"""
+
+import numpy as np
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from ..utils.logger import get_logger
+from ..utils.latency_histogram import StageTimers
+from .roi import load_rois
+from .tiling import load_tiling
+from .inference_pipeline import AsyncInferencePipeline
+from .preprocess import Letterbox, LetterboxPreprocessor, InputBufferPool
+from .backend import InferenceBackend, BACKEND_REGISTRY, create_backend, select_backend
+from .postprocess import (
+    OUTPUT_FORMATS, NMS_METHODS, decode_output, suppress_boxes, build_detections, resolve_class_filter,
+    host_nms_required, detect_output_format, save_recorded_outputs
+)
+
+
+# Stages with a latency histogram: letterbox resize and channel swap, backend call, output
+# decode, per-output NMS, cross-region merge NMS and the whole detect() call
+TIMED_STAGES = ('resize', 'color_convert', 'infer', 'decode', 'nms', 'merge', 'detect')
+
+
+class Detector:
+    """Object detection with shared pre/post-processing on a selectable backend"""
+    
+    def __init__(self, config: Dict[str, Any], backend: Optional[str] = None):
+        self.config = config
+        self.logger = get_logger('detector')
+        
+        # Backend: a registered name, or 'auto' to benchmark the available ones at startup
+        self.backend_name = backend or config.get('backend', 'hailo')
+        if self.backend_name != 'auto' and self.backend_name not in BACKEND_REGISTRY:
+            raise ValueError(f"Unknown detection backend: {self.backend_name}")
+        self.fallback_backends = config.get('fallback_backends', ['opencv'])
+        self.latency_budget_ms = config.get('latency_budget_ms', 100)
+        self.backend: Optional[InferenceBackend] = None
+        self.backend_timings: Dict[str, Optional[float]] = {}  # auto mode: name -> median ms (None = unusable)
+        
+        # Batching (capped at what the backend's model accepts once it is loaded)
+        self.batch_size = max(1, config.get('batch_size', 1))
+        self.max_batch_wait = config.get('batch_max_wait_ms', 5) / 1000.0
+        
+        # Detection parameters
+        self.min_confidence = config.get('min_confidence', 0.7)
+        self.nms_threshold = config.get('nms_threshold', 0.45)
+        self.nms_method = config.get('nms_method', 'hard')  # hard or soft (Gaussian score decay)
+        if self.nms_method not in NMS_METHODS:
+            raise ValueError(f"Unknown NMS method: {self.nms_method}")
+        self.class_aware_nms = config.get('class_aware_nms', True)  # Only same-class boxes suppress each other
+        self.soft_nms_sigma = config.get('soft_nms_sigma', 0.5)
+        self.input_resolution = config.get('input_resolution', {'width': 640, 'height': 640})
+        self.input_size = None  # (width, height) from the model, else input_resolution
+        
+        # Output layout: yolov5, yolov8, hailo_nms or auto (from model metadata / tensor shape)
+        self.output_format = config.get('output_format', 'auto')
+        if self.output_format not in OUTPUT_FORMATS + ('auto',):
+            raise ValueError(f"Unknown output format: {self.output_format}")
+        
+        # Optional recording of raw output tensors for offline parser checks
+        self.record_outputs = config.get('record_outputs')
+        self.record_limit = config.get('record_limit', 20)
+        self.recorded_outputs = 0
+        
+        # Regions of interest - only these parts of the frame are inferred
+        self.rois = load_rois(config.get('roi'))
+        self.configured_rois = self.rois
+        
+        # Optional tiled pass over the frame (or each ROI) at native resolution, every k frames
+        self.tiling_config = config.get('tiling', {})
+        self.tile_grid = None
+        self.tile_scheduler = None
+        self.tiling_active = True  # Switched off by a degraded quality tier
+        
+        # Letterbox preprocessing into preallocated uint8 input buffers (sized once the model is loaded)
+        self.preprocessor = None
+        self.input_buffers = None
+        self._batch_buffer = None
+        
+        # Optional asynchronous submission (preprocess / infer / postprocess overlap)
+        self.async_config = config.get('async_pipeline', {})
+        self.async_pipeline = None
+        
+        self.class_names = self._get_coco_class_names()  # Default COCO classes
+        
+        # Class whitelist - only these score columns are decoded (None = all classes)
+        self.class_filter = resolve_class_filter(config.get('classes'), self.class_names)
+        if self.class_filter is not None:
+            self.logger.info(f"Decoding classes: {[self.class_names[i] for i in self.class_filter.tolist()]}")
+        
+        # Performance tracking
+        self.total_inferences = 0
+        self.total_inference_time = 0.0
+        self.startup_times = {}  # One-off costs: model load, configure, activation
+        self.first_inference_time = 0.0
+        self.stage_times = {'preprocess': 0.0, 'infer': 0.0, 'postprocess': 0.0}
+        self.stage_timers = StageTimers(TIMED_STAGES)  # perf_counter_ns histograms, always on
+        
+    def initialize(self) -> bool:
+        """Load the configured backend (or the fastest one in auto mode)"""
+        if self.backend_name == 'auto':
+            self.backend, self.backend_timings = select_backend(
+                self.config, self._default_input_size(), self.latency_budget_ms,
+                self.config.get('backend_benchmark_iterations', 10)
+            )
+        else:
+            candidates = [self.backend_name] + [name for name in self.fallback_backends if name != self.backend_name]
+            self.backend = self._open_backend(candidates)
+        
+        if self.backend is None:
+            self.logger.error("No usable detection backend - install HailoRT, ONNX Runtime or TFLite, "
+                              "or provide an ONNX model under detection.opencv.model_path")
+            return False
+        
+        self._setup_backend()
+        self.logger.info(
+            f"Detector initialized on {self.backend.name} backend (startup: "
+            + ", ".join(f"{stage} {seconds * 1000:.0f}ms" for stage, seconds in self.startup_times.items())
+            + ")"
+        )
+        return True
+    
+    def _open_backend(self, names: List[str]) -> Optional[InferenceBackend]:
+        """First backend in names that initializes"""
+        for name in names:
+            backend = create_backend(name, self.config)
+            if not backend.is_available():
+                self.logger.warning(f"{name} backend not available")
+                continue
+            if backend.initialize():
+                return backend
+            backend.release()
+            self.logger.info(f"{name} backend failed to initialize - trying the next one")
+        return None
+    
+    def _setup_backend(self) -> None:
+        """Adopt the loaded model's input size, output layout and batch limit"""
+        self.input_size = self.backend.input_size or self._default_input_size()
+        if self.output_format == 'auto' and self.backend.output_format:
+            self.output_format = self.backend.output_format
+        if self.backend.max_batch_size and self.batch_size > self.backend.max_batch_size:
+            self.logger.info(f"{self.backend.name} model takes at most {self.backend.max_batch_size} inputs per call")
+            self.batch_size = self.backend.max_batch_size
+        
+        self.startup_times = dict(self.backend.startup_times)
+        self.tile_grid, self.tile_scheduler = load_tiling(self.tiling_config, self.input_size)
+        self._setup_preprocessing()
+    
+    def detect(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+        """Run object detection on frame, restricted to the configured ROIs"""
+        start_ns = time.perf_counter_ns()
+        try:
+            return self._detect_frame(frame)
+        finally:
+            self.stage_timers.record('detect', time.perf_counter_ns() - start_ns)
+    
+    def _detect_frame(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+        """Detect the frame's ROIs (or the whole frame), plus its tiles on tiled frames"""
+        return self._detect_regions(self._frame_regions(frame), self._tiled_frame(), self.rois)
+    
+    def _tiled_frame(self) -> bool:
+        """Advance the tile scheduler; True when this frame also gets the tiled pass"""
+        return self.tile_scheduler is not None and self.tiling_active and self.tile_scheduler.next_frame()
+    
+    def _frame_regions(self, frame: np.ndarray) -> List[Tuple[np.ndarray, Tuple[int, int]]]:
+        """Each ROI crop (a view for rectangles) with its frame offset, or the whole frame"""
+        return [roi.crop(frame) for roi in self.rois] if self.rois else [(frame, (0, 0))]
+    
+    def start_async(self, queue_size: Optional[int] = None) -> bool:
+        """Start the asynchronous pipeline used by submit()"""
+        if not self._backend_ready():
+            self.logger.warning("Async inference needs an initialized backend - using synchronous detect()")
+            return False
+        
+        if self.async_pipeline is None:
+            self.async_pipeline = AsyncInferencePipeline(
+                self._prepare_inputs, self._run_batch, self._finish_job,
+                queue_size or self.async_config.get('queue_size', 2),
+                self.batch_size, self.max_batch_wait, release=self._release_inputs
+            )
+        self.async_pipeline.start()
+        return True
+    
+    def stop_async(self) -> None:
+        """Stop the asynchronous pipeline; queued frames are cancelled"""
+        if self.async_pipeline:
+            self.async_pipeline.stop()
+    
+    def submit(self, frame: np.ndarray, context: Any = None,
+               callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """Submit a frame for detection; the future resolves to its detections
+        
+        Preprocessing happens before this returns, so the frame may be released
+        (or its buffer reused) as soon as submit() comes back.
+        """
+        if self.async_pipeline is None or not self.async_pipeline.running:
+            # No pipeline - run synchronously and hand back an already resolved future
+            future = Future()
+            if callback:
+                future.add_done_callback(callback)
+            future.set_result(self.detect(frame))
+            return future
+        
+        return self.async_pipeline.submit(frame, context, callback)
+    
+    def quality_settings(self) -> Tuple[str, ...]:
+        """Quality tier settings apply_quality can act on with the loaded backend"""
+        if self._backend_ready() and self.backend.supports_dynamic_input:
+            return ('tiling', 'input_size', 'roi')
+        return ('tiling', 'roi')
+    
+    def apply_quality(self, settings: Dict[str, Any]) -> None:
+        """Switch to a quality tier's tiling, input size and ROIs (absent keys restore the configured ones)"""
+        if not self._backend_ready():
+            return
+        
+        # Queued frames were letterboxed for the old settings - drop them and restart on the new ones
+        restart = self.async_pipeline is not None and self.async_pipeline.running
+        if restart:
+            self.async_pipeline.stop()
+        
+        self.tiling_active = settings.get('tiling', True)
+        self.rois = load_rois(settings['roi']) if settings.get('roi') else self.configured_rois
+        
+        input_size = settings.get('input_size')
+        if input_size and not self.backend.supports_dynamic_input:
+            self.logger.debug(f"{self.backend.name} model has a fixed input size - ignoring input_size {input_size}")
+            input_size = None
+        if isinstance(input_size, dict):
+            input_size = (input_size['width'], input_size['height'])
+        elif input_size:
+            input_size = (input_size, input_size)
+        self.input_size = input_size or self.backend.input_size or self._default_input_size()
+        self._setup_preprocessing()
+        
+        if restart:
+            self.async_pipeline.start()
+    
+    def _prepare_inputs(self, frame: np.ndarray, tiled: Optional[bool] = None) -> List[Tuple[np.ndarray, Tuple[int, int], Tuple[int, ...], Letterbox]]:
+        """Preprocess each ROI (or the whole frame), plus its tiles on tiled frames, for the model"""
+        return self._prepare_regions(self._frame_regions(frame), tiled)
+    
+    def _prepare_regions(self, regions: List[Tuple[np.ndarray, Tuple[int, int]]],
+                         tiled: Optional[bool] = None) -> List[Tuple[np.ndarray, Tuple[int, int], Tuple[int, ...], Letterbox]]:
+        """Preprocess regions (with their frame offsets), plus their tiles on tiled frames, for the model"""
+        # Cascade crops can outnumber the ROIs the pool was sized for
+        self.input_buffers.reserve(self._buffer_count(len(regions)))
+        prepared = [self._prepare_input(region, offset) for region, offset in regions]
+        
+        if tiled is None:
+            tiled = self._tiled_frame()
+        if tiled:
+            tiles = [self.tile_grid.tiles(region.shape) for region, _ in regions]
+            tile_count = sum(len(region_tiles) for region_tiles in tiles)
+            self.input_buffers.reserve(self._buffer_count(len(regions) + tile_count))
+            self.tile_scheduler.record(tile_count)
+            
+            # Tiles are views of the region, letterboxed like any other input
+            for (region, (offset_x, offset_y)), region_tiles in zip(regions, tiles):
+                for x1, y1, x2, y2 in region_tiles:
+                    prepared.append(self._prepare_input(region[y1:y2, x1:x2], (offset_x + x1, offset_y + y1)))
+        return prepared
+    
+    def _prepare_input(self, region: np.ndarray, offset: Tuple[int, int]) -> Tuple[np.ndarray, Tuple[int, int], Tuple[int, ...], Letterbox]:
+        """Letterbox a region into a pooled input buffer: (input tensor, offset, region shape, letterbox)"""
+        input_tensor = self.input_buffers.acquire(timeout=5.0)
+        try:
+            letterbox = self.preprocessor.letterbox(region, input_tensor)
+        except Exception:
+            self.input_buffers.release(input_tensor)
+            raise
+        return input_tensor, offset, region.shape, letterbox
+    
+    def _run_batch(self, prepared: List[Tuple[np.ndarray, Tuple[int, int], Tuple[int, ...], Letterbox]]) -> List[Tuple[Any, Tuple[int, int], Tuple[int, ...], Letterbox]]:
+        """Run up to batch_size prepared inputs in one backend call and split the results"""
+        try:
+            if len(prepared) == 1:
+                input_batch = prepared[0][0]
+            else:
+                # Gather into the preallocated batch tensor rather than a new array
+                input_batch = self._batch_buffer[:len(prepared)]
+                np.concatenate([item[0] for item in prepared], out=input_batch)
+            start_ns = time.perf_counter_ns()
+            outputs = self._infer(input_batch)
+            self.stage_timers.record('infer', time.perf_counter_ns() - start_ns)
+        finally:
+            # The backend has consumed the inputs; their buffers can take new frames
+            self._release_inputs(prepared)
+        
+        # Every output keeps a leading batch axis; slice each input's share back out
+        return [
+            ({name: output[index:index + 1] for name, output in outputs.items()}, offset, region_shape, letterbox)
+            for index, (_, offset, region_shape, letterbox) in enumerate(prepared)
+        ]
+    
+    def _release_inputs(self, prepared: List[Tuple[np.ndarray, Tuple[int, int], Tuple[int, ...], Letterbox]]) -> None:
+        """Return prepared inputs' buffers to the pool"""
+        for item in prepared:
+            self.input_buffers.release(item[0])
+    
+    def _detect_regions(self, regions: List[Tuple[np.ndarray, Tuple[int, int]]], tiled: bool = False,
+                        rois: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Synchronous detection over regions (and their tiles), batch_size inputs per backend call,
+        merged into full-frame detections; rois are the frame's ROIs to charge the time to"""
+        if not self._backend_ready():
+            return []
+        
+        try:
+            start_time = time.time()
+            prepared = self._prepare_regions(regions, tiled)
+            preprocess_done = time.time()
+            
+            outputs = []
+            for offset in range(0, len(prepared), self.batch_size):
+                outputs.extend(self._run_batch(prepared[offset:offset + self.batch_size]))
+            infer_done = time.time()
+            
+            detections = self._finish_job(outputs, None)
+            
+            # The regions share the frame's time evenly
+            self._record_inference(preprocess_done - start_time, infer_done - preprocess_done,
+                                   time.time() - infer_done, rois)
+            
+            return detections
+            
+        except Exception as e:
+            self.logger.error(f"Detection failed: {e}")
+            return []
+    
+    def _finish_job(self, outputs: List[Tuple[Any, Tuple[int, int], Tuple[int, ...], Letterbox]], job: Any) -> List[Dict[str, Any]]:
+        """Decode a job's outputs into full-frame detections"""
+        start_time = time.time()
+        boxes, scores, class_ids = [], [], []
+        for output_tensors, (offset_x, offset_y), region_shape, letterbox in outputs:
+            region_boxes, region_scores, region_class_ids = self._decode_outputs(output_tensors, region_shape, letterbox)
+            if offset_x or offset_y:
+                region_boxes = region_boxes + np.array([offset_x, offset_y, offset_x, offset_y], dtype=np.int32)
+            boxes.append(region_boxes)
+            scores.append(region_scores)
+            class_ids.append(region_class_ids)
+        
+        boxes, scores, class_ids = np.concatenate(boxes), np.concatenate(scores), np.concatenate(class_ids)
+        
+        # Overlapping ROIs and tiles can report the same object twice; merge before building any dicts
+        if len(outputs) > 1:
+            boxes, scores, class_ids = self._merge(boxes, scores, class_ids)
+        detections = build_detections(boxes, scores, class_ids, self.class_names)
+        
+        # Pipeline jobs are counted here; synchronous paths count their own frames
+        if job is not None:
+            self._record_inference(job.preprocess_time, job.infer_time, time.time() - start_time, self.rois)
+        return detections
+    
+    def _record_inference(self, preprocess_time: float, infer_time: float, postprocess_time: float,
+                          rois: Optional[List[Any]] = None) -> None:
+        """Count one detected frame and its stage times; the frame's time is split evenly across its ROIs"""
+        inference_time = preprocess_time + infer_time + postprocess_time
+        if self.total_inferences == 0:
+            self.first_inference_time = inference_time  # Includes one-off warm-up
+        self.total_inferences += 1
+        self.total_inference_time += inference_time
+        self.stage_times['preprocess'] += preprocess_time
+        self.stage_times['infer'] += infer_time
+        self.stage_times['postprocess'] += postprocess_time
+        for roi in rois or []:
+            roi.record(inference_time / len(rois))
+    
+    def _default_input_size(self) -> Tuple[int, int]:
+        """Configured input (width, height) for models that do not report one"""
+        return self.input_resolution['width'], self.input_resolution['height']
+    
+    def _get_input_size(self) -> Tuple[int, int]:
+        """Model input (width, height)"""
+        return self.input_size or self._default_input_size()
+    
+    def _setup_preprocessing(self) -> None:
+        """Allocate the letterbox preprocessor and uint8 NHWC input buffers for the model size"""
+        input_size = self._get_input_size()
+        self.preprocessor = LetterboxPreprocessor(input_size, timers=self.stage_timers)
+        
+        # Tiles are added to the pool once their count for a region size is known
+        self.input_buffers = InputBufferPool(input_size, self._buffer_count(len(self.rois) or 1))
+        
+        input_width, input_height = input_size
+        self._batch_buffer = np.empty((self.batch_size, input_height, input_width, 3), dtype=np.uint8)
+    
+    def _buffer_count(self, inputs_per_frame: int) -> int:
+        """Buffers for every input that can be in flight: queued jobs, the job being
+        submitted and a full batch in the backend"""
+        queue_size = self.async_config.get('queue_size', 2)
+        return inputs_per_frame * (queue_size + 1 + self.batch_size) + 1
+    
+    def _preprocess_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, Letterbox]:
+        """Letterbox a frame into a new uint8 NHWC tensor (for one-off use outside the pipeline)"""
+        if self.preprocessor is None:
+            self._setup_preprocessing()
+        input_width, input_height = self._get_input_size()
+        input_tensor = np.empty((1, input_height, input_width, 3), dtype=np.uint8)
+        return input_tensor, self.preprocessor.letterbox(frame, input_tensor)
+    
+    def _postprocess_outputs(self, outputs: Any, original_shape: Tuple[int, int, int],
+                             letterbox: Optional[Letterbox] = None) -> List[Dict[str, Any]]:
+        """Post-process model outputs to get detections"""
+        return build_detections(*self._decode_outputs(outputs, original_shape, letterbox), self.class_names)
+    
+    def _decode_outputs(self, outputs: Any, original_shape: Tuple[int, int, int],
+                        letterbox: Optional[Letterbox] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Decode and NMS model outputs into box, score and class id arrays in region coordinates"""
+        if not outputs:
+            return np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int32)
+        
+        # Backends return {output name: tensor}
+        if isinstance(outputs, dict):
+            outputs = list(outputs.values())
+        
+        output = outputs[0][0]  # Remove batch dimension
+        
+        if self.output_format == 'auto':
+            self.output_format = detect_output_format(output, len(self.class_names))
+            self.logger.info(f"Detected model output format: {self.output_format}")
+        
+        if self.record_outputs and self.recorded_outputs < self.record_limit:
+            self._record_outputs([batch[0] for batch in outputs])
+        
+        original_height, original_width = original_shape[:2]
+        
+        # Threshold, class selection and box conversion run over all rows at once
+        start_ns = time.perf_counter_ns()
+        boxes, scores, class_ids = decode_output(
+            self.output_format, output, self._get_input_size(), (original_width, original_height),
+            self.min_confidence, self.class_filter, len(self.class_names), letterbox
+        )
+        nms_start_ns = time.perf_counter_ns()
+        self.stage_timers.record('decode', nms_start_ns - start_ns)
+        
+        # Apply Non-Maximum Suppression before building any dicts (on-chip NMS already did it)
+        if host_nms_required(self.output_format):
+            boxes, scores, class_ids = self._suppress(boxes, scores, class_ids)
+            self.stage_timers.record('nms', time.perf_counter_ns() - nms_start_ns)
+        
+        return boxes, scores, class_ids
+    
+    def _record_outputs(self, outputs: List[Any]) -> None:
+        """Save raw outputs so the parsers can be checked offline"""
+        try:
+            record_dir = Path(self.record_outputs)
+            record_dir.mkdir(parents=True, exist_ok=True)
+            save_recorded_outputs(
+                record_dir / f"outputs_{self.recorded_outputs:04d}.npz", outputs, self.output_format
+            )
+            self.recorded_outputs += 1
+        except Exception as e:
+            self.logger.warning(f"Failed to record model outputs: {e}")
+            self.record_outputs = None
+    
+    def _merge(self, boxes: np.ndarray, scores: np.ndarray,
+               class_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Cross-region NMS over full-frame box arrays"""
+        start_ns = time.perf_counter_ns()
+        try:
+            return self._suppress(boxes, scores, class_ids)
+        finally:
+            self.stage_timers.record('merge', time.perf_counter_ns() - start_ns)
+    
+    def _suppress(self, boxes: np.ndarray, scores: np.ndarray,
+                  class_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """NMS with the configured method and class handling"""
+        return suppress_boxes(boxes, scores, class_ids, self.min_confidence, self.nms_threshold,
+                              self.nms_method, self.class_aware_nms, self.soft_nms_sigma)
+    
+    def _backend_ready(self) -> bool:
+        """Check if a backend is loaded and can run inference"""
+        return self.backend is not None
+    
+    def _infer(self, input_batch: np.ndarray) -> Dict[str, Any]:
+        """Run a uint8 NHWC batch on the backend; returns {output name: tensor}"""
+        return self.backend.infer(input_batch)
+    
+    def get_performance_stats(self) -> Dict[str, Any]:
+        """Get performance statistics"""
+        stats = {
+            'backend': self.backend.name if self.backend else None,
+            'avg_inference_time': 0.0,
+            'total_inferences': self.total_inferences
+        }
+        if self.backend:
+            stats[self.backend.name] = self.backend.get_info()
+        if self.backend_timings:
+            stats['backend_selection_ms'] = dict(self.backend_timings)
+        
+        if self.total_inferences > 0:
+            avg_time = self.total_inference_time / self.total_inferences
+            stats['avg_inference_time'] = avg_time
+            stats['fps'] = 1.0 / avg_time if avg_time > 0 else 0.0
+            
+            # Steady state excludes the first inference, which pays one-off warm-up costs
+            steady_count = self.total_inferences - 1
+            stats['latency'] = {
+                'startup_ms': {stage: seconds * 1000 for stage, seconds in self.startup_times.items()},
+                'first_inference_ms': self.first_inference_time * 1000,
+                'steady_state_ms': ((self.total_inference_time - self.first_inference_time) / steady_count * 1000
+                                    if steady_count else 0.0),
+                'stages_ms': {stage: seconds / self.total_inferences * 1000
+                              for stage, seconds in self.stage_times.items()}
+            }
+        
+        # Per-stage latency distributions (count, mean, p50/p90/p99, buckets)
+        stats['stage_histograms'] = self.stage_timers.snapshot()
+        
+        if self.rois:
+            stats['roi'] = {roi.name: roi.get_stats() for roi in self.rois}
+        
+        if self.tile_scheduler:
+            stats['tiling'] = self.tile_scheduler.get_stats()
+        
+        if self.async_pipeline:
+            stats['async'] = self.async_pipeline.get_stats()
+        
+        return stats
+    
+    def _get_coco_class_names(self) -> Dict[int, str]:
+        """Get COCO dataset class names"""
+        return {
+            0: 'person', 1: 'bicycle', 2: 'car', 3: 'motorcycle', 4: 'airplane',
+            5: 'bus', 6: 'train', 7: 'truck', 8: 'boat', 9: 'traffic light',
+            10: 'fire hydrant', 11: 'stop sign', 12: 'parking meter', 13: 'bench',
+            14: 'bird', 15: 'cat', 16: 'dog', 17: 'horse', 18: 'sheep', 19: 'cow',
+            20: 'elephant', 21: 'bear', 22: 'zebra', 23: 'giraffe', 24: 'backpack',
+            25: 'umbrella', 26: 'handbag', 27: 'tie', 28: 'suitcase', 29: 'frisbee',
+            30: 'skis', 31: 'snowboard', 32: 'sports ball', 33: 'kite', 34: 'baseball bat',
+            35: 'baseball glove', 36: 'skateboard', 37: 'surfboard', 38: 'tennis racket',
+            39: 'bottle', 40: 'wine glass', 41: 'cup', 42: 'fork', 43: 'knife',
+            44: 'spoon', 45: 'bowl', 46: 'banana', 47: 'apple', 48: 'sandwich',
+            49: 'orange', 50: 'broccoli', 51: 'carrot', 52: 'hot dog', 53: 'pizza',
+            54: 'donut', 55: 'cake', 56: 'chair', 57: 'couch', 58: 'potted plant',
+            59: 'bed', 60: 'dining table', 61: 'toilet', 62: 'tv', 63: 'laptop',
+            64: 'mouse', 65: 'remote', 66: 'keyboard', 67: 'cell phone', 68: 'microwave',
+            69: 'oven', 70: 'toaster', 71: 'sink', 72: 'refrigerator', 73: 'book',
+            74: 'clock', 75: 'vase', 76: 'scissors', 77: 'teddy bear', 78: 'hair drier',
+            79: 'toothbrush'
+        }
+    
+    def cleanup(self) -> None:
+        """Clean up detector resources"""
+        self.logger.info("Cleaning up detector")
+        
+        try:
+            # Drain the async workers before the backend they use goes away
+            self.stop_async()
+            
+            if self.backend:
+                self.backend.release()
+                self.backend = None
+                
+        except Exception as e:
+            self.logger.warning(f"Error during cleanup: {e}")
+        
+        self.logger.info("Detector cleanup completed")
@@ -0,0 +1,210 @@
+"""
+Hailo Backend
+Inference on the Hailo-8/8L accelerator through HailoRT virtual streams
+"""
+
+import os
+import time
+import threading
+import numpy as np
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, Any
+from .backend import InferenceBackend
+from .postprocess import output_format_from_vstream_info
+
+try:
+    # Import Hailo runtime libraries
+    from hailo_platform import HEF, VDevice, HailoSchedulingAlgorithm, InferVStreams
+    from hailo_platform import ConfigureParams, InputVStreamParams, OutputVStreamParams
+    from hailo_platform import FormatType, HailoStreamInterface
+    HAILO_AVAILABLE = True
+except ImportError:
+    HAILO_AVAILABLE = False
+
+# HAILO_SIMULATOR=1 runs the same code against a simulated runtime (no accelerator needed)
+HAILO_SIMULATED = os.environ.get('HAILO_SIMULATOR', '') not in ('', '0')
+if HAILO_SIMULATED:
+    from .hailo_simulator import HEF, VDevice, HailoSchedulingAlgorithm, InferVStreams
+    from .hailo_simulator import ConfigureParams, InputVStreamParams, OutputVStreamParams
+    from .hailo_simulator import FormatType, HailoStreamInterface
+    HAILO_AVAILABLE = True
+
+# HailoRT allows one VDevice per physical device in a process, so backends on the same
+# device share it: device id -> {'vdevice', 'scheduled', 'users'}
+_shared_vdevices: Dict[int, Dict[str, Any]] = {}
+_shared_vdevices_lock = threading.Lock()
+
+
+def _acquire_vdevice(device_id: int, scheduled: bool) -> Any:
+    """The process-wide VDevice for a device; models can only share one under the scheduler"""
+    with _shared_vdevices_lock:
+        entry = _shared_vdevices.get(device_id)
+        if entry is None:
+            if scheduled:
+                # The scheduler switches between network groups; none is activated by hand
+                params = VDevice.create_params()
+                params.scheduling_algorithm = HailoSchedulingAlgorithm.ROUND_ROBIN
+                vdevice = VDevice(params, device_ids=[device_id])
+            else:
+                vdevice = VDevice(device_ids=[device_id])
+            entry = _shared_vdevices[device_id] = {'vdevice': vdevice, 'scheduled': scheduled, 'users': 0}
+        elif not (entry['scheduled'] and scheduled):
+            raise RuntimeError(f"Hailo device {device_id} is already used by another model; models sharing "
+                               f"a device must all set detection.hailo_scheduler: true")
+        entry['users'] += 1
+        return entry['vdevice']
+
+
+def _release_vdevice(device_id: int) -> None:
+    """Drop one user of a shared VDevice, releasing it with the last one"""
+    with _shared_vdevices_lock:
+        entry = _shared_vdevices.get(device_id)
+        if entry is None:
+            return
+        entry['users'] -= 1
+        if entry['users'] <= 0:
+            del _shared_vdevices[device_id]
+            entry['vdevice'].release()
+
+
+class HailoBackend(InferenceBackend):
+    """HEF model on a Hailo VDevice, activated once and held until release()"""
+
+    name = 'hailo'
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.model_path = config.get('model_path', 'models/yolov8n_hailo.hef')
+        self.device_id = config.get('hailo_device_id', 0)
+        self.batch_size = max(1, config.get('batch_size', 1))
+        # Round-robin scheduler: lets several models (e.g. both cascade stages) share the device
+        self.scheduled = config.get('hailo_scheduler', False)
+
+        # Hailo objects
+        self.hef = None
+        self.vdevice = None
+        self.network_group = None
+        self.network_group_params = None
+        self.infer_pipeline = None
+        self.input_name = None
+        self.input_shape = None
+        self.output_shapes = None
+
+        # Activation and open vstreams are held from initialize() until release()
+        self._pipeline_stack = None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return HAILO_AVAILABLE
+
+    def initialize(self) -> bool:
+        if not HAILO_AVAILABLE:
+            self.logger.warning("Hailo libraries not available")
+            return False
+
+        self.logger.info(f"Initializing Hailo backend with model: {self.model_path}"
+                         + (" (simulated)" if HAILO_SIMULATED else ""))
+
+        # Check if model file exists (the simulator does not read it)
+        if not HAILO_SIMULATED and not Path(self.model_path).exists():
+            self.logger.error(f"Model file not found: {self.model_path}")
+            return False
+
+        try:
+            # Load HEF model
+            start_time = time.time()
+            self.hef = HEF(self.model_path)
+            self.startup_times['load_hef'] = time.time() - start_time
+
+            # Get the (shared) virtual device and configure the network group on it
+            start_time = time.time()
+            self.vdevice = _acquire_vdevice(self.device_id, self.scheduled)
+            configure_params = ConfigureParams.create_from_hef(self.hef, interface=HailoStreamInterface.PCIe)
+            for network_params in configure_params.values():
+                network_params.batch_size = self.batch_size
+            self.network_group = self.vdevice.configure(self.hef, configure_params)[0]
+            self.network_group_params = self.network_group.create_params()
+            self.startup_times['configure'] = time.time() - start_time
+
+            # Get input/output information
+            self._setup_model_io()
+
+            # Activate the network group (unless scheduled) and open the vstreams once for the backend's lifetime
+            start_time = time.time()
+            self._open_pipeline()
+            self.startup_times['activate'] = time.time() - start_time
+
+            self.max_batch_size = self.batch_size
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to initialize Hailo backend: {e}")
+            self.release()
+            return False
+
+    def _setup_model_io(self) -> None:
+        """Read input/output shapes and the output layout from the HEF"""
+        # Get input layer info; HEF shapes are (H, W, C), some models add a batch axis
+        input_info = self.hef.get_input_vstream_infos()[0]
+        self.input_shape = input_info.shape
+        self.input_name = input_info.name
+        input_height, input_width = self.input_shape[-3:-1]
+        self.input_size = (int(input_width), int(input_height))
+
+        # Get output layer info
+        output_infos = self.hef.get_output_vstream_infos()
+        self.output_shapes = [output_info.shape for output_info in output_infos]
+        if output_infos:
+            self.output_format = output_format_from_vstream_info(output_infos[0])
+
+        self.logger.info(f"Model input shape: {self.input_shape}")
+        self.logger.info(f"Model output shapes: {self.output_shapes} (format: {self.output_format or 'auto'})")
+
+    def _create_vstreams(self) -> Any:
+        """Create input and output virtual streams"""
+        # Input stream parameters
+        input_vstream_params = InputVStreamParams.make_from_network_group(
+            self.network_group, quantized=False, format_type=FormatType.UINT8
+        )
+
+        # Output stream parameters
+        output_vstream_params = OutputVStreamParams.make_from_network_group(
+            self.network_group, quantized=False, format_type=FormatType.FLOAT32
+        )
+
+        return InferVStreams(self.network_group, input_vstream_params, output_vstream_params)
+
+    def _open_pipeline(self) -> None:
+        """Activate the network group and enter the vstreams; held until release()"""
+        self._pipeline_stack = ExitStack()
+        if not self.scheduled:
+            self._pipeline_stack.enter_context(self.network_group.activate(self.network_group_params))
+        self.infer_pipeline = self._pipeline_stack.enter_context(self._create_vstreams())
+
+    def _close_pipeline(self) -> None:
+        """Close the vstreams and deactivate the network group (reverse order of opening)"""
+        self.infer_pipeline = None
+        if self._pipeline_stack is not None:
+            stack = self._pipeline_stack
+            self._pipeline_stack = None
+            stack.close()
+
+    def infer(self, input_batch: np.ndarray) -> Dict[str, Any]:
+        # uint8 vstreams take the letterboxed buffer as-is
+        return self.infer_pipeline.infer({self.input_name: input_batch})
+
+    def release(self) -> None:
+        # Leave the vstreams and deactivate the network group before releasing the device
+        self._close_pipeline()
+        self.network_group = None
+
+        if self.vdevice:
+            _release_vdevice(self.device_id)
+            self.vdevice = None
+
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info.update({'model_path': self.model_path, 'device_id': self.device_id, 'batch_size': self.batch_size,
+                     'scheduled': self.scheduled, 'simulated': HAILO_SIMULATED})
+        return info
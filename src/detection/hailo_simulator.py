@@ -0,0 +1,342 @@
+"""
+Hailo Runtime Simulator
+Stand-in for hailo_platform so the host side of the Hailo path can be tested and profiled without an accelerator
+"""
+
+import os
+import sys
+import time
+import random
+import numpy as np
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from .postprocess import OUTPUT_FORMATS, load_recorded_outputs
+
+
+# Simulation settings; each can also be set as HAILO_SIMULATOR_<NAME> in the environment
+SIMULATOR_DEFAULTS = {
+    'output_format': 'hailo_nms',  # Layout of the synthetic outputs (ignored with a recording)
+    'recording': '',               # .npz from detection.record_outputs, or a directory of them to cycle
+    'input_size': 640,             # Square model input
+    'num_classes': 80,
+    'latency_ms': 8.0,             # Device time per frame
+    'overhead_ms': 1.0,            # Fixed device time per infer() call (what batching amortizes)
+    'jitter_ms': 0.5,              # Standard deviation added to every call
+    'activate_ms': 5.0,            # Network group activation time
+    'seed': 0
+}
+
+_settings: Dict[str, Any] = dict(SIMULATOR_DEFAULTS)
+for _name, _default in SIMULATOR_DEFAULTS.items():
+    _value = os.environ.get(f'HAILO_SIMULATOR_{_name.upper()}')
+    if _value is not None:
+        _settings[_name] = type(_default)(_value)
+
+# Device counters, read with get_stats()
+_stats = {'infer_calls': 0, 'frames': 0, 'device_time': 0.0, 'activations': 0}
+
+# Physical devices held by a VDevice in this process; HailoRT refuses a second VDevice on one
+_devices_in_use: set = set()
+
+
+class HailoRTException(Exception):
+    """Raised where HailoRT would fail with a status error"""
+
+
+def configure(**settings: Any) -> None:
+    """Change simulation settings; applies to HEFs loaded afterwards"""
+    for name in settings:
+        if name not in SIMULATOR_DEFAULTS:
+            raise ValueError(f"Unknown simulator setting: {name}")
+    if settings.get('output_format', _settings['output_format']) not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {settings['output_format']}")
+    _settings.update(settings)
+
+
+def get_stats() -> Dict[str, Any]:
+    """Simulated device activity since import"""
+    return dict(_stats)
+
+
+def install() -> None:
+    """Make `import hailo_platform` resolve to this module (for code outside this package)"""
+    sys.modules['hailo_platform'] = sys.modules[__name__]
+
+
+class FormatType:
+    AUTO = 'AUTO'
+    UINT8 = 'UINT8'
+    FLOAT32 = 'FLOAT32'
+
+
+class HailoStreamInterface:
+    PCIe = 'PCIe'
+    ETH = 'ETH'
+
+
+class HailoSchedulingAlgorithm:
+    NONE = 'NONE'
+    ROUND_ROBIN = 'ROUND_ROBIN'
+
+
+class VStreamFormat:
+    """The part of a vstream's format the host code reads"""
+
+    def __init__(self, order: str, format_type: str):
+        self.order = order
+        self.type = format_type
+
+
+class VStreamInfo:
+    """Name, shape (without batch axis) and format of a vstream"""
+
+    def __init__(self, name: str, shape: tuple, vstream_format: VStreamFormat):
+        self.name = name
+        self.shape = shape
+        self.format = vstream_format
+
+
+def _synthetic_output(output_format: str, input_size: int, num_classes: int) -> Any:
+    """One frame's output with a single confident bus in the middle of the input"""
+    bus = min(5, num_classes - 1)
+    if output_format == 'hailo_nms':
+        per_class = [np.zeros((0, 5), dtype=np.float32) for _ in range(num_classes)]
+        per_class[bus] = np.array([[0.35, 0.4, 0.65, 0.6, 0.9]], dtype=np.float32)  # y1, x1, y2, x2, score
+        return per_class
+
+    anchors = sum((input_size // stride) ** 2 for stride in (8, 16, 32))
+    box = [input_size * 0.5, input_size * 0.5, input_size * 0.2, input_size * 0.3]  # cx, cy, w, h
+    if output_format == 'yolov8':
+        output = np.zeros((4 + num_classes, anchors), dtype=np.float32)
+        output[:4, 0] = box
+        output[4 + bus, 0] = 0.9
+        return output
+
+    output = np.zeros((anchors * 3, 5 + num_classes), dtype=np.float32)
+    output[0, :4] = box
+    output[0, 4] = 0.95
+    output[0, 5 + bus] = 0.95
+    return output
+
+
+class HEF:
+    """A model file; the simulator only needs it to exist, its shapes come from the settings"""
+
+    def __init__(self, hef_path: str):
+        self.path = str(hef_path)
+        self.name = Path(self.path).stem
+        self.settings = dict(_settings)
+
+        size = self.settings['input_size']
+        self.input_info = VStreamInfo(f'{self.name}/input_layer1', (size, size, 3),
+                                      VStreamFormat('NHWC', FormatType.UINT8))
+
+        # Outputs per frame: one synthetic frame, or the recorded ones (cycled)
+        recording = self.settings['recording']
+        if recording:
+            paths = sorted(Path(recording).glob('*.npz')) if Path(recording).is_dir() else [Path(recording)]
+            if not paths:
+                raise FileNotFoundError(f"No recorded outputs in {recording}")
+            self.frames = []
+            for path in paths:
+                outputs, output_format = load_recorded_outputs(path)
+                self.frames.append(outputs)
+            self.output_format = output_format
+        else:
+            self.output_format = self.settings['output_format']
+            self.frames = [[_synthetic_output(self.output_format, size, self.settings['num_classes'])]]
+
+        self.output_infos = []
+        for index, output in enumerate(self.frames[0]):
+            if self.output_format == 'hailo_nms':
+                shape = (self.settings['num_classes'], 5, 100)
+                order = 'HAILO_NMS'
+            else:
+                shape = tuple(np.asarray(output).shape)
+                order = 'NC'
+            self.output_infos.append(VStreamInfo(f'{self.name}/output_layer{index + 1}', shape,
+                                                 VStreamFormat(order, FormatType.FLOAT32)))
+
+    def get_network_group_names(self) -> List[str]:
+        return [self.name]
+
+    def get_input_vstream_infos(self) -> List[VStreamInfo]:
+        return [self.input_info]
+
+    def get_output_vstream_infos(self) -> List[VStreamInfo]:
+        return list(self.output_infos)
+
+
+class ConfigureParams:
+    """Per network group configuration (only batch_size is simulated)"""
+
+    def __init__(self):
+        self.batch_size = 1
+
+    @staticmethod
+    def create_from_hef(hef: HEF, interface: str = HailoStreamInterface.PCIe) -> Dict[str, 'ConfigureParams']:
+        return {name: ConfigureParams() for name in hef.get_network_group_names()}
+
+
+class ConfiguredNetworkGroup:
+    """A network group loaded on the simulated device"""
+
+    def __init__(self, hef: HEF, batch_size: int, vdevice: 'VDevice', scheduled: bool = False):
+        self.hef = hef
+        self.vdevice = vdevice
+        self.name = hef.name
+        self.batch_size = batch_size
+        self.scheduled = scheduled  # The device's scheduler activates it per inference
+        self.active = False
+        self.random = random.Random(hef.settings['seed'])
+        self.frame_index = 0
+
+    def create_params(self) -> Dict[str, Any]:
+        return {}
+
+    def activate(self, network_group_params: Optional[Dict[str, Any]] = None) -> 'Activation':
+        return Activation(self)
+
+    def get_input_vstream_infos(self) -> List[VStreamInfo]:
+        return self.hef.get_input_vstream_infos()
+
+    def get_output_vstream_infos(self) -> List[VStreamInfo]:
+        return self.hef.get_output_vstream_infos()
+
+
+class Activation:
+    """Context manager holding a network group active"""
+
+    def __init__(self, network_group: ConfiguredNetworkGroup):
+        self.network_group = network_group
+
+    def __enter__(self) -> 'Activation':
+        if self.network_group.scheduled:
+            raise HailoRTException("HAILO_INVALID_OPERATION: manually activating a network group is not allowed "
+                                   "when the network group scheduler is active")
+        if self.network_group.active:
+            raise RuntimeError(f"Network group {self.network_group.name} is already activated")
+        active = [group.name for group in self.network_group.vdevice.network_groups if group.active]
+        if active:
+            raise HailoRTException(f"HAILO_INVALID_OPERATION: cannot activate {self.network_group.name} while "
+                                   f"network group {active[0]} is active on the device")
+        time.sleep(self.network_group.hef.settings['activate_ms'] / 1000.0)
+        self.network_group.active = True
+        _stats['activations'] += 1
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.network_group.active = False
+
+
+class VDeviceParams:
+    """VDevice creation parameters (only the scheduler is simulated)"""
+
+    def __init__(self):
+        self.scheduling_algorithm = HailoSchedulingAlgorithm.NONE
+        self.device_ids = None
+
+
+class VDevice:
+    """A simulated device; configure() loads HEFs onto it"""
+
+    def __init__(self, params: Optional[VDeviceParams] = None, device_ids: Optional[List[Any]] = None):
+        self.device_ids = device_ids or (params.device_ids if params else None) or [0]
+        in_use = _devices_in_use.intersection(self.device_ids)
+        if in_use:
+            raise HailoRTException(f"HAILO_OUT_OF_PHYSICAL_DEVICES: device {sorted(in_use)[0]} is already "
+                                   f"used by another VDevice in this process")
+        _devices_in_use.update(self.device_ids)
+        self.scheduled = params is not None and params.scheduling_algorithm != HailoSchedulingAlgorithm.NONE
+        self.network_groups: List[ConfiguredNetworkGroup] = []
+        self.released = False
+
+    @staticmethod
+    def create_params() -> VDeviceParams:
+        return VDeviceParams()
+
+    def configure(self, hef: HEF, configure_params: Optional[Dict[str, ConfigureParams]] = None
+                  ) -> List[ConfiguredNetworkGroup]:
+        batch_size = max((params.batch_size for params in (configure_params or {}).values()), default=1)
+        network_group = ConfiguredNetworkGroup(hef, batch_size, self, self.scheduled)
+        self.network_groups.append(network_group)
+        return [network_group]
+
+    def release(self) -> None:
+        self.network_groups = []
+        if not self.released:
+            self.released = True
+            _devices_in_use.difference_update(self.device_ids)
+
+
+class InputVStreamParams:
+    @staticmethod
+    def make_from_network_group(network_group: ConfiguredNetworkGroup, quantized: bool = True,
+                                format_type: str = FormatType.AUTO) -> Dict[str, str]:
+        return {info.name: format_type for info in network_group.get_input_vstream_infos()}
+
+
+class OutputVStreamParams:
+    @staticmethod
+    def make_from_network_group(network_group: ConfiguredNetworkGroup, quantized: bool = True,
+                                format_type: str = FormatType.AUTO) -> Dict[str, str]:
+        return {info.name: format_type for info in network_group.get_output_vstream_infos()}
+
+
+class InferVStreams:
+    """Blocking inference; sleeps for the simulated device time and returns batched outputs"""
+
+    def __init__(self, network_group: ConfiguredNetworkGroup, input_vstreams_params: Dict[str, str],
+                 output_vstreams_params: Dict[str, str]):
+        self.network_group = network_group
+        self.input_params = input_vstreams_params
+        self.output_params = output_vstreams_params
+        self.open = False
+
+    def __enter__(self) -> 'InferVStreams':
+        if not self.network_group.active and not self.network_group.scheduled:
+            raise RuntimeError(f"Network group {self.network_group.name} must be activated before opening vstreams")
+        self.open = True
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.open = False
+
+    def infer(self, input_data: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        if not self.open or not (self.network_group.active or self.network_group.scheduled):
+            raise RuntimeError("InferVStreams used outside its activation")
+
+        hef = self.network_group.hef
+        input_info = hef.input_info
+        if set(input_data) != set(self.input_params):
+            raise ValueError(f"Expected inputs {sorted(self.input_params)}, got {sorted(input_data)}")
+        batch = input_data[input_info.name]
+        expected_dtype = np.uint8 if self.input_params[input_info.name] == FormatType.UINT8 else np.float32
+        if batch.ndim != 4 or tuple(batch.shape[1:]) != input_info.shape or batch.dtype != expected_dtype:
+            raise ValueError(f"Input must be [N, {', '.join(map(str, input_info.shape))}] {expected_dtype.__name__}, "
+                             f"got {list(batch.shape)} {batch.dtype}")
+
+        # Device time: per-call overhead plus per-frame compute, with jitter
+        frames = len(batch)
+        settings = hef.settings
+        device_ms = settings['overhead_ms'] + settings['latency_ms'] * frames
+        device_ms = max(0.0, device_ms + self.network_group.random.gauss(0.0, settings['jitter_ms']))
+        time.sleep(device_ms / 1000.0)
+        _stats['infer_calls'] += 1
+        _stats['frames'] += frames
+        _stats['device_time'] += device_ms / 1000.0
+
+        # Recorded frames are replayed in order; every output keeps a leading batch axis
+        frame_outputs = []
+        for _ in range(frames):
+            frame_outputs.append(hef.frames[self.network_group.frame_index % len(hef.frames)])
+            self.network_group.frame_index += 1
+
+        results = {}
+        for index, info in enumerate(hef.output_infos):
+            if hef.output_format == 'hailo_nms':
+                results[info.name] = [outputs[index] for outputs in frame_outputs]
+            else:
+                results[info.name] = np.stack([np.asarray(outputs[index], dtype=np.float32)
+                                               for outputs in frame_outputs])
+        return results
@@ -0,0 +1,287 @@
+"""
+Inference Pipeline
+Overlaps preprocessing, accelerator inference and post-processing of consecutive frames
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, List, Optional
+from ..utils.logger import get_logger
+
+
+STAGES = ('preprocess', 'infer', 'postprocess')
+
+
+class InferenceJob:
+    """One submitted frame moving through the pipeline"""
+
+    def __init__(self, inputs: List[Any], context: Any, future: Future):
+        self.inputs = inputs  # Preprocessed tensors with whatever the decoder needs
+        self.context = context
+        self.future = future
+        self.outputs: List[Any] = []
+        self.inferred = False  # Inputs were handed to infer_batch, which owns them from then on
+        self.submit_time = time.time()
+        self.preprocess_time = 0.0  # Busy time spent on this job per stage (its share of a batch for infer)
+        self.infer_time = 0.0
+
+
+class AsyncInferencePipeline:
+    """Three-stage pipeline connected by bounded queues
+
+    Preprocessing runs in the submitting thread, so the caller's frame only has
+    to stay valid until submit() returns. Inference and post-processing each get
+    a worker thread: while frame N is on the accelerator, frame N+1 is being
+    preprocessed and frame N-1 post-processed. A full queue blocks submit(),
+    which keeps the number of frames in flight bounded. With batch_size > 1 the
+    inference worker waits up to max_batch_wait for more inputs and runs them
+    in one call. infer_batch owns the inputs it is given; inputs of a job that
+    is cancelled before inference go back through release.
+    """
+
+    def __init__(self, preprocess: Callable[[Any], List[Any]], infer_batch: Callable[[List[Any]], List[Any]],
+                 postprocess: Callable[[List[Any], Any], Any], queue_size: int = 2,
+                 batch_size: int = 1, max_batch_wait: float = 0.005,
+                 release: Optional[Callable[[List[Any]], None]] = None):
+        self.logger = get_logger('inference_pipeline')
+        self.preprocess = preprocess
+        self.infer_batch = infer_batch
+        self.postprocess = postprocess
+        self.release = release
+
+        # Inputs from several jobs (cameras, ROIs) are combined into one accelerator call
+        self.batch_size = max(1, batch_size)
+        self.max_batch_wait = max_batch_wait
+
+        self.queue_size = max(1, queue_size)
+        self.infer_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self.postprocess_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        self.running = False
+        self.threads: List[threading.Thread] = []
+        self.start_time = 0.0
+
+        # Statistics
+        self.stats_lock = threading.Lock()
+        self.busy_time = {stage: 0.0 for stage in STAGES}
+        self.stage_jobs = {stage: 0 for stage in STAGES}
+        self.jobs_submitted = 0
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.total_latency = 0.0
+        self.batches_run = 0
+        self.batched_inputs = 0
+
+    def start(self) -> None:
+        """Start the inference and post-processing workers"""
+        if self.running:
+            return
+
+        self.running = True
+        self.start_time = time.time()
+        self.threads = [
+            threading.Thread(target=self._infer_loop, name='inference-infer', daemon=True),
+            threading.Thread(target=self._postprocess_loop, name='inference-postprocess', daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+        self.logger.info(f"Async inference pipeline started (queue size {self.queue_size})")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the workers; jobs still queued are cancelled"""
+        if not self.running:
+            return
+
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+        self.threads = []
+
+        for pending_queue in (self.infer_queue, self.postprocess_queue):
+            while True:
+                try:
+                    self._cancel(pending_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+        self.logger.info("Async inference pipeline stopped")
+
+    def submit(self, frame: Any, context: Any = None,
+               callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """Preprocess a frame and queue it; the future resolves to the post-processed result"""
+        future: Future = Future()
+        if callback:
+            future.add_done_callback(callback)
+
+        if not self.running:
+            future.set_exception(RuntimeError("Inference pipeline is not running"))
+            return future
+
+        try:
+            start_time = time.time()
+            job = InferenceJob(self.preprocess(frame), context, future)
+            job.preprocess_time = time.time() - start_time
+            self._record_stage('preprocess', job.preprocess_time)
+        except Exception as e:
+            self._fail(future, e)
+            return future
+
+        with self.stats_lock:
+            self.jobs_submitted += 1
+        self._put(self.infer_queue, job)
+        return future
+
+    def _put(self, target_queue: queue.Queue, job: InferenceJob) -> None:
+        """Blocking put that gives up when the pipeline stops"""
+        while self.running:
+            try:
+                target_queue.put(job, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        self._cancel(job)
+
+    def _get(self, source_queue: queue.Queue) -> Optional[InferenceJob]:
+        """Blocking get that returns None when the pipeline stops"""
+        while self.running:
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _collect_batch(self, first_job: InferenceJob) -> List[InferenceJob]:
+        """Gather more jobs until batch_size inputs are queued or the batch wait runs out"""
+        jobs = [first_job]
+        input_count = len(first_job.inputs)
+        deadline = time.time() + self.max_batch_wait
+
+        while input_count < self.batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                job = self.infer_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            jobs.append(job)
+            input_count += len(job.inputs)
+
+        return jobs
+
+    def _infer_loop(self) -> None:
+        """Worker: run queued inputs on the accelerator, batch_size at a time"""
+        while self.running:
+            job = self._get(self.infer_queue)
+            if job is None:
+                break
+
+            jobs = self._collect_batch(job) if self.batch_size > 1 else [job]
+            inputs = [(queued_job, job_input) for queued_job in jobs for job_input in queued_job.inputs]
+
+            for queued_job in jobs:
+                queued_job.inferred = True
+            offset = 0
+            try:
+                start_time = time.time()
+                outputs = []
+                for offset in range(0, len(inputs), self.batch_size):
+                    chunk = [job_input for _, job_input in inputs[offset:offset + self.batch_size]]
+                    outputs.extend(self.infer_batch(chunk))
+                    with self.stats_lock:
+                        self.batches_run += 1
+                        self.batched_inputs += len(chunk)
+                infer_time = time.time() - start_time
+                self._record_stage('infer', infer_time)
+            except Exception as e:
+                # The failed chunk was infer_batch's to release; the chunks after it never ran
+                self._release([job_input for _, job_input in inputs[offset + self.batch_size:]])
+                for failed_job in jobs:
+                    self._fail(failed_job.future, e)
+                continue
+
+            # Split the batch results back to the jobs they came from
+            for batched_job in jobs:
+                batched_job.outputs = []
+                batched_job.infer_time = infer_time * len(batched_job.inputs) / len(inputs)
+            for (owner, _), output in zip(inputs, outputs):
+                owner.outputs.append(output)
+            for finished_job in jobs:
+                self._put(self.postprocess_queue, finished_job)
+
+    def _postprocess_loop(self) -> None:
+        """Worker: decode outputs and resolve the job's future"""
+        while self.running:
+            job = self._get(self.postprocess_queue)
+            if job is None:
+                break
+
+            try:
+                start_time = time.time()
+                result = self.postprocess(job.outputs, job)
+                self._record_stage('postprocess', time.time() - start_time)
+            except Exception as e:
+                self._fail(job.future, e)
+                continue
+
+            with self.stats_lock:
+                self.jobs_completed += 1
+                self.total_latency += time.time() - job.submit_time
+            if not job.future.done():  # stop() may have cancelled it while this thread was still running
+                job.future.set_result(result)
+
+    def _cancel(self, job: InferenceJob) -> None:
+        """Cancel a job that will not finish, returning its inputs if inference never took them"""
+        job.future.cancel()
+        if not job.inferred:
+            job.inferred = True
+            self._release(job.inputs)
+
+    def _release(self, inputs: List[Any]) -> None:
+        """Hand unused inputs back to their owner"""
+        if self.release is not None and inputs:
+            self.release(inputs)
+
+    def _record_stage(self, stage: str, elapsed: float) -> None:
+        """Accumulate busy time for a stage"""
+        with self.stats_lock:
+            self.busy_time[stage] += elapsed
+            self.stage_jobs[stage] += 1
+
+    def _fail(self, future: Future, error: Exception) -> None:
+        """Resolve a job's future with an error"""
+        self.logger.error(f"Inference job failed: {error}")
+        with self.stats_lock:
+            self.jobs_failed += 1
+        if not future.done():
+            future.set_exception(error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depths and per-stage utilization (busy time / wall time)"""
+        elapsed = time.time() - self.start_time if self.start_time else 0.0
+        with self.stats_lock:
+            return {
+                'running': self.running,
+                'queue_depth': {
+                    'infer': self.infer_queue.qsize(),
+                    'postprocess': self.postprocess_queue.qsize()
+                },
+                'queue_size': self.queue_size,
+                'utilization': {
+                    stage: (self.busy_time[stage] / elapsed) if elapsed > 0 else 0.0 for stage in STAGES
+                },
+                'avg_stage_ms': {
+                    stage: (self.busy_time[stage] / self.stage_jobs[stage] * 1000) if self.stage_jobs[stage] else 0.0
+                    for stage in STAGES
+                },
+                'jobs_submitted': self.jobs_submitted,
+                'jobs_completed': self.jobs_completed,
+                'jobs_failed': self.jobs_failed,
+                'in_flight': self.jobs_submitted - self.jobs_completed - self.jobs_failed,
+                'avg_latency_ms': (self.total_latency / self.jobs_completed * 1000) if self.jobs_completed else 0.0,
+                'batch_size': self.batch_size,
+                'avg_batch_fill': (self.batched_inputs / self.batches_run) if self.batches_run else 0.0
+            }
@@ -0,0 +1,120 @@
+"""
+Motion Gate
+Cheap motion pre-stage that skips inference on static frames
+"""
+
+import time
+import cv2
+import numpy as np
+from typing import Dict, Any
+from ..utils.logger import get_logger
+
+
+class MotionGate:
+    """Decides per frame whether anything moved enough to be worth inferring"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.logger = get_logger('motion_gate')
+
+        self.enabled = config.get('enabled', False)
+        self.downscale_width = config.get('downscale_width', 160)
+        self.pixel_threshold = config.get('pixel_threshold', 25)  # Grey-level change per pixel
+        self.sensitivity = config.get('sensitivity', 0.01)  # Fraction of changed pixels that counts as motion
+        self.learning_rate = config.get('learning_rate', 0.05)  # Background adaptation speed
+        self.hold_seconds = config.get('hold_seconds', 3.0)  # Keep inferring after motion stops
+        self.min_inference_interval = config.get('min_inference_interval', 5.0)  # Safety floor (seconds)
+
+        # Working buffers, allocated for the first frame size seen
+        self._small = None
+        self._gray = None
+        self._background = None
+        self._background_u8 = None
+        self._diff = None
+        self._frame_size = None
+
+        # State
+        self.last_motion_time = 0.0
+        self.last_inference_time = 0.0
+        self.last_motion_fraction = 0.0
+
+        # Counters
+        self.frames_checked = 0
+        self.frames_skipped = 0
+        self.motion_inferences = 0
+        self.floor_inferences = 0
+
+        if self.enabled:
+            self.logger.info(f"Motion gate enabled - sensitivity {self.sensitivity:.3f}, "
+                             f"floor every {self.min_inference_interval:.1f}s")
+
+    def _allocate(self, frame: np.ndarray) -> None:
+        """Allocate downscaled working buffers for this frame size"""
+        frame_height, frame_width = frame.shape[:2]
+        width = min(self.downscale_width, frame_width)
+        height = max(1, int(round(frame_height * width / float(frame_width))))
+
+        self._small = np.empty((height, width, 3), dtype=np.uint8)
+        self._gray = np.empty((height, width), dtype=np.uint8)
+        self._diff = np.empty((height, width), dtype=np.uint8)
+        self._background_u8 = np.empty((height, width), dtype=np.uint8)
+        self._background = None
+        self._frame_size = (frame_width, frame_height)
+
+    def measure_motion(self, frame: np.ndarray) -> float:
+        """Fraction of downscaled pixels that differ from the running background"""
+        if self._frame_size != (frame.shape[1], frame.shape[0]):
+            self._allocate(frame)
+
+        height, width = self._gray.shape
+        cv2.resize(frame, (width, height), dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self._background is None:
+            # First frame becomes the background; treat it as motion so it gets inferred
+            self._background = self._gray.astype(np.float32)
+            return 1.0
+
+        cv2.convertScaleAbs(self._background, dst=self._background_u8)
+        cv2.absdiff(self._gray, self._background_u8, dst=self._diff)
+        cv2.threshold(self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+        changed = cv2.countNonZero(self._diff) / float(self._diff.size)
+
+        cv2.accumulateWeighted(self._gray, self._background, self.learning_rate)
+        return changed
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        """Return True if the frame should be sent to the detector"""
+        if not self.enabled:
+            return True
+
+        current_time = time.time()
+        self.frames_checked += 1
+        self.last_motion_fraction = self.measure_motion(frame)
+
+        if self.last_motion_fraction >= self.sensitivity:
+            self.last_motion_time = current_time
+
+        if current_time - self.last_motion_time <= self.hold_seconds:
+            self.motion_inferences += 1
+        elif current_time - self.last_inference_time >= self.min_inference_interval:
+            # Nothing moved for a while - still infer now and then in case motion was missed
+            self.floor_inferences += 1
+        else:
+            self.frames_skipped += 1
+            return False
+
+        self.last_inference_time = current_time
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get gate counters"""
+        return {
+            'enabled': self.enabled,
+            'frames_checked': self.frames_checked,
+            'frames_skipped': self.frames_skipped,
+            'motion_inferences': self.motion_inferences,
+            'floor_inferences': self.floor_inferences,
+            'skip_ratio': self.frames_skipped / self.frames_checked if self.frames_checked else 0.0,
+            'last_motion_fraction': self.last_motion_fraction
+        }
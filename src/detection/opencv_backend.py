@@ -0,0 +1,103 @@
+"""
+OpenCV DNN Backend
+CPU (or OpenCL) inference of ONNX YOLO models when no Hailo accelerator is present
+"""
+
+import time
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Dict, Any, List
+from .backend import InferenceBackend
+
+
+# Preferred targets by config name; missing constants (older OpenCV builds) are skipped
+OPENCV_TARGETS = {
+    name: getattr(cv2.dnn, constant)
+    for name, constant in (
+        ('cpu', 'DNN_TARGET_CPU'),
+        ('cpu_fp16', 'DNN_TARGET_CPU_FP16'),
+        ('opencl', 'DNN_TARGET_OPENCL'),
+        ('opencl_fp16', 'DNN_TARGET_OPENCL_FP16'),
+        ('vulkan', 'DNN_TARGET_VULKAN')
+    )
+    if hasattr(cv2.dnn, constant)
+}
+
+
+class OpenCVDnnBackend(InferenceBackend):
+    """Runs letterboxed uint8 NHWC batches through cv2.dnn"""
+
+    name = 'opencv'
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        opencv_config = config.get('opencv', {})
+
+        self.model_path = opencv_config.get('model_path', 'models/yolov8n.onnx')
+        self.threads = opencv_config.get('threads', 0)  # 0 = OpenCV default (all cores)
+        self.target_name = opencv_config.get('target', 'cpu')
+        # cv2.dnn cannot report an ONNX input shape and static exports fail at any other size,
+        # so the model is taken to be fixed at input_resolution unless it is declared dynamic
+        self.dynamic_input = opencv_config.get('dynamic_input', False)
+
+        self.net = None
+        self.output_names: List[str] = []
+        self.load_time = 0.0
+
+    def initialize(self) -> bool:
+        if not Path(self.model_path).exists():
+            self.logger.error(f"OpenCV DNN model not found: {self.model_path}")
+            return False
+
+        try:
+            start_time = time.time()
+            if self.threads:
+                cv2.setNumThreads(int(self.threads))
+
+            self.net = cv2.dnn.readNetFromONNX(self.model_path)
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+
+            if self.target_name not in OPENCV_TARGETS:
+                self.logger.warning(f"Unknown or unsupported OpenCV DNN target '{self.target_name}' - using cpu")
+                self.target_name = 'cpu'
+            self.net.setPreferableTarget(OPENCV_TARGETS[self.target_name])
+
+            self.output_names = list(self.net.getUnconnectedOutLayersNames())
+            if not self.dynamic_input:
+                resolution = self.config.get('input_resolution', {'width': 640, 'height': 640})
+                self.input_size = (int(resolution['width']), int(resolution['height']))
+            self.load_time = time.time() - start_time
+            self.startup_times['load_model'] = self.load_time
+
+            self.logger.info(
+                f"OpenCV DNN model loaded: {self.model_path} (target: {self.target_name}, "
+                f"threads: {cv2.getNumThreads()}, {self.load_time * 1000:.0f}ms)"
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to load OpenCV DNN model: {e}")
+            self.net = None
+            return False
+
+    def infer(self, input_batch: np.ndarray) -> Dict[str, np.ndarray]:
+        # Letterboxing and channel order are already done, blobFromImages only scales to 0-1 NCHW float
+        blob = cv2.dnn.blobFromImages(list(input_batch), scalefactor=1.0 / 255.0, swapRB=False, crop=False)
+        self.net.setInput(blob)
+        outputs = self.net.forward(self.output_names)
+        return dict(zip(self.output_names, outputs))
+
+    def release(self) -> None:
+        self.net = None
+
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info.update({
+            'model_path': self.model_path,
+            'target': self.target_name,
+            'dynamic_input': self.dynamic_input,
+            'threads': cv2.getNumThreads(),
+            'load_time_ms': self.load_time * 1000
+        })
+        return info
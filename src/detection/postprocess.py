@@ -0,0 +1,336 @@
+"""
+Detection Post-processing
+Vectorized decoding of raw YOLO output tensors into detections
+"""
+
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Union
+from .preprocess import Letterbox, unletterbox_boxes
+
+
+# Supported model output layouts
+#   yolov5     [N, 5 + classes]: cx, cy, w, h, objectness, class scores
+#   yolov8     [4 + classes, N]: cx, cy, w, h, class scores (no objectness, transposed)
+#   hailo_nms  on-chip NMS by class: per class [y_min, x_min, y_max, x_max, score], normalized
+OUTPUT_FORMATS = ('yolov5', 'yolov8', 'hailo_nms')
+
+# Non-Maximum Suppression: hard drops overlapping boxes, soft decays their scores (Gaussian)
+NMS_METHODS = ('hard', 'soft')
+
+
+def decode_yolo(output: np.ndarray, input_size: Tuple[int, int], original_size: Tuple[int, int],
+                min_confidence: float, class_filter: Optional[np.ndarray] = None,
+                letterbox: Optional[Letterbox] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Decode a [N, 5 + classes] YOLO output into boxes, scores and class ids
+
+    input_size and original_size are (width, height). Boxes are returned as
+    int32 [x1, y1, x2, y2] in original image coordinates, clamped to its bounds.
+    When class_filter (model class ids) is given, only those score columns are
+    read and every other class is ignored. letterbox is the preprocessing
+    transform; without it the input is assumed to have been stretched.
+    """
+    rows = output.reshape(-1, output.shape[-1])
+    if rows.shape[1] < 6:
+        return _empty_result()
+
+    # Final confidence is objectness * class score and class scores are <= 1,
+    # so anything below threshold on objectness alone can be dropped up front
+    rows = rows[rows[:, 4] >= min_confidence]
+    if len(rows) == 0:
+        return _empty_result()
+
+    if class_filter is not None:
+        # Score only the whitelisted columns, then map back to model class ids
+        class_scores = rows[:, 5 + class_filter]
+        class_ids = class_filter[class_scores.argmax(axis=1)]
+    else:
+        class_scores = rows[:, 5:]
+        class_ids = class_scores.argmax(axis=1)
+    scores = class_scores.max(axis=1) * rows[:, 4]
+
+    keep = scores >= min_confidence
+    if not keep.any():
+        return _empty_result()
+
+    boxes = _xywh_to_xyxy(rows[keep, :4], input_size, original_size, letterbox)
+    return boxes, scores[keep].astype(np.float32), class_ids[keep].astype(np.int32)
+
+
+def decode_yolov8(output: np.ndarray, input_size: Tuple[int, int], original_size: Tuple[int, int],
+                  min_confidence: float, class_filter: Optional[np.ndarray] = None,
+                  letterbox: Optional[Letterbox] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Decode a transposed [4 + classes, N] YOLOv8 output (no objectness column)"""
+    output = output.reshape(output.shape[-2], output.shape[-1])
+    if output.shape[0] < 5:
+        return _empty_result()
+
+    # Work column-wise on the transposed layout; only surviving anchors get copied
+    class_scores = output[4 + class_filter] if class_filter is not None else output[4:]
+    scores = class_scores.max(axis=0)
+    keep = np.flatnonzero(scores >= min_confidence)
+    if len(keep) == 0:
+        return _empty_result()
+
+    class_ids = class_scores[:, keep].argmax(axis=0)
+    if class_filter is not None:
+        class_ids = class_filter[class_ids]
+
+    boxes = _xywh_to_xyxy(output[:4, keep].T, input_size, original_size, letterbox)
+    return boxes, scores[keep].astype(np.float32), class_ids.astype(np.int32)
+
+
+def decode_hailo_nms(output: Union[List[np.ndarray], np.ndarray], original_size: Tuple[int, int],
+                     min_confidence: float, class_filter: Optional[np.ndarray] = None,
+                     num_classes: int = 80, input_size: Optional[Tuple[int, int]] = None,
+                     letterbox: Optional[Letterbox] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Decode HailoRT NMS-by-class output; boxes are already suppressed on chip
+
+    Accepts either a list with one [count, 5] array per class or the raw float
+    buffer, where each class is its box count followed by that many boxes.
+    """
+    if not isinstance(output, (list, tuple)):
+        output = _split_nms_buffer(np.asarray(output, dtype=np.float32).reshape(-1), num_classes)
+
+    class_ids = class_filter.tolist() if class_filter is not None else range(len(output))
+    per_class = [
+        (class_id, np.asarray(output[class_id], dtype=np.float32).reshape(-1, 5))
+        for class_id in class_ids if class_id < len(output)
+    ]
+    per_class = [(class_id, boxes) for class_id, boxes in per_class if len(boxes)]
+    if not per_class:
+        return _empty_result()
+
+    rows = np.concatenate([boxes for _, boxes in per_class])
+    ids = np.concatenate([np.full(len(boxes), class_id, dtype=np.int32) for class_id, boxes in per_class])
+
+    keep = rows[:, 4] >= min_confidence
+    if not keep.any():
+        return _empty_result()
+    rows = rows[keep]
+
+    # Normalized y_min, x_min, y_max, x_max -> pixel x1, y1, x2, y2
+    corners = rows[:, [1, 0, 3, 2]]
+    if letterbox is not None and input_size is not None:
+        corners = unletterbox_boxes(corners * np.array(input_size * 2, dtype=np.float32), letterbox)
+    else:
+        corners = corners * np.array(original_size * 2, dtype=np.float32)
+    return _clamp_boxes(corners, original_size), rows[:, 4].copy(), ids[keep]
+
+
+def _split_nms_buffer(buffer: np.ndarray, num_classes: int) -> List[np.ndarray]:
+    """Split a flat NMS buffer (count, boxes..., count, boxes...) into per-class arrays"""
+    per_class = []
+    offset = 0
+    for _ in range(num_classes):
+        if offset >= len(buffer):
+            break
+        count = int(buffer[offset])
+        per_class.append(buffer[offset + 1:offset + 1 + count * 5].reshape(count, 5))
+        offset += 1 + count * 5
+    return per_class
+
+
+def decode_output(output_format: str, output: Any, input_size: Tuple[int, int], original_size: Tuple[int, int],
+                  min_confidence: float, class_filter: Optional[np.ndarray] = None,
+                  num_classes: int = 80, letterbox: Optional[Letterbox] = None
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Decode one output tensor (batch axis removed) with the parser for its layout"""
+    if output_format == 'yolov5':
+        return decode_yolo(np.asarray(output), input_size, original_size, min_confidence, class_filter, letterbox)
+    if output_format == 'yolov8':
+        return decode_yolov8(np.asarray(output), input_size, original_size, min_confidence, class_filter, letterbox)
+    if output_format == 'hailo_nms':
+        return decode_hailo_nms(output, original_size, min_confidence, class_filter, num_classes,
+                                input_size, letterbox)
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def host_nms_required(output_format: str) -> bool:
+    """Whether boxes still need NMS on the host (on-chip NMS already did it)"""
+    return output_format != 'hailo_nms'
+
+
+def detect_output_format(output: Any, num_classes: int = 80) -> str:
+    """Guess the layout of an output tensor (batch axis removed) from its shape"""
+    if isinstance(output, (list, tuple)):
+        return 'hailo_nms'
+
+    output = np.asarray(output)
+    if output.ndim == 1:
+        return 'hailo_nms'
+    if output.shape[-1] == 5 + num_classes:
+        return 'yolov5'
+    if output.ndim == 2 and (output.shape[0] == 4 + num_classes or output.shape[0] < output.shape[1]):
+        return 'yolov8'  # Few rows of many anchors, e.g. [84, 8400]
+    return 'yolov5'
+
+
+def output_format_from_vstream_info(output_info: Any) -> Optional[str]:
+    """Pick the output layout from HEF output vstream metadata, if it says enough"""
+    order = str(getattr(getattr(output_info, 'format', None), 'order', '')).upper()
+    if 'NMS' in order:
+        return 'hailo_nms'
+
+    shape = tuple(getattr(output_info, 'shape', ()))
+    if len(shape) == 2:
+        return detect_output_format(np.empty(shape, dtype=np.uint8))
+    return None
+
+
+def save_recorded_outputs(path: Union[str, Path], outputs: List[Any], output_format: str) -> None:
+    """Save raw output tensors (batch axis removed) so parsers can be replayed offline"""
+    arrays = {'output_format': np.array(output_format)}
+    for index, output in enumerate(outputs):
+        if isinstance(output, (list, tuple)):
+            for class_id, boxes in enumerate(output):
+                arrays[f'output{index}_class{class_id}'] = np.asarray(boxes, dtype=np.float32)
+        else:
+            arrays[f'output{index}'] = np.asarray(output)
+    np.savez_compressed(path, **arrays)
+
+
+def load_recorded_outputs(path: Union[str, Path]) -> Tuple[List[Any], str]:
+    """Load outputs saved by save_recorded_outputs; returns (outputs, output_format)"""
+    with np.load(path) as data:
+        output_format = str(data['output_format'])
+        outputs: Dict[int, Any] = {}
+        for key in data.files:
+            if not key.startswith('output') or key == 'output_format':
+                continue
+            name, _, class_part = key.partition('_class')
+            index = int(name[len('output'):])
+            if class_part:
+                per_class = outputs.setdefault(index, {})
+                per_class[int(class_part)] = data[key]
+            else:
+                outputs[index] = data[key]
+
+    ordered = []
+    for index in sorted(outputs):
+        output = outputs[index]
+        if isinstance(output, dict):
+            output = [output[class_id] for class_id in sorted(output)]
+        ordered.append(output)
+    return ordered, output_format
+
+
+def _xywh_to_xyxy(xywh: np.ndarray, input_size: Tuple[int, int], original_size: Tuple[int, int],
+                  letterbox: Optional[Letterbox] = None) -> np.ndarray:
+    """Convert center/size boxes at model scale to clamped corner boxes at image scale"""
+    half_size = xywh[:, 2:4] / 2
+    corners = np.concatenate((xywh[:, :2] - half_size, xywh[:, :2] + half_size), axis=1)
+
+    if letterbox is not None:
+        return _clamp_boxes(unletterbox_boxes(corners, letterbox), original_size)
+
+    input_width, input_height = input_size
+    original_width, original_height = original_size
+    scale = np.array([original_width / input_width, original_height / input_height] * 2, dtype=np.float32)
+    return _clamp_boxes(corners * scale, original_size)
+
+
+def _clamp_boxes(corners: np.ndarray, original_size: Tuple[int, int]) -> np.ndarray:
+    """Truncate corner boxes to int like int() and clamp them to the image"""
+    original_width, original_height = original_size
+    boxes = corners.astype(np.int32)
+    np.clip(boxes[:, 0::2], 0, original_width - 1, out=boxes[:, 0::2])
+    np.clip(boxes[:, 1::2], 0, original_height - 1, out=boxes[:, 1::2])
+    return boxes
+
+
+def _empty_result() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Decoder result with no detections"""
+    return np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int32)
+
+
+def _nms_rects(boxes: np.ndarray, class_ids: Optional[np.ndarray], dtype: Any) -> np.ndarray:
+    """[x, y, w, h] rectangles for OpenCV, each class shifted to its own region when class_ids is given"""
+    rects = boxes.astype(dtype)
+    rects[:, 2:] -= rects[:, :2]
+    if class_ids is not None:
+        # Classes are offset by more than the largest coordinate, so boxes of different
+        # classes never overlap and one call does the work of a per-class loop
+        rects[:, :2] += (class_ids.astype(dtype) * (int(boxes.max()) + 1))[:, None]
+    return rects
+
+
+def nms_indices(boxes: np.ndarray, scores: np.ndarray, min_confidence: float, nms_threshold: float,
+                class_ids: Optional[np.ndarray] = None) -> np.ndarray:
+    """Indices of the boxes kept by Non-Maximum Suppression
+
+    With class_ids a box only suppresses boxes of its own class (a bus is never
+    removed by an overlapping truck); without them suppression is class-agnostic.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    rects = _nms_rects(boxes, class_ids, np.float32)
+    indices = cv2.dnn.NMSBoxes(rects, scores.astype(np.float32), min_confidence, nms_threshold)
+    return np.array(indices, dtype=np.int64).reshape(-1)
+
+
+def soft_nms(boxes: np.ndarray, scores: np.ndarray, min_confidence: float, nms_threshold: float,
+             class_ids: Optional[np.ndarray] = None, sigma: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+    """Gaussian Soft-NMS: overlapping boxes have their scores decayed instead of being dropped
+
+    Returns the indices of the boxes still at or above min_confidence and their
+    decayed scores. class_ids makes it class-aware, as in nms_indices.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    # OpenCV's Soft-NMS takes integer rectangles; decoded boxes are already whole pixels
+    rects = _nms_rects(boxes, class_ids, np.int32)
+    decayed, indices = cv2.dnn.softNMSBoxes(rects, scores.astype(np.float32), min_confidence, nms_threshold,
+                                            0, sigma)
+    return np.array(indices, dtype=np.int64).reshape(-1), np.array(decayed, dtype=np.float32).reshape(-1)
+
+
+def suppress_boxes(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray, min_confidence: float,
+                   nms_threshold: float, method: str = 'hard', class_aware: bool = True,
+                   sigma: float = 0.5) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Boxes, scores and class ids left after NMS (hard or soft, class-aware or not)"""
+    nms_classes = class_ids if class_aware else None
+    if method == 'soft':
+        keep, decayed = soft_nms(boxes, scores, min_confidence, nms_threshold, nms_classes, sigma)
+        return boxes[keep], decayed, class_ids[keep]
+
+    keep = nms_indices(boxes, scores, min_confidence, nms_threshold, nms_classes)
+    return boxes[keep], scores[keep], class_ids[keep]
+
+
+def build_detections(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+                     class_names: Dict[int, str]) -> List[Dict[str, Any]]:
+    """Build detection dicts for the surviving boxes only"""
+    return [
+        {
+            'bbox': box,
+            'confidence': score,
+            'class_id': class_id,
+            'class_name': class_names.get(class_id, f'class_{class_id}')
+        }
+        for box, score, class_id in zip(boxes.tolist(), scores.tolist(), class_ids.tolist())
+    ]
+
+
+def resolve_class_filter(classes: Optional[List[Any]], class_names: Dict[int, str]) -> Optional[np.ndarray]:
+    """Turn a list of class names or ids into sorted model class ids (None = all classes)"""
+    if not classes:
+        return None
+
+    ids_by_name = {name: class_id for class_id, name in class_names.items()}
+    class_ids = set()
+    unknown = []
+    for entry in classes:
+        if isinstance(entry, int) and entry in class_names:
+            class_ids.add(entry)
+        elif str(entry).lower() in ids_by_name:
+            class_ids.add(ids_by_name[str(entry).lower()])
+        else:
+            unknown.append(entry)
+
+    if unknown:
+        raise ValueError(f"Unknown detection classes: {unknown}")
+    return np.array(sorted(class_ids), dtype=np.int64)
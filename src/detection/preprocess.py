@@ -0,0 +1,129 @@
+"""
+Detection Pre-processing
+Letterboxes frames straight into preallocated uint8 NHWC input buffers
+"""
+
+import queue
+import time
+import weakref
+import cv2
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+
+# Letterbox transform from original pixels to model pixels: (scale, pad_x, pad_y)
+#   model_x = original_x * scale + pad_x
+Letterbox = Tuple[float, int, int]
+
+PAD_VALUE = 114  # Grey padding used when the YOLO models were trained
+
+
+class LetterboxPreprocessor:
+    """Resize with preserved aspect ratio, pad and convert BGR to RGB in place"""
+
+    def __init__(self, input_size: Tuple[int, int], pad_value: int = PAD_VALUE, swap_rb: bool = True,
+                 timers: Optional[Any] = None):
+        self.input_width, self.input_height = input_size
+        self.pad_value = pad_value
+        self.swap_rb = swap_rb
+        self.timers = timers  # Optional StageTimers receiving 'resize' and 'color_convert'
+
+        # Geometry each live buffer was last padded for, held by weak reference so a new
+        # buffer that reuses a freed one's id is never mistaken for it; borders only
+        # need filling when a reused buffer's geometry changes
+        self._buffer_geometry: Dict[int, Tuple[weakref.ref, Tuple[int, int, int, int]]] = {}
+
+    def get_letterbox(self, frame_width: int, frame_height: int) -> Tuple[Letterbox, Tuple[int, int]]:
+        """Transform and resized (width, height) for a frame size"""
+        scale = min(self.input_width / frame_width, self.input_height / frame_height)
+        resized_width = max(1, min(self.input_width, int(round(frame_width * scale))))
+        resized_height = max(1, min(self.input_height, int(round(frame_height * scale))))
+        pad_x = (self.input_width - resized_width) // 2
+        pad_y = (self.input_height - resized_height) // 2
+        return (scale, pad_x, pad_y), (resized_width, resized_height)
+
+    def letterbox(self, frame: np.ndarray, out: np.ndarray) -> Letterbox:
+        """Write frame into out (a [1, H, W, 3] or [H, W, 3] uint8 buffer) and return the transform"""
+        image = out[0] if out.ndim == 4 else out
+        frame_height, frame_width = frame.shape[:2]
+        transform, (resized_width, resized_height) = self.get_letterbox(frame_width, frame_height)
+        _, pad_x, pad_y = transform
+
+        geometry = (frame_width, frame_height, resized_width, resized_height)
+        if self._padded_geometry(out) != geometry:
+            image.fill(self.pad_value)
+            self._remember_geometry(out, geometry)
+
+        # Resize straight into the buffer's content area, then swap channels in place
+        start_ns = time.perf_counter_ns()
+        content = image[pad_y:pad_y + resized_height, pad_x:pad_x + resized_width]
+        if (resized_width, resized_height) == (frame_width, frame_height):
+            np.copyto(content, frame)
+        else:
+            cv2.resize(frame, (resized_width, resized_height), dst=content, interpolation=cv2.INTER_LINEAR)
+        resized_ns = time.perf_counter_ns()
+        if self.swap_rb:
+            cv2.cvtColor(content, cv2.COLOR_BGR2RGB, dst=content)
+
+        if self.timers is not None:
+            self.timers.record('resize', resized_ns - start_ns)
+            self.timers.record('color_convert', time.perf_counter_ns() - resized_ns)
+
+        return transform
+
+    def _padded_geometry(self, out: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Geometry out was last padded for, or None for a buffer not seen before"""
+        entry = self._buffer_geometry.get(id(out))
+        if entry is None or entry[0]() is not out:
+            return None
+        return entry[1]
+
+    def _remember_geometry(self, out: np.ndarray, geometry: Tuple[int, int, int, int]) -> None:
+        """Record out's padding; the entry goes away with the buffer"""
+        key = id(out)
+        entries = self._buffer_geometry
+        entries[key] = (weakref.ref(out, lambda _: entries.pop(key, None)), geometry)
+
+
+class InputBufferPool:
+    """Fixed set of preallocated [1, H, W, 3] uint8 input tensors
+
+    A buffer is acquired when a frame is preprocessed and released once the
+    accelerator has consumed it, so pipelined frames never share memory.
+    """
+
+    def __init__(self, input_size: Tuple[int, int], count: int):
+        input_width, input_height = input_size
+        self.count = max(1, count)
+        self._free: queue.Queue = queue.Queue()
+        self._shape = (1, input_height, input_width, 3)
+        for _ in range(self.count):
+            self._free.put(np.empty(self._shape, dtype=np.uint8))
+
+    def acquire(self, timeout: Optional[float] = None) -> np.ndarray:
+        """Take a free buffer, waiting if all are in flight"""
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError("No free input buffer - too many frames in flight")
+
+    def reserve(self, count: int) -> None:
+        """Grow the pool to at least count buffers"""
+        while self.count < count:
+            self._free.put(np.empty(self._shape, dtype=np.uint8))
+            self.count += 1
+
+    def release(self, buffer: np.ndarray) -> None:
+        """Return a buffer once its contents are no longer needed"""
+        if buffer.shape == self._shape:  # Buffers from before an input size change are dropped
+            self._free.put(buffer)
+
+    def available(self) -> int:
+        """Number of free buffers"""
+        return self._free.qsize()
+
+
+def unletterbox_boxes(corners: np.ndarray, letterbox: Letterbox) -> np.ndarray:
+    """Map [x1, y1, x2, y2] corner boxes from model pixels back to original pixels"""
+    scale, pad_x, pad_y = letterbox
+    return (corners - np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)) / scale
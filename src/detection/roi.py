@@ -0,0 +1,108 @@
+"""
+Regions of Interest
+Rectangular and polygon crops so only the street band of a frame is inferred
+"""
+
+import cv2
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+
+class RegionOfInterest:
+    """A named frame region given in normalized (0-1) coordinates"""
+
+    def __init__(self, config: Dict[str, Any], index: int = 0):
+        self.name = config.get('name', f'roi{index}')
+
+        if 'points' in config:
+            self.points = np.array(config['points'], dtype=np.float32)
+            if self.points.ndim != 2 or self.points.shape[0] < 3 or self.points.shape[1] != 2:
+                raise ValueError(f"ROI '{self.name}' needs at least three [x, y] points")
+        else:
+            x_min = config.get('x_min', 0.0)
+            y_min = config.get('y_min', 0.0)
+            x_max = config.get('x_max', 1.0)
+            y_max = config.get('y_max', 1.0)
+            if not (0.0 <= x_min < x_max <= 1.0 and 0.0 <= y_min < y_max <= 1.0):
+                raise ValueError(f"ROI '{self.name}' must satisfy 0 <= min < max <= 1")
+            self.points = None
+            self.bounds = (x_min, y_min, x_max, y_max)
+
+        if self.points is not None:
+            self.bounds = (
+                float(self.points[:, 0].min()), float(self.points[:, 1].min()),
+                float(self.points[:, 0].max()), float(self.points[:, 1].max())
+            )
+
+        # Pixel geometry is resolved lazily for the first frame size seen
+        self._frame_size = None
+        self._rect = (0, 0, 0, 0)
+        self._mask = None
+        self._scratch = None
+
+        # Statistics
+        self.inferences = 0
+        self.total_time = 0.0
+        self.pixel_fraction = 1.0
+
+    def _resolve(self, frame_width: int, frame_height: int) -> None:
+        """Convert normalized geometry to pixels for this frame size"""
+        x_min, y_min, x_max, y_max = self.bounds
+        x1 = int(np.floor(x_min * frame_width))
+        y1 = int(np.floor(y_min * frame_height))
+        x2 = max(x1 + 1, int(np.ceil(x_max * frame_width)))
+        y2 = max(y1 + 1, int(np.ceil(y_max * frame_height)))
+        self._rect = (x1, y1, x2, y2)
+
+        if self.points is not None:
+            # Mask of the polygon inside its bounding box; pixels outside are blanked
+            polygon = self.points * np.array([frame_width, frame_height], dtype=np.float32)
+            polygon = np.round(polygon - np.array([x1, y1], dtype=np.float32)).astype(np.int32)
+            self._mask = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+            cv2.fillPoly(self._mask, [polygon], 255)
+            self._scratch = None
+
+        self.pixel_fraction = ((x2 - x1) * (y2 - y1)) / float(frame_width * frame_height)
+        self._frame_size = (frame_width, frame_height)
+
+    def crop(self, frame: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """Return the region (a view for rectangles) and its top-left offset"""
+        frame_height, frame_width = frame.shape[:2]
+        if self._frame_size != (frame_width, frame_height):
+            self._resolve(frame_width, frame_height)
+
+        x1, y1, x2, y2 = self._rect
+        region = frame[y1:y2, x1:x2]
+
+        if self._mask is not None:
+            # Polygon: copy into a reused buffer with everything outside blanked
+            if self._scratch is None or self._scratch.shape != region.shape:
+                self._scratch = np.empty_like(region)
+            self._scratch.fill(0)
+            cv2.copyTo(region, self._mask, self._scratch)
+            region = self._scratch
+
+        return region, (x1, y1)
+
+    def record(self, elapsed: float) -> None:
+        """Record time spent on this region"""
+        self.inferences += 1
+        self.total_time += elapsed
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get per-region timing and the share of the frame actually processed"""
+        return {
+            'inferences': self.inferences,
+            'avg_time_ms': (self.total_time / self.inferences * 1000) if self.inferences else 0.0,
+            'pixel_fraction': self.pixel_fraction
+        }
+
+
+def load_rois(config: Optional[List[Dict[str, Any]]]) -> List[RegionOfInterest]:
+    """Build ROIs from the detection.roi configuration list"""
+    if not config:
+        return []
+    if isinstance(config, dict):
+        config = [config]
+    return [RegionOfInterest(roi_config, index) for index, roi_config in enumerate(config)]
+
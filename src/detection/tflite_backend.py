@@ -0,0 +1,135 @@
+"""
+TFLite Backend
+CPU inference of TFLite YOLO exports with the XNNPACK delegate
+"""
+
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, Any, List
+from .backend import InferenceBackend
+from .postprocess import detect_output_format
+
+try:
+    # The slim runtime is preferred on the Pi; full TensorFlow works too
+    from tflite_runtime.interpreter import Interpreter
+    TFLITE_AVAILABLE = True
+except ImportError:
+    try:
+        from tensorflow.lite import Interpreter
+        TFLITE_AVAILABLE = True
+    except ImportError:
+        TFLITE_AVAILABLE = False
+
+
+class TFLiteBackend(InferenceBackend):
+    """Runs letterboxed uint8 NHWC frames through a TFLite interpreter one at a time"""
+
+    name = 'tflite'
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        tflite_config = config.get('tflite', {})
+
+        self.model_path = tflite_config.get('model_path', 'models/yolov8n_float16.tflite')
+        self.threads = tflite_config.get('threads', 4)
+        # Ultralytics exports report boxes as fractions of the input size
+        self.normalized_boxes = tflite_config.get('normalized_boxes', True)
+        self.box_layout = config.get('output_format', 'auto')  # Resolved from the first output when auto
+
+        self.interpreter = None
+        self.input_detail = None
+        self.output_details: List[Dict[str, Any]] = []
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return TFLITE_AVAILABLE
+
+    def initialize(self) -> bool:
+        if not TFLITE_AVAILABLE:
+            self.logger.warning("tflite_runtime / tensorflow not installed")
+            return False
+
+        if not Path(self.model_path).exists():
+            self.logger.error(f"TFLite model not found: {self.model_path}")
+            return False
+
+        try:
+            start_time = time.time()
+            # XNNPACK is applied by default to float models when num_threads is set
+            self.interpreter = Interpreter(model_path=self.model_path, num_threads=int(self.threads))
+            self.interpreter.allocate_tensors()
+            self.input_detail = self.interpreter.get_input_details()[0]
+            self.output_details = self.interpreter.get_output_details()
+
+            _, height, width, _ = self.input_detail['shape']
+            self.input_size = (int(width), int(height))
+            self.max_batch_size = 1
+            self.startup_times['load_model'] = time.time() - start_time
+
+            self.logger.info(
+                f"TFLite model loaded: {self.model_path} (input {self.input_detail['dtype'].__name__}, "
+                f"{self.threads} threads, {self.startup_times['load_model'] * 1000:.0f}ms)"
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to load TFLite model: {e}")
+            self.interpreter = None
+            return False
+
+    def infer(self, input_batch: np.ndarray) -> Dict[str, np.ndarray]:
+        self.interpreter.set_tensor(self.input_detail['index'], self._quantize_input(input_batch))
+        self.interpreter.invoke()
+
+        outputs = {}
+        for detail in self.output_details:
+            output = self._dequantize(self.interpreter.get_tensor(detail['index']), detail)
+            if self.normalized_boxes and output.ndim == 3:
+                self._scale_boxes(output)
+            outputs[detail['name']] = output
+        return outputs
+
+    def _scale_boxes(self, output: np.ndarray) -> None:
+        """Box coordinates back to model pixels for the shared decoder, in place"""
+        if self.box_layout == 'auto':
+            self.box_layout = detect_output_format(output[0])
+            self.logger.info(f"TFLite output layout: {self.box_layout}")
+
+        input_width, input_height = self.input_size
+        scale = np.array([input_width, input_height, input_width, input_height], dtype=np.float32)
+        if self.box_layout == 'yolov8':
+            # [1, 4 + classes, anchors]: the first four rows are boxes
+            output[:, :4, :] *= scale.reshape(1, 4, 1)
+        elif self.box_layout == 'yolov5':
+            # [1, anchors, 5 + classes]: the first four columns are boxes
+            output[..., :4] *= scale
+
+    def _quantize_input(self, input_batch: np.ndarray) -> np.ndarray:
+        """Convert uint8 pixels to the model's input type"""
+        dtype = self.input_detail['dtype']
+        if dtype == np.float32:
+            return input_batch.astype(np.float32) * (1.0 / 255.0)
+
+        # Quantized model: pixel / 255 mapped through the input's scale and zero point
+        scale, zero_point = self.input_detail['quantization']
+        if dtype == np.uint8 and np.isclose(scale, 1.0 / 255.0) and zero_point == 0:
+            return input_batch
+        info = np.iinfo(dtype)
+        quantized = np.round(input_batch / 255.0 / scale + zero_point)
+        return np.clip(quantized, info.min, info.max).astype(dtype)
+
+    def _dequantize(self, output: np.ndarray, detail: Dict[str, Any]) -> np.ndarray:
+        """Float copy of an output tensor"""
+        if output.dtype == np.float32:
+            return output
+        scale, zero_point = detail['quantization']
+        return (output.astype(np.float32) - zero_point) * scale
+
+    def release(self) -> None:
+        self.interpreter = None
+
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info.update({'model_path': self.model_path, 'threads': self.threads})
+        return info
@@ -0,0 +1,93 @@
+"""
+Tiled Inference
+Overlapping model-sized tiles so distant (small) buses keep enough pixels to be detected
+"""
+
+import math
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# Tile rectangle in region pixels: (x1, y1, x2, y2)
+Tile = Tuple[int, int, int, int]
+
+
+def tile_starts(length: int, tile: int, overlap: float) -> List[int]:
+    """Evenly spread tile origins covering [0, length) with at least the given overlap"""
+    if length <= tile:
+        return [0]
+    step = max(1, int(tile * (1.0 - overlap)))
+    count = math.ceil((length - tile) / step) + 1
+    return [round(index * (length - tile) / (count - 1)) for index in range(count)]
+
+
+class TileGrid:
+    """Tiles for each region size seen, computed once per size"""
+
+    def __init__(self, tile_size: Tuple[int, int], overlap: float = 0.2):
+        self.tile_width, self.tile_height = tile_size
+        if not 0.0 <= overlap < 1.0:
+            raise ValueError("Tile overlap must be in [0, 1)")
+        self.overlap = overlap
+        self._cache: Dict[Tuple[int, int], List[Tile]] = {}
+
+    def tiles(self, region_shape: Tuple[int, ...]) -> List[Tile]:
+        """Tiles for a region; empty when one tile would cover it (the full pass already does)"""
+        region_height, region_width = region_shape[:2]
+        key = (region_width, region_height)
+        if key not in self._cache:
+            if region_width <= self.tile_width and region_height <= self.tile_height:
+                self._cache[key] = []
+            else:
+                tile_width = min(self.tile_width, region_width)
+                tile_height = min(self.tile_height, region_height)
+                self._cache[key] = [
+                    (x, y, x + tile_width, y + tile_height)
+                    for y in tile_starts(region_height, tile_height, self.overlap)
+                    for x in tile_starts(region_width, tile_width, self.overlap)
+                ]
+        return self._cache[key]
+
+
+class TileScheduler:
+    """Decides which frames get the tiled pass on top of the full-frame pass"""
+
+    def __init__(self, every_n_frames: int = 1):
+        self.every_n_frames = max(1, every_n_frames)
+        self.frames = 0
+        self.tiled_frames = 0
+        self.tiles_inferred = 0
+
+    def next_frame(self) -> bool:
+        """Advance one frame; True when this frame should also be tiled"""
+        tiled = self.frames % self.every_n_frames == 0
+        self.frames += 1
+        if tiled:
+            self.tiled_frames += 1
+        return tiled
+
+    def record(self, tile_count: int) -> None:
+        """Count the tiles inferred for a tiled frame"""
+        self.tiles_inferred += tile_count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tiled pass frequency and average tiles per tiled frame"""
+        return {
+            'every_n_frames': self.every_n_frames,
+            'frames': self.frames,
+            'tiled_frames': self.tiled_frames,
+            'avg_tiles': (self.tiles_inferred / self.tiled_frames) if self.tiled_frames else 0.0
+        }
+
+
+def load_tiling(config: Optional[Dict[str, Any]],
+                input_size: Tuple[int, int]) -> Tuple[Optional[TileGrid], Optional[TileScheduler]]:
+    """Build the tile grid and scheduler from detection.tiling (None, None when disabled)"""
+    if not config or not config.get('enabled', False):
+        return None, None
+
+    # Default tiles are model-sized so they are inferred without downscaling
+    tile_size = config.get('tile_size') or {}
+    tile_width = tile_size.get('width', input_size[0])
+    tile_height = tile_size.get('height', input_size[1])
+    grid = TileGrid((tile_width, tile_height), config.get('overlap', 0.2))
+    return grid, TileScheduler(config.get('every_n_frames', 1))
@@ -0,0 +1,417 @@
+"""
+Inference Worker Pool
+Detection in warm worker processes fed through shared memory, for nodes without an accelerator
+"""
+
+import os
+import queue
+import threading
+import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from ..utils.logger import get_logger
+
+
+def _worker_main(worker_id: int, config: Dict[str, Any], backend: Optional[str], cpus: Optional[List[int]],
+                 task_queue: Any, result_queue: Any) -> None:
+    """Worker process: load a Detector once, then detect frames read from shared memory"""
+    from .detector import Detector
+
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            get_logger('worker_pool').warning(f"Worker {worker_id} could not be pinned to CPUs {cpus}: {e}")
+
+    detector = Detector(config, backend)
+    ready = detector.initialize()
+    result_queue.put(('ready', worker_id, ready, detector.backend.name if ready else None))
+    if not ready:
+        return
+
+    segments: Dict[int, shared_memory.SharedMemory] = {}  # Slot index -> attached segment
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            sequence, slot_index, segment_name, shape, dtype = task
+            segment = segments.get(slot_index)
+            if segment is None or segment.name != segment_name:
+                # The slot was regrown; let go of the old (already unlinked) segment
+                if segment is not None:
+                    segment.close()
+                segment = segments[slot_index] = shared_memory.SharedMemory(name=segment_name)
+            frame = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+            start_time = time.perf_counter()
+            try:
+                detections = detector.detect(frame)
+                result_queue.put(('result', sequence, worker_id, detections, time.perf_counter() - start_time))
+            except Exception as e:
+                result_queue.put(('error', sequence, worker_id, str(e), time.perf_counter() - start_time))
+            del frame
+    finally:
+        for segment in segments.values():
+            segment.close()
+        detector.cleanup()
+
+
+class FrameSlot:
+    """A shared-memory frame buffer, regrown when a larger frame arrives"""
+
+    def __init__(self, size: int):
+        self.segment = shared_memory.SharedMemory(create=True, size=max(1, size))
+
+    def write(self, frame: np.ndarray) -> str:
+        """Copy frame into the slot; returns the segment name workers attach to"""
+        if frame.nbytes > self.segment.size:
+            self.close()
+            self.segment = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self.segment.buf)
+        np.copyto(view, frame)
+        del view
+        return self.segment.name
+
+    def close(self) -> None:
+        """Release and remove the segment"""
+        self.segment.close()
+        self.segment.unlink()
+
+
+class WorkerPoolDetector:
+    """Runs detect() in N worker processes, each holding its own warm model
+
+    Frames are copied once into shared-memory slots, never pickled; only the
+    small detection lists come back. Results are delivered in submission order,
+    so a slow frame holds back later ones rather than reordering them. A worker
+    that dies (or stalls past frame_timeout) has its frames failed and is
+    replaced, so one lost process never blocks the frames behind it.
+    """
+
+    def __init__(self, config: Dict[str, Any], backend: Optional[str] = None):
+        self.config = config
+        self.logger = get_logger('worker_pool')
+
+        pool_config = config.get('worker_pool', {})
+        self.num_workers = max(1, pool_config.get('workers', os.cpu_count() or 1))
+        self.cpu_affinity = pool_config.get('cpu_affinity', [])  # CPU ids, one per worker round-robin
+        self.slots_per_worker = max(1, pool_config.get('slots_per_worker', 2))
+        self.slot_timeout = pool_config.get('slot_timeout', 5.0)  # Max wait in submit() for a free slot
+        self.frame_timeout = pool_config.get('frame_timeout', 30.0)  # A worker this late on a frame is stuck
+        self.max_restarts = pool_config.get('max_restarts', 5)  # Replacements over the pool's lifetime
+
+        # Each worker gets a CPU backend limited to threads_per_worker, so N workers share the cores
+        self.backend_name = pool_config.get('backend') or backend or config.get('backend', 'opencv')
+        if self.backend_name == 'hailo':
+            raise ValueError("The worker pool runs CPU backends; set detection.worker_pool.backend")
+        threads = pool_config.get('threads_per_worker', 1)
+        self.worker_config = {
+            **config,
+            'async_pipeline': {},
+            'fallback_backends': [name for name in config.get('fallback_backends', ['opencv']) if name != 'hailo'],
+            **{section: {**config.get(section, {}), 'threads': threads} for section in ('opencv', 'onnxruntime', 'tflite')}
+        }
+
+        # One task queue per worker, so the frames a dead worker took are known
+        self.context = multiprocessing.get_context('spawn')
+        self.processes: List[Any] = [None] * self.num_workers
+        self.task_queues: List[Any] = [None] * self.num_workers
+        self.worker_states = ['stopped'] * self.num_workers  # starting, ready or dead
+        self.assigned: List[set] = [set() for _ in range(self.num_workers)]  # Sequences queued on each worker
+        self.result_queue = None
+        self.worker_backend = None
+        self.last_health_check = 0.0
+
+        # Shared-memory slots; a slot is free again once its frame's result is back
+        self.slots: List[FrameSlot] = []
+        self.free_slots: queue.Queue = queue.Queue()
+
+        # In-order delivery: results wait in `finished` until every earlier frame is resolved
+        self.lock = threading.Lock()
+        self.next_sequence = 0
+        self.next_to_resolve = 0
+        self.pending: Dict[int, Tuple[Future, int, float, int]] = {}  # future, slot, submit time, worker
+        self.finished: Dict[int, Tuple[bool, Any]] = {}
+        self.collector = None
+        self.running = False
+
+        # Statistics
+        self.frames_completed = 0
+        self.frames_failed = 0
+        self.worker_time = 0.0
+        self.total_latency = 0.0
+        self.reordered = 0
+        self.restarts = 0
+        self.frames_per_worker = [0] * self.num_workers
+        self.start_time = 0.0
+
+    def initialize(self, timeout: float = 120.0) -> bool:
+        """Start the workers and wait until their models are loaded"""
+        self.result_queue = self.context.Queue()
+        for worker_id in range(self.num_workers):
+            self._start_worker(worker_id)
+
+        ready = 0
+        reported = set()
+        deadline = time.time() + timeout
+        while len(reported) < self.num_workers and time.time() < deadline:
+            try:
+                _, worker_id, worker_ready, backend_name = self.result_queue.get(timeout=0.5)
+            except queue.Empty:
+                # A worker that died while loading never reports
+                for worker_id, process in enumerate(self.processes):
+                    if not process.is_alive() and worker_id not in reported:
+                        self.logger.warning(f"Inference worker {worker_id} exited during startup")
+                        self.worker_states[worker_id] = 'dead'
+                        reported.add(worker_id)
+                continue
+
+            reported.add(worker_id)
+            if worker_ready:
+                ready += 1
+                self.worker_states[worker_id] = 'ready'
+                self.worker_backend = backend_name
+            else:
+                self.worker_states[worker_id] = 'dead'
+                self.logger.warning(f"Inference worker {worker_id} could not load a backend")
+
+        if ready == 0:
+            self.logger.error("No inference worker started")
+            self.cleanup()
+            return False
+
+        for index in range(ready * self.slots_per_worker):
+            self.slots.append(FrameSlot(0))
+            self.free_slots.put(index)
+
+        self.running = True
+        self.start_time = time.time()
+        self.collector = threading.Thread(target=self._collect_loop, name='inference-collector', daemon=True)
+        self.collector.start()
+
+        self.logger.info(f"Worker pool started: {ready}/{self.num_workers} workers on {self.worker_backend}"
+                         + (f", pinned to CPUs {self.cpu_affinity}" if self.cpu_affinity else ""))
+        return True
+
+    def _start_worker(self, worker_id: int) -> None:
+        """Spawn (or replace) a worker process with a fresh task queue"""
+        cpus = [self.cpu_affinity[worker_id % len(self.cpu_affinity)]] if self.cpu_affinity else None
+        self.task_queues[worker_id] = self.context.Queue()
+        process = self.context.Process(
+            target=_worker_main, name=f'inference-worker-{worker_id}', daemon=True,
+            args=(worker_id, self.worker_config, self.backend_name, cpus,
+                  self.task_queues[worker_id], self.result_queue)
+        )
+        process.start()
+        self.processes[worker_id] = process
+        self.worker_states[worker_id] = 'starting'
+
+    def start_async(self, queue_size: Optional[int] = None) -> bool:
+        """Submission is always asynchronous; the slots bound the frames in flight"""
+        return self.running
+
+    def stop_async(self) -> None:
+        """Workers are stopped by cleanup()"""
+        pass
+
+    def submit(self, frame: np.ndarray, context: Any = None,
+               callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """Copy a frame to a free slot and queue it; the frame may be reused once this returns"""
+        future: Future = Future()
+        if callback:
+            future.add_done_callback(callback)
+
+        if not self.running:
+            future.set_exception(RuntimeError("Worker pool is not running"))
+            return future
+
+        try:
+            slot_index = self.free_slots.get(timeout=self.slot_timeout)  # Waits while every slot is in flight
+        except queue.Empty:
+            self.frames_failed += 1
+            future.set_exception(RuntimeError(f"No free frame slot within {self.slot_timeout}s - workers stalled"))
+            return future
+
+        segment_name = self.slots[slot_index].write(frame)
+        with self.lock:
+            # Least loaded worker that is loaded or loading; dead ones get nothing
+            candidates = [worker_id for worker_id, state in enumerate(self.worker_states) if state != 'dead']
+            if not candidates:
+                self.free_slots.put(slot_index)
+                self.frames_failed += 1
+                future.set_exception(RuntimeError("No inference worker is alive"))
+                return future
+            worker_id = min(candidates, key=lambda candidate: len(self.assigned[candidate]))
+
+            sequence = self.next_sequence
+            self.next_sequence += 1
+            self.pending[sequence] = (future, slot_index, time.time(), worker_id)
+            self.assigned[worker_id].add(sequence)
+            self.task_queues[worker_id].put((sequence, slot_index, segment_name, frame.shape, frame.dtype.str))
+        return future
+
+    def detect(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+        """Synchronous detection on the next free worker"""
+        return self.submit(frame).result()
+
+    def quality_settings(self) -> Tuple[str, ...]:
+        """The workers' detectors are fixed once started"""
+        return ()
+
+    def apply_quality(self, settings: Dict[str, Any]) -> None:
+        """Workers keep their configured detector settings; only the inference rate tier applies"""
+        if set(settings) - {'inference_rate'}:
+            self.logger.debug(f"Worker pool ignores quality settings {sorted(set(settings) - {'inference_rate'})}")
+
+    def _collect_loop(self) -> None:
+        """Receive worker results, watch worker health and resolve futures in submission order"""
+        while self.running:
+            try:
+                message = self.result_queue.get(timeout=0.1)
+            except queue.Empty:
+                message = None
+            except (EOFError, OSError):
+                break
+
+            if message is not None:
+                if message[0] == 'ready':
+                    self._worker_ready(*message[1:])
+                else:
+                    kind, sequence, worker_id, payload, elapsed = message
+                    self._finish_frames([sequence], kind == 'result', payload, worker_id, elapsed)
+
+            if time.time() - self.last_health_check >= 0.5:
+                self.last_health_check = time.time()
+                self._check_workers()
+
+    def _worker_ready(self, worker_id: int, ready: bool, backend_name: Optional[str]) -> None:
+        """A replacement worker finished loading (or failed to)"""
+        if ready:
+            self.worker_states[worker_id] = 'ready'
+            self.logger.info(f"Inference worker {worker_id} restarted on {backend_name}")
+        else:
+            self.logger.warning(f"Replacement inference worker {worker_id} could not load a backend")
+
+    def _check_workers(self) -> None:
+        """Fail the frames of dead or stuck workers and start replacements"""
+        with self.lock:
+            head = self.pending.get(self.next_to_resolve)
+        if head is not None and self.next_to_resolve not in self.finished \
+                and time.time() - head[2] > self.frame_timeout:
+            worker_id = head[3]
+            process = self.processes[worker_id]
+            if process is not None and process.is_alive():
+                self.logger.error(f"Inference worker {worker_id} stuck for over {self.frame_timeout}s - terminating it")
+                process.terminate()
+                process.join(timeout=1.0)
+
+        for worker_id, process in enumerate(self.processes):
+            if self.worker_states[worker_id] == 'dead' or process is None or process.is_alive():
+                continue
+
+            self.worker_states[worker_id] = 'dead'
+            with self.lock:
+                lost = sorted(self.assigned[worker_id])
+            self.logger.error(f"Inference worker {worker_id} exited (code {process.exitcode}) "
+                              f"with {len(lost)} frame(s) in flight")
+            self._finish_frames(lost, False, f"Inference worker {worker_id} exited", worker_id, 0.0)
+
+            if self.restarts < self.max_restarts:
+                self.restarts += 1
+                self._start_worker(worker_id)
+            else:
+                self.logger.error(f"Not restarting inference worker {worker_id}: "
+                                  f"{self.max_restarts} restarts already used")
+
+    def _finish_frames(self, sequences: List[int], ok: bool, payload: Any, worker_id: int, elapsed: float) -> None:
+        """Record frames' outcomes, free their slots and resolve every frame now in order"""
+        with self.lock:
+            for sequence in sequences:
+                # Late results for frames already failed with their worker are dropped
+                if sequence not in self.pending or sequence in self.finished:
+                    continue
+                _, slot_index, _, assigned_worker = self.pending[sequence]
+                self.free_slots.put(slot_index)
+                self.assigned[assigned_worker].discard(sequence)
+                self.finished[sequence] = (ok, payload)
+                self.frames_per_worker[worker_id] += 1
+                self.worker_time += elapsed
+                if sequence != self.next_to_resolve:
+                    self.reordered += 1
+
+            ready = []
+            while self.next_to_resolve in self.finished:
+                ok_result, result = self.finished.pop(self.next_to_resolve)
+                ready.append((self.pending.pop(self.next_to_resolve), ok_result, result))
+                self.next_to_resolve += 1
+
+        # Callbacks run outside the lock so they may submit more frames
+        for (done_future, _, done_submit_time, _), ok_result, result in ready:
+            if ok_result:
+                self.frames_completed += 1
+                self.total_latency += time.time() - done_submit_time
+                done_future.set_result(result)
+            else:
+                self.frames_failed += 1
+                self.logger.error(f"Inference worker failed: {result}")
+                done_future.set_exception(RuntimeError(result))
+
+    def get_performance_stats(self) -> Dict[str, Any]:
+        """Throughput, latency and per-worker load"""
+        elapsed = time.time() - self.start_time if self.start_time else 0.0
+        completed = self.frames_completed + self.frames_failed
+        stats = {
+            'backend': self.worker_backend,
+            'avg_inference_time': (self.worker_time / completed) if completed else 0.0,
+            'total_inferences': self.frames_completed,
+            'worker_pool': {
+                'workers': self.num_workers,
+                'alive': sum(process is not None and process.is_alive() for process in self.processes),
+                'restarts': self.restarts,
+                'cpu_affinity': self.cpu_affinity,
+                'in_flight': len(self.pending),
+                'frames_per_worker': list(self.frames_per_worker),
+                'avg_latency_ms': (self.total_latency / self.frames_completed * 1000) if self.frames_completed else 0.0,
+                'reordered': self.reordered,
+                'frames_failed': self.frames_failed
+            }
+        }
+        if elapsed > 0:
+            stats['fps'] = self.frames_completed / elapsed
+        return stats
+
+    def cleanup(self) -> None:
+        """Stop the workers and remove the shared-memory slots"""
+        self.logger.info("Stopping inference workers")
+
+        # Stop the collector first so exiting workers are not taken for crashes and restarted
+        self.running = False
+        if self.collector:
+            self.collector.join(timeout=1.0)
+            self.collector = None
+
+        for worker_id, process in enumerate(self.processes):
+            if process is not None and process.is_alive():
+                self.task_queues[worker_id].put(None)
+        for process in self.processes:
+            if process is None:
+                continue
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes = [None] * self.num_workers
+
+        with self.lock:
+            for future, _, _, _ in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+            self.finished.clear()
+
+        for slot in self.slots:
+            slot.close()
+        self.slots = []
@@ -0,0 +1,90 @@
+"""
+Latency Histograms
+Fixed-bucket duration histograms cheap enough to record every frame in production
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, Iterable
+
+
+# Bucket upper bounds in nanoseconds: 1-2-5 steps from 10us to 5s, plus an open-ended overflow bucket
+BUCKET_BOUNDS_NS = tuple(int(multiplier * 10 ** exponent) for exponent in range(4, 10) for multiplier in (1, 2, 5))
+
+
+class LatencyHistogram:
+    """Counts of durations per fixed bucket, with count, mean and max"""
+
+    def __init__(self, bounds_ns: tuple = BUCKET_BOUNDS_NS):
+        self.bounds_ns = bounds_ns
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all samples"""
+        self.counts = [0] * (len(self.bounds_ns) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, duration_ns: int) -> None:
+        """Add one duration (from time.perf_counter_ns differences)"""
+        self.counts[bisect_left(self.bounds_ns, duration_ns)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound (ms) of the bucket holding the given fraction of samples"""
+        if self.count == 0:
+            return 0.0
+        target = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target and bucket_count:
+                upper_ns = self.bounds_ns[index] if index < len(self.bounds_ns) else self.max_ns
+                return min(upper_ns, self.max_ns) / 1e6
+        return self.max_ns / 1e6
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary plus the non-empty buckets keyed by their upper bound"""
+        buckets = {}
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count:
+                label = f"<={self.bounds_ns[index] / 1e6:g}ms" if index < len(self.bounds_ns) \
+                    else f">{self.bounds_ns[-1] / 1e6:g}ms"
+                buckets[label] = bucket_count
+        return {
+            'count': self.count,
+            'mean_ms': (self.total_ns / self.count / 1e6) if self.count else 0.0,
+            'max_ms': self.max_ns / 1e6,
+            'p50_ms': self.percentile(0.5),
+            'p90_ms': self.percentile(0.9),
+            'p99_ms': self.percentile(0.99),
+            'buckets': buckets
+        }
+
+
+class StageTimers:
+    """One histogram per named stage; safe to record from several threads"""
+
+    def __init__(self, stages: Iterable[str]):
+        self.lock = threading.Lock()
+        self.histograms = {stage: LatencyHistogram() for stage in stages}
+
+    def record(self, stage: str, duration_ns: int) -> None:
+        """Add a duration to a stage's histogram"""
+        with self.lock:
+            self.histograms[stage].record(duration_ns)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Summaries of the stages that have samples"""
+        with self.lock:
+            return {stage: histogram.snapshot() for stage, histogram in self.histograms.items() if histogram.count}
+
+    def reset(self) -> None:
+        """Forget all samples"""
+        with self.lock:
+            for histogram in self.histograms.values():
+                histogram.reset()
@@ -34,6 +34,11 @@ class PerformanceMonitor:
         self.detection_history = deque(maxlen=100)  # Keep last 100 detections
         self.fps_history = deque(maxlen=100)  # Keep last 100 FPS measurements
         self.system_stats = deque(maxlen=100)  # Keep last 100 system stat snapshots
+        self.camera_stats = {}  # Latest per-camera fps, latency and drop counters
+        self.detector_stats = {}  # Latest detector statistics (per-ROI timing, ...)
+        self.motion_stats = {}  # Latest per-camera motion gate counters
+        self.schedule_stats = {}  # Current duty-cycle mode and time spent in each
+        self.quality_stats = {}  # Current quality tier and how often it changed
         
         # Counters
         self.total_frames_processed = 0
@@ -119,6 +124,41 @@ class PerformanceMonitor:
         if bus_detected:
             self._log_bus_detection()
     
+    def update_camera_stats(self, camera_stats: Dict[str, Any]):
+        """Record per-camera statistics reported by the camera pool"""
+        if not self.enabled:
+            return
+        
+        self.camera_stats = camera_stats
+    
+    def update_detector_stats(self, detector_stats: Dict[str, Any]):
+        """Record statistics reported by the detector"""
+        if not self.enabled:
+            return
+        
+        self.detector_stats = detector_stats
+    
+    def update_motion_stats(self, motion_stats: Dict[str, Any]):
+        """Record per-camera motion gate counters (skipped frames, floor inferences)"""
+        if not self.enabled:
+            return
+        
+        self.motion_stats = motion_stats
+    
+    def update_schedule_stats(self, schedule_stats: Dict[str, Any]):
+        """Record the schedule mode (active/idle) and its rate settings"""
+        if not self.enabled:
+            return
+        
+        self.schedule_stats = schedule_stats
+    
+    def update_quality_stats(self, quality_stats: Dict[str, Any]):
+        """Record the quality tier, its changes and the time spent in each tier"""
+        if not self.enabled:
+            return
+        
+        self.quality_stats = quality_stats
+    
     def log_detection(self, detection: Dict[str, Any], frame: Optional[np.ndarray] = None):
         """Log a specific detection with details"""
         if not self.enabled:
@@ -129,6 +169,7 @@ class PerformanceMonitor:
             'confidence': detection.get('confidence', 0),
             'class_name': detection.get('class_name', 'unknown'),
             'bbox': detection.get('bbox', []),
+            'camera': detection.get('camera', 'camera'),
             'frame_number': self.total_frames_processed
         }
         
@@ -268,6 +309,12 @@ class PerformanceMonitor:
                     'min_fps': min_fps
                 },
                 'system_stats': latest_stats,
+                'camera_stats': self.camera_stats,
+                'detector_stats': self.detector_stats,
+                'stage_latency': self._stage_latency(),
+                'motion_stats': self.motion_stats,
+                'schedule_stats': self.schedule_stats,
+                'quality_stats': self.quality_stats,
                 'timestamp': current_time
             }
             
@@ -316,12 +363,43 @@ class PerformanceMonitor:
                 f"Inference: {summary.get('inference_stats', {}).get('avg_time_ms', 0):.1f}ms, "
                 f"CPU: {summary.get('system_stats', {}).get('cpu_percent', 0):.1f}%, "
                 f"Memory: {summary.get('system_stats', {}).get('memory_percent', 0):.1f}%, "
-                f"Detections: {summary.get('total_detections', 0)}"
+                f"Detections: {summary.get('total_detections', 0)}, "
+                f"Dropped frames: {self._total_dropped_frames(summary.get('camera_stats', {}))}, "
+                f"Schedule: {summary.get('schedule_stats', {}).get('mode', 'always_on')}"
             )
             
+            quality_stats = summary.get('quality_stats', {})
+            if quality_stats.get('enabled'):
+                self.logger.info(
+                    f"Quality tier: {quality_stats['tier']} (p90 {quality_stats['last_p90_ms']:.0f}ms / "
+                    f"{quality_stats['latency_budget_ms']:.0f}ms budget) - "
+                    f"downgrades: {quality_stats['downgrades']}, upgrades: {quality_stats['upgrades']}"
+                )
+            
+            stage_latency = summary.get('stage_latency', {})
+            if stage_latency:
+                self.logger.info(
+                    "Stage latency p50/p99 - " + ", ".join(
+                        f"{stage}: {latency['p50_ms']:g}/{latency['p99_ms']:g}ms"
+                        for stage, latency in stage_latency.items()
+                    )
+                )
+            
         except Exception as e:
             self.logger.error(f"Error logging system stats: {e}")
     
+    def _stage_latency(self) -> Dict[str, Dict[str, float]]:
+        """p50/p99 per detector stage from the detector's latency histograms"""
+        histograms = self.detector_stats.get('stage_histograms', {})
+        return {
+            stage: {'p50_ms': histogram['p50_ms'], 'p99_ms': histogram['p99_ms'], 'count': histogram['count']}
+            for stage, histogram in histograms.items()
+        }
+    
+    def _total_dropped_frames(self, camera_stats: Dict[str, Any]) -> int:
+        """Sum dropped frames over all cameras"""
+        return sum(stats.get('dropped_frames', 0) for stats in camera_stats.get('cameras', {}).values())
+    
     def _check_performance_alerts(self):
         """Check for performance issues and log alerts"""
         try:
@@ -380,6 +458,11 @@ class PerformanceMonitor:
         self.detection_history.clear()
         self.fps_history.clear()
         self.system_stats.clear()
+        self.camera_stats = {}
+        self.detector_stats = {}
+        self.motion_stats = {}
+        self.schedule_stats = {}
+        self.quality_stats = {}
         
         self.total_frames_processed = 0
         self.total_detections = 0
@@ -0,0 +1,175 @@
+"""
+Quality Controller
+Steps detection quality down when the end-to-end latency budget is missed, and back up when there is headroom
+"""
+
+import time
+from collections import deque
+from typing import Dict, Any, List, Iterable, Optional
+import numpy as np
+from ..utils.logger import get_logger
+
+
+# Tier settings the controller knows how to apply; a tier keeps every earlier tier's settings
+TIER_SETTINGS = ('tiling', 'input_size', 'inference_rate', 'roi')
+
+# Degraded tiers, cheapest last, used when quality_control.tiers is not configured
+DEFAULT_TIERS = [
+    {'name': 'no_tiling', 'tiling': False},
+    {'name': 'small_input', 'input_size': 480},
+    {'name': 'reduced_rate', 'inference_rate': 5}
+]
+
+
+class QualityTier:
+    """A named step down in quality, with the settings it adds to the tiers above it"""
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        unknown = set(settings) - set(TIER_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown quality tier settings in {name}: {sorted(unknown)}")
+        self.name = name
+        self.settings = settings
+
+
+class QualityController:
+    """Feedback loop from measured end-to-end latency to a quality tier
+
+    Latencies are collected over a window of frames. When the window's p90
+    exceeds the budget the controller moves one tier down; when it stays below
+    upgrade_headroom * budget it moves one tier up. After each change the
+    window restarts and no further change is made for cooldown_seconds, so the
+    new tier is judged on its own frames.
+    """
+
+    def __init__(self, config: Dict[str, Any], supported_settings: Optional[Iterable[str]] = None):
+        self.config = config
+        self.logger = get_logger('quality_controller')
+
+        self.enabled = config.get('enabled', False)
+        self.latency_budget = config.get('latency_budget_ms', 250) / 1000.0
+        self.upgrade_headroom = config.get('upgrade_headroom', 0.6)
+        self.cooldown = config.get('cooldown_seconds', 10.0)
+        self.samples = deque(maxlen=max(1, config.get('window', 30)))
+
+        # Tier 0 is the configured quality; each later tier degrades further
+        self.tiers: List[QualityTier] = [QualityTier('full', {})] + [
+            QualityTier(tier.get('name', f'tier{index}'), {key: value for key, value in tier.items() if key != 'name'})
+            for index, tier in enumerate(config.get('tiers', DEFAULT_TIERS), start=1)
+        ]
+        if supported_settings is not None:
+            self._drop_unsupported(set(supported_settings))
+        self.level = 0
+        self.last_change_time = time.time()
+        self.last_inference_time = 0.0
+
+        # Statistics
+        self.downgrades = 0
+        self.upgrades = 0
+        self.frames_skipped = 0
+        self.seconds_per_tier = {tier.name: 0.0 for tier in self.tiers}
+        self.changes = deque(maxlen=50)  # Recent tier changes
+        self.last_p90 = 0.0
+
+        if self.enabled:
+            self.logger.info(
+                f"Quality control enabled: {self.latency_budget * 1000:.0f}ms budget, "
+                f"tiers {[tier.name for tier in self.tiers]}"
+            )
+
+    def _drop_unsupported(self, supported: set) -> None:
+        """Strip settings the detector cannot apply, e.g. input_size on a fixed-size model;
+        a tier left with nothing to change would only cost a step, so it is removed"""
+        tiers = [self.tiers[0]]
+        for tier in self.tiers[1:]:
+            unsupported = set(tier.settings) - supported
+            if unsupported:
+                self.logger.info(f"Quality tier {tier.name}: {sorted(unsupported)} not supported here - skipped")
+                tier.settings = {key: value for key, value in tier.settings.items() if key in supported}
+            if tier.settings:
+                tiers.append(tier)
+        self.tiers = tiers
+
+    @property
+    def tier(self) -> QualityTier:
+        """The current tier"""
+        return self.tiers[self.level]
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Settings of the current tier merged with every tier above it"""
+        settings: Dict[str, Any] = {}
+        for tier in self.tiers[:self.level + 1]:
+            settings.update(tier.settings)
+        return settings
+
+    def record(self, latency: float) -> bool:
+        """Add one frame's end-to-end latency (seconds); returns True when the tier changed"""
+        if not self.enabled:
+            return False
+
+        self.samples.append(latency)
+        current_time = time.time()
+        if len(self.samples) < self.samples.maxlen or current_time - self.last_change_time < self.cooldown:
+            return False
+
+        self.last_p90 = float(np.percentile(self.samples, 90))
+        if self.last_p90 > self.latency_budget and self.level < len(self.tiers) - 1:
+            self._change_level(self.level + 1, current_time)
+            self.downgrades += 1
+            return True
+        if self.last_p90 < self.latency_budget * self.upgrade_headroom and self.level > 0:
+            self._change_level(self.level - 1, current_time)
+            self.upgrades += 1
+            return True
+        return False
+
+    def _change_level(self, level: int, current_time: float) -> None:
+        """Move to another tier and restart the measurement window"""
+        previous = self.tier.name
+        self.seconds_per_tier[previous] += current_time - self.last_change_time
+        self.level = level
+        self.last_change_time = current_time
+        self.samples.clear()
+
+        self.changes.append({
+            'timestamp': current_time,
+            'from': previous,
+            'to': self.tier.name,
+            'p90_ms': self.last_p90 * 1000
+        })
+        self.logger.info(
+            f"Quality tier change: {previous} -> {self.tier.name} "
+            f"(p90 {self.last_p90 * 1000:.0f}ms, budget {self.latency_budget * 1000:.0f}ms)"
+        )
+
+    def should_infer(self) -> bool:
+        """Apply the current tier's inference rate limit (None = unlimited)"""
+        inference_rate = self.settings.get('inference_rate')
+        if inference_rate is None:
+            return True
+
+        current_time = time.time()
+        if inference_rate <= 0 or current_time - self.last_inference_time < 1.0 / inference_rate:
+            self.frames_skipped += 1
+            return False
+
+        self.last_inference_time = current_time
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current tier, how often it changed and the time spent in each tier"""
+        seconds_per_tier = dict(self.seconds_per_tier)
+        seconds_per_tier[self.tier.name] += time.time() - self.last_change_time
+        return {
+            'enabled': self.enabled,
+            'tier': self.tier.name,
+            'level': self.level,
+            'latency_budget_ms': self.latency_budget * 1000,
+            'last_p90_ms': self.last_p90 * 1000,
+            'downgrades': self.downgrades,
+            'upgrades': self.upgrades,
+            'frames_skipped': self.frames_skipped,
+            'seconds_per_tier': seconds_per_tier,
+            'recent_changes': list(self.changes)
+        }
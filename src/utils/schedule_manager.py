@@ -0,0 +1,192 @@
+"""
+Schedule Manager
+Duty-cycles capture and inference around the school bus time windows
+"""
+
+import time
+from datetime import datetime, date
+from typing import Dict, Any, List, Optional
+from ..utils.logger import get_logger
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def _parse_time(value: str) -> int:
+    """Convert 'HH:MM' to minutes after midnight"""
+    hours, minutes = str(value).split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def _parse_date(value: Any) -> date:
+    """Convert 'YYYY-MM-DD' (or a YAML date) to a date"""
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), '%Y-%m-%d').date()
+
+
+class ActiveWindow:
+    """A daily time window with its own capture and inference rates"""
+
+    def __init__(self, name: str, config: Dict[str, Any], defaults: Dict[str, Any]):
+        self.name = name
+        self.start = _parse_time(config.get('start_time', '00:00'))
+        self.end = _parse_time(config.get('end_time', '23:59'))
+        self.capture_fps = config.get('capture_fps', defaults.get('capture_fps'))
+        self.inference_rate = config.get('inference_rate', defaults.get('inference_rate'))
+
+    def contains(self, minute_of_day: int, warmup_minutes: int) -> bool:
+        """Check if a time of day falls in the window (including warm-up lead time)"""
+        return self.start - warmup_minutes <= minute_of_day < self.end
+
+
+class ScheduleManager:
+    """Decides the capture fps and inference rate for the current time"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.logger = get_logger('schedule')
+
+        self.enabled = config.get('enabled', False)
+        self.timezone = None
+        timezone_name = config.get('timezone')
+        if timezone_name and ZoneInfo is not None:
+            try:
+                self.timezone = ZoneInfo(timezone_name)
+            except Exception as e:
+                self.logger.warning(f"Unknown timezone '{timezone_name}' - using local time: {e}")
+
+        self.school_days = {day.lower() for day in config.get('school_days', WEEKDAYS[:5])}
+        self.holidays = self._load_holidays(config.get('holidays', []))
+        self.warmup_minutes = config.get('warmup_minutes', 2)
+
+        # Rates inside windows (per-window values override) and outside them
+        active_defaults = config.get('active', {'capture_fps': None, 'inference_rate': None})
+        self.idle = config.get('idle', {'capture_fps': 1, 'inference_rate': 0.1})
+        self.windows: List[ActiveWindow] = [
+            ActiveWindow(name, window_config or {}, active_defaults)
+            for name, window_config in config.get('active_periods', {}).items()
+        ]
+
+        # Current state; re-evaluated at most once per check interval
+        self.check_interval = config.get('check_interval', 1.0)
+        self._last_check = 0.0
+        self.state = self._make_state(self.get_active_window() if self.enabled else None)
+        self.last_transition_time = time.time()
+        self.last_inference_time = 0.0
+
+        # Statistics
+        self.transitions = 0
+        self.seconds_active = 0.0
+        self.seconds_idle = 0.0
+        self.frames_skipped = 0
+
+        if self.enabled:
+            self.logger.info(f"Schedule enabled with {len(self.windows)} active window(s)")
+
+    def _load_holidays(self, entries: List[Any]) -> List[Any]:
+        """Parse single dates and {start, end} ranges"""
+        holidays = []
+        for entry in entries:
+            if isinstance(entry, dict):
+                holidays.append((_parse_date(entry['start']), _parse_date(entry['end'])))
+            else:
+                day = _parse_date(entry)
+                holidays.append((day, day))
+        return holidays
+
+    def _now(self) -> datetime:
+        """Current wall-clock time in the configured timezone"""
+        return datetime.now(self.timezone) if self.timezone else datetime.now()
+
+    def is_school_day(self, day: date) -> bool:
+        """Check weekday calendar and holiday list"""
+        if WEEKDAYS[day.weekday()] not in self.school_days:
+            return False
+        return not any(start <= day <= end for start, end in self.holidays)
+
+    def get_active_window(self, now: Optional[datetime] = None) -> Optional[ActiveWindow]:
+        """Get the window covering a moment, or None when idle"""
+        now = now or self._now()
+        if not self.is_school_day(now.date()):
+            return None
+
+        minute_of_day = now.hour * 60 + now.minute
+        for window in self.windows:
+            if window.contains(minute_of_day, self.warmup_minutes):
+                return window
+        return None
+
+    def _make_state(self, window: Optional[ActiveWindow]) -> Dict[str, Any]:
+        """Build the rate settings for a window (or idle)"""
+        if not self.enabled:
+            return {'mode': 'always_on', 'window': None, 'capture_fps': None, 'inference_rate': None}
+        if window is None:
+            return {
+                'mode': 'idle',
+                'window': None,
+                'capture_fps': self.idle.get('capture_fps'),
+                'inference_rate': self.idle.get('inference_rate')
+            }
+        return {
+            'mode': 'active',
+            'window': window.name,
+            'capture_fps': window.capture_fps,
+            'inference_rate': window.inference_rate
+        }
+
+    def update(self) -> bool:
+        """Re-evaluate the schedule; returns True when the mode or window changed"""
+        current_time = time.time()
+        if not self.enabled or current_time - self._last_check < self.check_interval:
+            return False
+
+        elapsed = current_time - self._last_check if self._last_check else 0.0
+        self._last_check = current_time
+        if self.state['mode'] == 'active':
+            self.seconds_active += elapsed
+        else:
+            self.seconds_idle += elapsed
+
+        new_state = self._make_state(self.get_active_window())
+        if new_state['window'] == self.state['window'] and new_state['mode'] == self.state['mode']:
+            return False
+
+        self.logger.info(
+            f"Schedule change: {self.state['mode']} -> {new_state['mode']}"
+            + (f" ({new_state['window']})" if new_state['window'] else "")
+        )
+        self.state = new_state
+        self.transitions += 1
+        self.last_transition_time = current_time
+        return True
+
+    def should_infer(self) -> bool:
+        """Apply the current inference rate limit (None = unlimited, 0 = no inference)"""
+        inference_rate = self.state['inference_rate']
+        if inference_rate is None:
+            return True
+
+        current_time = time.time()
+        if inference_rate <= 0 or current_time - self.last_inference_time < 1.0 / inference_rate:
+            self.frames_skipped += 1
+            return False
+
+        self.last_inference_time = current_time
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current mode and time spent in each mode"""
+        return {
+            'enabled': self.enabled,
+            **self.state,
+            'transitions': self.transitions,
+            'seconds_active': self.seconds_active,
+            'seconds_idle': self.seconds_idle,
+            'frames_skipped': self.frames_skipped
+        }
@@ -16,7 +16,7 @@ sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from utils.config_manager import ConfigManager
 from utils.logger import setup_logging
-from camera.camera_manager import CameraManager
+from camera.camera_manager import CameraManager, discover_cameras
 from detection.hailo_detector import HailoDetector
 from automation.mqtt_client import MQTTClient
 from automation.home_assistant import HomeAssistantController
@@ -84,6 +84,14 @@ class SystemTester:
         """Test camera initialization and capture"""
         try:
             camera_config = self.config.get('camera', {})
+            
+            # List attached cameras (probed concurrently, slow devices time out)
+            for camera_info in discover_cameras():
+                self.logger.info(
+                    f"Found camera {camera_info['index']}: {camera_info.get('name', 'unknown')} "
+                    f"{camera_info.get('resolution', '')}"
+                )
+            
             camera = CameraManager(camera_config)
             
             if not camera.initialize():